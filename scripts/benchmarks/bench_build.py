@@ -0,0 +1,106 @@
+import argparse
+import gc
+import os
+import sys
+import time
+
+import pyomo.environ as pyo
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gridmodel.builder import build_nodal_model
+from synthetic import make_grid, model_inputs
+
+# Compares Pyomo construction time of the shared index-based builder against the
+# original scan-everything rules from nodalmodel.py on synthetic grids.
+#
+#   python scripts/benchmarks/bench_build.py
+#   python scripts/benchmarks/bench_build.py --sizes 6 100 1000 --skip-legacy-above 100
+
+
+def build_legacy(nodes, available_capacity, costs, line_cap, nodal_demand, reactance=None):
+    # The original scan-everything rules from nodalmodel.py (before gridmodel.builder), on
+    # the same components as build_nodal_model so that only the rules differ
+    model = pyo.ConcreteModel()
+    model.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+    model.rc = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+
+    model.NODES = pyo.Set(initialize=nodes)
+    model.LINES = pyo.Set(initialize=line_cap.keys(), dimen=2)
+    model.GENS = pyo.Set(initialize=available_capacity.keys(), dimen=2)
+
+    model.capacity = pyo.Param(model.GENS, initialize=available_capacity, mutable=True)
+    model.demand = pyo.Param(model.NODES, initialize=nodal_demand, mutable=True)
+    model.line_limit = pyo.Param(model.LINES, initialize=line_cap, mutable=True)
+    model.reactance = pyo.Param(model.LINES, initialize=1.0 if reactance is None else reactance, mutable=True)
+
+    model.p_gen = pyo.Var(model.GENS, domain=pyo.NonNegativeReals)
+    model.p_flow = pyo.Var(model.LINES, domain=pyo.Reals)
+    model.theta = pyo.Var(model.NODES, domain=pyo.Reals)
+
+    def objective_rule(m):
+        return sum(costs[g] * m.p_gen[g] for g in m.GENS)
+    model.OBJ = pyo.Objective(rule=objective_rule, sense=pyo.minimize)
+
+    def nodal_balance_rule(m, n):
+        gen_sum = sum(m.p_gen[(n, tech)] for (node, tech) in m.GENS if node == n)
+        inflow = sum(m.p_flow[(i, j)] for (i, j) in m.LINES if j == n)
+        outflow = sum(m.p_flow[(i, j)] for (i, j) in m.LINES if i == n)
+        return gen_sum + inflow - outflow == m.demand[n]
+    model.NodalBalance = pyo.Constraint(model.NODES, rule=nodal_balance_rule)
+
+    def gen_capacity_rule(m, n, tech):
+        return m.p_gen[(n, tech)] <= m.capacity[(n, tech)]
+    model.GenCapacity = pyo.Constraint(model.GENS, rule=gen_capacity_rule)
+
+    def line_capacity_rule_pos(m, i, j):
+        return m.p_flow[(i, j)] <= m.line_limit[(i, j)]
+    def line_capacity_rule_neg(m, i, j):
+        return m.p_flow[(i, j)] >= -m.line_limit[(i, j)]
+    model.LineCapacityPos = pyo.Constraint(model.LINES, rule=line_capacity_rule_pos)
+    model.LineCapacityNeg = pyo.Constraint(model.LINES, rule=line_capacity_rule_neg)
+
+    def dc_flow_rule(m, i, j):
+        return m.reactance[(i, j)] * m.p_flow[(i, j)] == m.theta[i] - m.theta[j]
+    model.DCFlow = pyo.Constraint(model.LINES, rule=dc_flow_rule)
+
+    return model
+
+
+def time_build(build, nodes, inputs, repeat):
+    # Best of repeat builds, after one untimed build and with the garbage collector off (as timeit does)
+    build(nodes, *inputs)
+    gc.collect()
+    gc.disable()
+    try:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build(nodes, *inputs)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark nodal model construction")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[6, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--skip-legacy-above", type=int, default=None,
+                        help="only time the legacy builder up to this many nodes")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>6} {'gens':>7} {'lines':>7} {'indexed [s]':>12} {'legacy [s]':>12} {'speedup':>8}")
+    for n_nodes in args.sizes:
+        supply, lines, demand, weather = make_grid(n_nodes)
+        inputs = model_inputs(supply, lines, demand, weather)
+        nodes = list(demand["node"])
+
+        t_new = time_build(build_nodal_model, nodes, inputs, args.repeat)
+        if args.skip_legacy_above is None or n_nodes <= args.skip_legacy_above:
+            t_old = time_build(build_legacy, nodes, inputs, args.repeat)
+            legacy, speedup = f"{t_old:12.4f}", f"{t_old / t_new:7.1f}x"
+        else:
+            legacy, speedup = f"{'-':>12}", f"{'-':>8}"
+
+        print(f"{n_nodes:>6} {len(inputs[0]):>7} {len(inputs[2]):>7} {t_new:12.4f} {legacy} {speedup}")
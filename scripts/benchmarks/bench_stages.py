@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyomo
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gridmodel.builder import build_nodal_model
+from gridmodel.data import compute_availability, line_capacities
+from gridmodel.engine import ScenarioEngine, resolve_solver
+from gridmodel.nodal import collect_outputs
+from gridmodel.ptdf import PTDFEngine
+from gridmodel.sparse_opf import SparseNodalModel
+from gridmodel.uniform import dispatch_stage, feasibility_stage, price_stage, redispatch_stage
+from synthetic import make_grid
+
+# Per-stage timings of the nodal and uniform pipelines on synthetic grids.
+#
+#   python scripts/benchmarks/bench_stages.py                               # 6 ... 2000 nodes
+#   python scripts/benchmarks/bench_stages.py --out bench.json
+#   python scripts/benchmarks/bench_stages.py --baseline bench.json         # exit 1 on regressions
+#
+# Stages (best of --repeat runs each):
+#   nodal     data_prep, build, solve, extract          (Pyomo model, as nodalmodel.py)
+#   sparse    build, solve, extract                     (gridmodel.sparse_opf)
+#   uniform   dispatch, price, ptdf, feasibility, redispatch_optimal, redispatch_heuristic
+#
+# The JSON output holds one record per (nodes, track, stage) plus the model size of
+# the Pyomo build. With --baseline, every stage slower than the baseline by more
+# than --tolerance (and by more than --min-seconds) is reported as a regression.
+#
+# Synthetic grids are drawn at off-peak demand by default: at peak demand the larger
+# random grids are not always feasible.
+
+
+class StageTimer:
+    """Best wall time per stage over repeated runs."""
+
+    def __init__(self):
+        self.best = {}
+
+    def __call__(self, key, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        self.best[key] = min(self.best.get(key, float("inf")), elapsed)
+        return result
+
+
+def nodal_prep(supply, lines, demand, weather, scenario_name, demand_level):
+    # Uncached, so every repeat pays for the availability table
+    available_capacity, costs = compute_availability(supply, weather).for_scenario(scenario_name)
+    return available_capacity, costs, line_capacities(lines), dict(zip(demand["node"], demand[demand_level]))
+
+
+def run_pipelines(timer, supply, lines, demand, weather, scenario_name, demand_level, solver_name, heuristic):
+    nodes = list(demand["node"])
+
+    # === Nodal (Pyomo) ===
+    available_capacity, costs, line_cap, nodal_demand = timer(
+        ("nodal", "data_prep"), nodal_prep, supply, lines, demand, weather, scenario_name, demand_level
+    )
+    model = timer(("nodal", "build"), build_nodal_model, nodes, available_capacity, costs, line_cap, nodal_demand)
+    timer(("nodal", "solve"), lambda: ScenarioEngine(model, solver_name).solve(f"{len(nodes)} nodes"))
+    timer(("nodal", "extract"), lambda: collect_outputs(model, costs))
+    size = {"variables": model.nvariables(), "constraints": model.nconstraints()}
+
+    # === Nodal (sparse) ===
+    sparse = timer(("sparse", "build"), SparseNodalModel.from_inputs, supply, lines, nodes)
+    gens = sparse.gens
+    capacity = np.array([available_capacity[g] for g in gens])
+    mc = np.array([costs[g] for g in gens], dtype=float)
+    demand_vec = np.array([nodal_demand[n] for n in sparse.nodes])
+    cap_vec = np.array([line_cap[l] for l in sparse.lines])
+    result = timer(("sparse", "solve"), sparse.solve, capacity, mc, demand_vec, cap_vec)
+    timer(("sparse", "extract"), sparse.outputs, result, mc)
+
+    # === Uniform ===
+    dispatch = timer(("uniform", "dispatch"), dispatch_stage, supply, demand, weather, scenario_name, demand_level,
+                     method="merit")
+    price = timer(("uniform", "price"), price_stage, dispatch)
+    ptdf = timer(("uniform", "ptdf"), PTDFEngine.from_lines, lines)
+    feasibility = timer(("uniform", "feasibility"), feasibility_stage, price, ptdf)
+    timer(("uniform", "redispatch_optimal"), redispatch_stage, feasibility, supply, line_cap, "optimal", solver_name)
+    if heuristic:
+        timer(("uniform", "redispatch_heuristic"), redispatch_stage, feasibility, supply, line_cap, "heuristic")
+
+    return size, 0 if feasibility.violations is None else len(feasibility.violations)
+
+
+def benchmark(sizes, repeat=3, scenario_name="hs", demand_level="offpeak_demand", solver_name=None,
+              skip_heuristic_above=6, seed=0):
+    records = []
+    for n_nodes in sizes:
+        supply, lines, demand, weather = make_grid(n_nodes, seed=seed)
+        timer = StageTimer()
+        heuristic = skip_heuristic_above is None or n_nodes <= skip_heuristic_above
+        for _ in range(repeat):
+            size, violations = run_pipelines(
+                timer, supply, lines, demand, weather, scenario_name, demand_level, solver_name, heuristic
+            )
+
+        for (track, stage), seconds in timer.best.items():
+            records.append({
+                "nodes": n_nodes, "gens": len(supply), "lines": len(lines),
+                "track": track, "stage": stage, "seconds": seconds,
+                **size, "violations": violations,
+            })
+    return records
+
+
+def compare(records, baseline, tolerance, min_seconds):
+    """Rows (nodes, track, stage, baseline, current, ratio, regression) for stages in both runs."""
+    old = {(r["nodes"], r["track"], r["stage"]): r["seconds"] for r in baseline}
+    rows = []
+    for r in records:
+        key = (r["nodes"], r["track"], r["stage"])
+        if key not in old:
+            continue
+        before, now = old[key], r["seconds"]
+        rows.append({
+            "nodes": key[0], "track": key[1], "stage": key[2],
+            "baseline": before, "current": now, "ratio": now / before if before > 0 else float("inf"),
+            "regression": now > before * (1 + tolerance) and now - before > min_seconds,
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every stage of the nodal and uniform pipelines")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[6, 100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scenario", default="hs")
+    parser.add_argument("--demand-level", default="offpeak_demand")
+    parser.add_argument("--solver", default=None)
+    parser.add_argument("--seed", type=int, default=0, help="synthetic grid seed")
+    parser.add_argument("--skip-heuristic-above", type=int, default=6,
+                        help="only time the heuristic redispatch up to this many nodes")
+    parser.add_argument("--out", default="outputs/benchmarks/stages.json")
+    parser.add_argument("--baseline", default=None, help="earlier --out file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown as a fraction of the baseline")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    # Read before --out is written: with the same path it would be compared against itself
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    records = benchmark(args.sizes, args.repeat, args.scenario, args.demand_level, args.solver,
+                        args.skip_heuristic_above, args.seed)
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pyomo": pyomo.version.version,
+            "platform": platform.platform(),
+            "solver": resolve_solver(args.solver),
+            "scenario": args.scenario,
+            "demand_level": args.demand_level,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": records,
+    }
+
+    table = pd.DataFrame(records).pivot_table(index=["track", "stage"], columns="nodes", values="seconds", sort=False)
+    print(table.to_string(float_format=lambda x: f"{x:.4f}"))
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Timings saved to: {args.out}")
+
+    if baseline is not None:
+        diff = compare(records, baseline, args.tolerance, args.min_seconds)
+        regressions = diff[diff["regression"]]
+        if regressions.empty:
+            print(f"No stage slower than the baseline by more than {args.tolerance:.0%}")
+        else:
+            print("⚠️ Regressions:")
+            print(regressions.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+            sys.exit(1)
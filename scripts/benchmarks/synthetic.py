@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# Synthetic grids shaped like the files in data/:
+#   supply  → node, type, mc, adjusted_capacity   (10 technologies per node)
+#   lines   → from_node, to_node, linecap          (ring + random chords, ~1.4 lines per node)
+#   demand  → node, offpeak_demand, average_demand, peak_demand
+#   weather → scenario, node, onshorewind_profile, offshorewind_profile, solar_profile
+
+TECHS = {
+    # type: (mc, typical capacity per node in MW)
+    "onshorewind": (5, 10000),
+    "offshorewind": (5, 3000),
+    "solar": (5, 12000),
+    "biomass": (75, 1500),
+    "otherres": (20, 300),
+    "waste": (30, 300),
+    "lignite": (69, 2500),
+    "hardcoal": (100, 2000),
+    "gas": (109, 4000),
+    "oil": (200, 300),
+}
+
+SCENARIOS = ["hs", "hw", "lwls"]
+
+
+def make_grid(n_nodes, seed=0, chord_ratio=0.4):
+    rng = np.random.default_rng(seed)
+    nodes = np.arange(1, n_nodes + 1)
+
+    # === Supply ===
+    rows = []
+    for n in nodes:
+        for tech, (mc, cap) in TECHS.items():
+            rows.append({
+                "node": n,
+                "type": tech,
+                "mc": mc,
+                "adjusted_capacity": round(cap * rng.uniform(0.2, 1.8)),
+            })
+    supply = pd.DataFrame(rows)
+
+    # === Lines: ring for connectivity plus random chords ===
+    edges = set()
+    for k in range(n_nodes - 1):
+        edges.add((nodes[k], nodes[k + 1]))
+    if n_nodes > 2:
+        edges.add((nodes[0], nodes[-1]))
+    n_chords = int(chord_ratio * n_nodes)
+    while n_nodes > 3 and len(edges) < n_nodes + n_chords:
+        i, j = sorted(rng.choice(nodes, size=2, replace=False))
+        edges.add((i, j))
+    lines = pd.DataFrame(sorted(edges), columns=["from_node", "to_node"])
+    lines["linecap"] = rng.choice([1500, 2000, 2500, 3000], size=len(lines))
+
+    # === Demand ===
+    peak = rng.uniform(5000, 16000, size=n_nodes)
+    demand = pd.DataFrame({
+        "node": nodes,
+        "offpeak_demand": (peak * 0.57).round(1),
+        "average_demand": (peak * 0.785).round(1),
+        "peak_demand": peak.round(1),
+    })
+
+    # === Weather ===
+    rows = []
+    for scenario in SCENARIOS:
+        for n in nodes:
+            wind = rng.uniform(0.05, 0.8)
+            rows.append({
+                "scenario": scenario,
+                "node": n,
+                "onshorewind_profile": wind,
+                "offshorewind_profile": wind,
+                "solar_profile": rng.uniform(0.0, 0.6),
+            })
+    weather = pd.DataFrame(rows)
+
+    return supply, lines, demand, weather
+
+
+def model_inputs(supply, lines, demand, weather, scenario_name="hs", demand_level="peak_demand"):
+    """Same dicts the model scripts build: available_capacity, costs, line_cap, nodal_demand."""
+    renewable_types = ["onshorewind", "offshorewind", "solar"]
+    prof = weather[weather["scenario"] == scenario_name].set_index("node")
+
+    available_capacity = {}
+    costs = {}
+    for node, tech, mc, base_cap in supply[["node", "type", "mc", "adjusted_capacity"]].itertuples(index=False):
+        multiplier = prof.at[node, f"{tech}_profile"] if tech in renewable_types else 1
+        available_capacity[(node, tech)] = base_cap * multiplier
+        costs[(node, tech)] = mc
+
+    line_cap = {(i, j): cap for i, j, cap in lines[["from_node", "to_node", "linecap"]].itertuples(index=False)}
+    nodal_demand = dict(zip(demand["node"], demand[demand_level]))
+    return available_capacity, costs, line_cap, nodal_demand
@@ -0,0 +1,319 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from gridmodel import runner
+from gridmodel.aggregate import ScenarioAggregator
+from gridmodel.cache import DEFAULT_DIR
+from gridmodel.data import load_inputs
+from gridmodel.decompose import decompose_tables
+from gridmodel.instrument import StageLog, stage
+from gridmodel.montecarlo import MonteCarloEngine, Uncertainty
+from gridmodel.ptdf import PTDFEngine
+from gridmodel.store import ResultStore
+from gridmodel.sweep import ALL_LINES, sweep_line_capacity
+from gridmodel.zonal import (ZonalModel, ZoningEvaluator, enumerate_zonings, parse_zoning, rank_zonings,
+                             read_zoning, run_zonal, zone_label)
+
+# Single entry point for the model runs (run from the repository root):
+#
+#   python scripts/cli.py run                                  # full nodal + uniform sweep
+#   python scripts/cli.py run --workers 4 --lines lines.csv lines_sensitivity.csv
+#   python scripts/cli.py run --tracks nodal --scenarios hs --demand-levels peak_demand
+#   python scripts/cli.py run --format parquet --out outputs/store
+#   python scripts/cli.py run --summary-only --group-by Scenario --lines lines.csv lines_sensitivity.csv
+#   python scripts/cli.py run --tracks nodal --decompose
+#   python scripts/cli.py sweep --scenario hs --demand-level peak_demand --each-line
+#   python scripts/cli.py ranges --scenario hs --demand-level peak_demand
+#   python scripts/cli.py montecarlo --scenario hs --demand-level peak_demand --draws 10000 --workers 4
+#   python scripts/cli.py zonal --zones "1,2,3|4,5,6" --mode fb
+#   python scripts/cli.py zonal --enumerate 2 3 --workers 4
+
+
+def cmd_run(args):
+    log_path = None if args.no_log else os.path.join(args.out, "stages.jsonl")
+    if log_path and os.path.exists(log_path):
+        os.remove(log_path)
+    log_options = {"path": log_path, "memory": args.trace_memory, "profile_dir": args.profile} if log_path else None
+
+    tasks = runner.scenario_grid(
+        scenarios=args.scenarios,
+        demand_levels=args.demand_levels,
+        line_files=args.lines,
+        tracks=args.tracks,
+        data_dir=args.data,
+        solver_name=args.solver,
+        redispatch=args.redispatch,
+        cache_dir=None if args.no_cache else args.cache,
+        store_dir=args.out if args.format == "parquet" else None,
+        nodal_method=args.nodal_model,
+        log_options=log_options,
+    )
+    aggregator = ScenarioAggregator(by=args.group_by, order={
+        "Scenario": args.scenarios,
+        "DemandLevel": args.demand_levels,
+        "Lines": [os.path.splitext(f)[0] for f in args.lines],
+    })
+    print(f"--- Running {len(tasks)} scenario combinations on {args.workers or os.cpu_count()} workers ---")
+
+    start = time.perf_counter()
+    merged = runner.run_grid(tasks, workers=args.workers, aggregator=aggregator, keep=not args.summary_only)
+    log = StageLog(**log_options) if log_options else None
+    with stage(log, "write"):
+        if args.format == "csv":
+            runner.write_results(merged, args.out)
+        aggregator.write(args.out)
+
+        if args.decompose:
+            decompose_run(args, merged)
+
+    print(f"\n📄 Results saved to: {args.out} ({time.perf_counter() - start:.1f} s)")
+    if log_path:
+        print(f"📄 Stage log: {log_path}")
+
+
+def decompose_run(args, merged):
+    """Energy / congestion split of the nodal LMPs of a run (lmp_components.csv, congestion_by_line.csv)."""
+    keys = ["Lines", "Scenario", "DemandLevel"]
+    if args.format == "parquet":
+        store = ResultStore(args.out)
+        runs = {"Lines": [os.path.splitext(f)[0] for f in args.lines], "Scenario": args.scenarios,
+                "DemandLevel": args.demand_levels}
+        lmp = store.read("nodal_lmp", columns=keys + ["Node", "LMP"], **runs)
+        flows = store.read("nodal_flows", **runs)
+        has_cuts = os.path.isdir(os.path.join(args.out, "nodal_contingencies"))
+        contingencies = store.read("nodal_contingencies", **runs) if has_cuts else None
+    elif "nodal" in merged:
+        nodal = merged["nodal"]
+        lmp = nodal[nodal["Category"] == "LMP"].rename(columns={"Value": "LMP"})
+        lmp = lmp.astype({"Node": "int64", "LMP": float})
+        flows = merged["nodal_flows"]
+        contingencies = merged.get("nodal_contingencies")
+    else:
+        print("⚠️ No nodal results to decompose (needs the nodal track, without --summary-only)")
+        return
+
+    nodes, lines = [], []
+    for name, group in lmp.groupby("Lines", sort=False):
+        ptdf = PTDFEngine.from_lines(load_inputs(args.data, f"{name}.csv")[1])
+        part = lambda df: None if df is None else df[df["Lines"] == name]
+        n, l = decompose_tables(group, part(flows), ptdf, keys=keys, contingencies=part(contingencies))
+        nodes.append(n)
+        lines.append(l)
+    nodes = pd.concat(nodes, ignore_index=True)
+    pd.concat(lines, ignore_index=True).to_csv(os.path.join(args.out, "congestion_by_line.csv"), index=False)
+    nodes.to_csv(os.path.join(args.out, "lmp_components.csv"), index=False)
+    print(f"LMP decomposition: max |residual| {nodes['Residual'].abs().max():.2e} €/MWh")
+
+
+def cmd_sweep(args):
+    supply, lines, demand, weather = load_inputs(args.data, args.lines)
+    factors = args.factors if args.factors else np.linspace(args.min, args.max, args.steps).round(6)
+    targets = [ALL_LINES]
+    if args.each_line:
+        targets += list(zip(lines["from_node"].tolist(), lines["to_node"].tolist()))
+    print(f"--- Sweeping {len(targets)} target(s) x {len(factors)} capacity factors: {args.scenario} | {args.demand_level} ---")
+
+    start = time.perf_counter()
+    result = sweep_line_capacity(supply, lines, demand, weather, args.scenario, args.demand_level, factors, targets, args.solver)
+
+    os.makedirs(args.out, exist_ok=True)
+    for name in ["system", "lmp", "lines"]:
+        getattr(result, name).to_csv(os.path.join(args.out, f"{name}.csv"), index=False)
+
+    print(result.system[result.system["Target"] == ALL_LINES].to_string(index=False))
+    print(f"\n📄 Response curves saved to: {args.out} ({time.perf_counter() - start:.1f} s)")
+
+
+def cmd_ranges(args):
+    from gridmodel.parametric import parametric_analysis     # needs highspy
+
+    supply, lines, demand, weather = load_inputs(args.data, args.lines)
+    result = parametric_analysis(supply, lines, demand, weather, args.scenario, args.demand_level)
+
+    os.makedirs(args.out, exist_ok=True)
+    for name in ["lines", "lmp", "generators"]:
+        getattr(result, name).to_csv(os.path.join(args.out, f"{name}.csv"), index=False)
+
+    print(f"--- {args.scenario} | {args.demand_level}: total cost {result.total_cost:,.2f} ({result.iterations} simplex iterations) ---")
+    print(result.lines[result.lines["Basis"] != "basic"].to_string(index=False))
+    print(f"\n📄 Shadow prices and ranges saved to: {args.out}")
+
+
+def cmd_montecarlo(args):
+    supply, lines, demand, weather = load_inputs(args.data, args.lines)
+    uncertainty = Uncertainty(
+        wind_sigma=args.wind_sigma,
+        solar_sigma=args.solar_sigma,
+        demand_sigma=args.demand_sigma,
+        spatial_corr=args.spatial_corr,
+    )
+    engine = MonteCarloEngine(supply, lines, demand, weather, args.scenario, args.demand_level, uncertainty,
+                              check_lp=args.check_lp, solver_name=args.solver)
+    print(f"--- Sampling {args.draws} draws around {args.scenario} | {args.demand_level} ---")
+
+    start = time.perf_counter()
+    result = engine.run(args.draws, batch_size=args.batch_size, seed=args.seed, workers=args.workers,
+                        quantiles=args.quantiles)
+
+    os.makedirs(args.out, exist_ok=True)
+    result.summary.to_csv(os.path.join(args.out, "summary.csv"), index=False)
+
+    print(result.summary[result.summary["Node"] == "System"].to_string(index=False))
+    if result.nodal_infeasible or result.uniform_unserved:
+        print(f"WARNING: {result.nodal_infeasible} draws without a feasible nodal dispatch, "
+              f"{result.uniform_unserved} with demand above available capacity")
+    print(f"\n📄 Summary saved to: {args.out} ({time.perf_counter() - start:.1f} s)")
+
+
+def cmd_zonal(args):
+    supply, lines, demand, weather = load_inputs(args.data, args.lines)
+    pairs = [(s, d) for s in args.scenarios for d in args.demand_levels]
+    zonings = [parse_zoning(z) for z in args.zones or []]
+    if args.zones_file:
+        zonings.append(read_zoning(args.zones_file))
+    if not zonings and not args.enumerate:
+        raise SystemExit("Give --zones, --zones-file or --enumerate")
+    os.makedirs(args.out, exist_ok=True)
+    start = time.perf_counter()
+
+    # Prices, exchanges and totals of the given zonings
+    if zonings:
+        tables = {"zones": [], "exchanges": [], "summary": []}
+        for zoning in zonings:
+            model = ZonalModel.from_inputs(supply, lines, zoning, mode=args.mode, cnec=args.cnec)
+            for scenario_name, demand_level in pairs:
+                result = run_zonal(supply, lines, demand, weather, scenario_name, demand_level, zoning, gsk=args.gsk,
+                                   redispatch=args.redispatch, solver_name=args.solver, model=model)
+                keys = {"Zoning": zone_label(zoning), "Scenario": scenario_name, "DemandLevel": demand_level}
+                tables["summary"].append(pd.DataFrame([{**keys, **result.record()}]))
+                if result.status == 0:
+                    tables["zones"].append(result.zones.assign(**keys))
+                    tables["exchanges"].append(result.exchanges.assign(**keys))
+                    print(f"✅ {keys['Zoning']} | {scenario_name} | {demand_level} | "
+                          f"Prices: {', '.join(f'{p:g}' for p in result.zones['Price'])} €/MWh")
+        for name, frames in tables.items():
+            if frames:
+                df = pd.concat(frames, ignore_index=True)
+                key_cols = ["Zoning", "Scenario", "DemandLevel"]
+                df[key_cols + [c for c in df.columns if c not in key_cols]].to_csv(
+                    os.path.join(args.out, f"{name}.csv"), index=False
+                )
+
+    # Ranking of all candidates over the scenario grid
+    if len(zonings) > 1 or args.enumerate:
+        candidates = itertools.chain(zonings, *(enumerate_zonings(lines, k) for k in args.enumerate or []))
+        evaluator = ZoningEvaluator(supply, lines, demand, weather, pairs, mode=args.mode, cnec=args.cnec,
+                                    gsk=args.gsk, redispatch=args.redispatch, solver_name=args.solver)
+        ranking = rank_zonings(evaluator, candidates, workers=args.workers, by=args.rank_by)
+        ranking.to_csv(os.path.join(args.out, "ranking.csv"), index=False)
+        print(ranking.head(10).to_string(index=False))
+
+    print(f"\n📄 Zonal results saved to: {args.out} ({time.perf_counter() - start:.1f} s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Nodal / uniform pricing model runs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="solve a scenario grid in parallel")
+    p.add_argument("--scenarios", nargs="+", default=runner.SCENARIOS)
+    p.add_argument("--demand-levels", nargs="+", default=runner.DEMAND_LEVELS)
+    p.add_argument("--lines", nargs="+", default=runner.LINE_FILES, help="line datasets in --data")
+    p.add_argument("--tracks", nargs="+", default=runner.TRACKS, choices=runner.TRACKS)
+    p.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    p.add_argument("--solver", default=None, help="solver backend: highs, glpk, scipy or any Pyomo solver name (default: first available)")
+    p.add_argument("--redispatch", default="heuristic", choices=["heuristic", "optimal"])
+    p.add_argument("--nodal-model", default="pyomo", choices=["pyomo", "sparse", "n1"],
+                   help="build the nodal LP with Pyomo, assemble it as sparse matrices (gridmodel/sparse_opf.py), "
+                        "or add N-1 security constraints to the sparse LP (gridmodel/security.py)")
+    p.add_argument("--data", default="data")
+    p.add_argument("--out", default="outputs/run")
+    p.add_argument("--format", default="csv", choices=["csv", "parquet"],
+                   help="merged CSV tables, or a typed Parquet store (gridmodel/store.py)")
+    p.add_argument("--cache", default=DEFAULT_DIR, help="result cache directory (shared by all workers)")
+    p.add_argument("--no-cache", action="store_true", help="solve every grid point again")
+    p.add_argument("--group-by", nargs="+", default=["Scenario", "DemandLevel"], choices=["Scenario", "DemandLevel", "Lines"],
+                   help="keys of the nodal vs uniform comparison tables (comparison.csv, totals.csv)")
+    p.add_argument("--summary-only", action="store_true",
+                   help="only write the comparison tables; per-run tables are not kept in memory")
+    p.add_argument("--decompose", action="store_true",
+                   help="split the nodal LMPs into energy and per-line congestion (gridmodel/decompose.py)")
+    p.add_argument("--no-log", action="store_true", help="do not write the per-stage log (<out>/stages.jsonl)")
+    p.add_argument("--trace-memory", action="store_true", help="log the peak Python memory of every stage (slower)")
+    p.add_argument("--profile", default=None, metavar="DIR", help="write a cProfile dump of every grid point to DIR")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("sweep", help="line-capacity sensitivity curves for one scenario")
+    p.add_argument("--scenario", default="hs")
+    p.add_argument("--demand-level", default="peak_demand")
+    p.add_argument("--lines", default="lines.csv", help="base line dataset in --data")
+    p.add_argument("--factors", nargs="+", type=float, help="capacity factors (default: --min/--max/--steps grid)")
+    p.add_argument("--min", type=float, default=0.5)
+    p.add_argument("--max", type=float, default=2.0)
+    p.add_argument("--steps", type=int, default=16)
+    p.add_argument("--each-line", action="store_true", help="also sweep every line on its own")
+    p.add_argument("--solver", default=None)
+    p.add_argument("--data", default="data")
+    p.add_argument("--out", default="outputs/sensitivity/sweep")
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser("ranges", help="shadow prices and their validity ranges for one scenario (needs highspy)")
+    p.add_argument("--scenario", default="hs")
+    p.add_argument("--demand-level", default="peak_demand")
+    p.add_argument("--lines", default="lines.csv", help="line dataset in --data")
+    p.add_argument("--data", default="data")
+    p.add_argument("--out", default="outputs/sensitivity/ranges")
+    p.set_defaults(func=cmd_ranges)
+
+    p = sub.add_parser("montecarlo", help="LMP and redispatch-cost distributions over sampled weather/demand draws")
+    p.add_argument("--scenario", default="hs")
+    p.add_argument("--demand-level", default="peak_demand")
+    p.add_argument("--lines", default="lines.csv", help="line dataset in --data")
+    p.add_argument("--draws", type=int, default=1000)
+    p.add_argument("--batch-size", type=int, default=250)
+    p.add_argument("--workers", type=int, default=1, help="worker processes (batches are seeded, results do not depend on this)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--wind-sigma", type=float, default=Uncertainty.wind_sigma)
+    p.add_argument("--solar-sigma", type=float, default=Uncertainty.solar_sigma)
+    p.add_argument("--demand-sigma", type=float, default=Uncertainty.demand_sigma)
+    p.add_argument("--spatial-corr", type=float, default=Uncertainty.spatial_corr)
+    p.add_argument("--quantiles", nargs="+", type=float, default=[0.05, 0.5, 0.95])
+    p.add_argument("--check-lp", action="store_true",
+                   help="also solve the uniform dispatch LP of every draw and warn where it differs from the merit order")
+    p.add_argument("--solver", default=None, help="backend of the --check-lp dispatch LP (default: first available)")
+    p.add_argument("--data", default="data")
+    p.add_argument("--out", default="outputs/montecarlo")
+    p.set_defaults(func=cmd_montecarlo)
+
+    p = sub.add_parser("zonal", help="zonal pricing for given or enumerated bidding-zone splits")
+    p.add_argument("--zones", nargs="+", help='zonings as node groups, e.g. "1,2,3|4,5,6"')
+    p.add_argument("--zones-file", default=None, help="CSV with node and zone columns")
+    p.add_argument("--enumerate", nargs="+", type=int, metavar="K", help="also rank every split into K connected zones")
+    p.add_argument("--mode", default="ntc", choices=["ntc", "fb"], help="NTC border limits or flow-based zonal PTDFs")
+    p.add_argument("--cnec", default="border", choices=["border", "all"], help="fb: lines whose flows are limited")
+    p.add_argument("--gsk", default="demand", choices=["demand", "flat"], help="fb: generation shift keys")
+    p.add_argument("--scenarios", nargs="+", default=runner.SCENARIOS)
+    p.add_argument("--demand-levels", nargs="+", default=runner.DEMAND_LEVELS)
+    p.add_argument("--lines", default="lines.csv", help="line dataset in --data")
+    p.add_argument("--redispatch", default="optimal", choices=["heuristic", "optimal"])
+    p.add_argument("--rank-by", default="RedispatchCost",
+                   choices=["RedispatchCost", "TotalPaid", "SystemCost", "Curtailment", "Violations"])
+    p.add_argument("--workers", type=int, default=None, help="worker processes for the ranking (default: all cores)")
+    p.add_argument("--solver", default=None)
+    p.add_argument("--data", default="data")
+    p.add_argument("--out", default="outputs/zonal")
+    p.set_defaults(func=cmd_zonal)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+# Shared model code used by the nodal, uniform and sensitivity scripts.
+#
+# The scripts are run from the repository root (e.g. `python scripts/nodal/nodalmodel.py`),
+# so they add `scripts/` to sys.path before importing from this package.
@@ -0,0 +1,149 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Incremental nodal vs uniform comparison tables.
+#
+# The runner hands every finished grid point to a ScenarioAggregator, which only
+# keeps running count / sum / min / max of a fixed set of system metrics per group
+# (by default per weather scenario and demand level). Memory therefore depends on the
+# number of groups, not on the number of runs, and the comparison tables can be
+# written at any point:
+#
+#   aggregator = ScenarioAggregator(by=["Scenario", "DemandLevel"])
+#   runner.run_grid(tasks, aggregator=aggregator, keep=False)
+#   aggregator.write("outputs/run")       # comparison.csv, totals.csv
+#
+# Metrics per track (source columns in brackets):
+#   nodal    SystemCost (TotalCost), TotalPaid, Surplus (TotalSurplus)
+#   uniform  SystemCost (Adjusted_TEC, after redispatch), MarketCost (TotalCost),
+#            TotalPaid (Adjusted_TPC), Surplus (Total_Surplus), RedispatchCost,
+#            Curtailment (Curtailment_MWh), Violations
+
+TRACK_METRICS = {
+    "nodal": {
+        "SystemCost": "TotalCost",
+        "TotalPaid": "TotalPaid",
+        "Surplus": "TotalSurplus",
+    },
+    "uniform": {
+        "SystemCost": "Adjusted_TEC",
+        "MarketCost": "TotalCost",
+        "TotalPaid": "Adjusted_TPC",
+        "Surplus": "Total_Surplus",
+        "RedispatchCost": "Redispatch_Cost",
+        "Curtailment": "Curtailment_MWh",
+        "Violations": "Violations",
+    },
+}
+
+# Metrics reported side by side, with Difference = Uniform - Nodal
+COMPARED = ["SystemCost", "TotalPaid", "Surplus"]
+
+
+class RunningTotals:
+    """Count, sum, min and max of a fixed list of metrics per group; missing values (None/NaN) are skipped."""
+
+    def __init__(self, metrics):
+        self.metrics = list(metrics)
+        self.groups = {}
+
+    def add(self, group, values):
+        row = np.array([np.nan if values.get(m) is None else values[m] for m in self.metrics], dtype=float)
+        valid = ~np.isnan(row)
+        if group not in self.groups:
+            n = len(self.metrics)
+            self.groups[group] = {
+                "runs": 0,
+                "count": np.zeros(n, dtype=np.int64),
+                "sum": np.zeros(n),
+                "min": np.full(n, np.inf),
+                "max": np.full(n, -np.inf),
+            }
+        state = self.groups[group]
+        state["runs"] += 1
+        state["count"] += valid
+        state["sum"] += np.where(valid, row, 0.0)
+        state["min"] = np.fmin(state["min"], np.where(valid, row, np.inf))
+        state["max"] = np.fmax(state["max"], np.where(valid, row, -np.inf))
+
+    def mean(self, group):
+        state = self.groups[group]
+        return np.where(state["count"] > 0, state["sum"] / np.maximum(state["count"], 1), np.nan)
+
+
+class ScenarioAggregator:
+
+    def __init__(self, by=("Scenario", "DemandLevel"), order=None):
+        """by: key columns to group on; order: {column: values} giving the row order of the tables."""
+        self.by = list(by)
+        self.order = order or {}
+        self.tracks = {track: RunningTotals(metrics) for track, metrics in TRACK_METRICS.items()}
+
+    def add(self, keys, totals):
+        """One finished run: keys as from the runner, totals {track: {source column: value}}."""
+        group = tuple(keys[k] for k in self.by)
+        for track, values in totals.items():
+            source = TRACK_METRICS[track]
+            self.tracks[track].add(group, {m: values.get(col) for m, col in source.items()})
+
+    def _groups(self):
+        groups = list(dict.fromkeys(g for totals in self.tracks.values() for g in totals.groups))
+
+        def rank(group):
+            return tuple(
+                (self.order[col].index(v), "") if v in self.order.get(col, []) else (len(self.order.get(col, [])), str(v))
+                for col, v in zip(self.by, group)
+            )
+        return sorted(groups, key=rank)
+
+    def totals(self):
+        """Long table: <by>, Track, Metric, Runs, Count, Sum, Mean, Min, Max."""
+        rows = []
+        for group in self._groups():
+            for track, totals in self.tracks.items():
+                if group not in totals.groups:
+                    continue
+                state = totals.groups[group]
+                mean = totals.mean(group)
+                for k, metric in enumerate(totals.metrics):
+                    empty = state["count"][k] == 0
+                    rows.append({
+                        **dict(zip(self.by, group)),
+                        "Track": track,
+                        "Metric": metric,
+                        "Runs": state["runs"],
+                        "Count": state["count"][k],
+                        "Sum": state["sum"][k],
+                        "Mean": mean[k],
+                        "Min": np.nan if empty else state["min"][k],
+                        "Max": np.nan if empty else state["max"][k],
+                    })
+        return pd.DataFrame(rows)
+
+    def comparison(self):
+        """One row per group: mean nodal and uniform metrics side by side and their difference."""
+        nodal, uniform = self.tracks["nodal"], self.tracks["uniform"]
+        rows = []
+        for group in self._groups():
+            n = dict(zip(nodal.metrics, nodal.mean(group))) if group in nodal.groups else {}
+            u = dict(zip(uniform.metrics, uniform.mean(group))) if group in uniform.groups else {}
+            row = {
+                **dict(zip(self.by, group)),
+                "Runs_Nodal": nodal.groups[group]["runs"] if n else 0,
+                "Runs_Uniform": uniform.groups[group]["runs"] if u else 0,
+            }
+            for metric in COMPARED:
+                row[f"Nodal_{metric}"] = n.get(metric, np.nan)
+                row[f"Uniform_{metric}"] = u.get(metric, np.nan)
+                row[f"{metric}_Difference"] = row[f"Uniform_{metric}"] - row[f"Nodal_{metric}"]
+            for metric in ["MarketCost", "RedispatchCost", "Curtailment", "Violations"]:
+                row[f"Uniform_{metric}"] = u.get(metric, np.nan)
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def write(self, out_dir):
+        os.makedirs(out_dir, exist_ok=True)
+        self.comparison().to_csv(os.path.join(out_dir, "comparison.csv"), index=False)
+        self.totals().to_csv(os.path.join(out_dir, "totals.csv"), index=False)
@@ -0,0 +1,199 @@
+import pyomo.environ as pyo
+
+from gridmodel.meritorder import tie_break
+
+
+# ========== Adjacency Indexes ==========
+# The original balance rules scanned every generator and every line for each node,
+# which makes model construction O(N·(G+L)). Building the node → generator and
+# node → line lookups once keeps every constraint rule O(degree).
+
+def build_adjacency(nodes, gens, lines):
+    gens_at = {n: [] for n in nodes}
+    lines_in = {n: [] for n in nodes}
+    lines_out = {n: [] for n in nodes}
+
+    for g in gens:
+        gens_at[g[0]].append(g)
+
+    for (i, j) in lines:
+        lines_out[i].append((i, j))
+        lines_in[j].append((i, j))
+
+    return gens_at, lines_in, lines_out
+
+
+# ========== Nodal Market Clearing (DC-OPF) ==========
+
+def build_nodal_model(nodes, available_capacity, costs, line_cap, nodal_demand, reactance=None):
+    """Nodal dispatch model with the same components and names as nodalmodel.py.
+
+    reactance (per line, from gridmodel.data.line_reactances) defaults to 1, i.e.
+    flow = theta_i - theta_j as in nodalmodel.py.
+    """
+    nodes = list(nodes)
+    gens = list(available_capacity.keys())
+    lines = list(line_cap.keys())
+    gens_at, lines_in, lines_out = build_adjacency(nodes, gens, lines)
+
+    model = pyo.ConcreteModel()
+    model.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+    model.rc = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+
+    model.NODES = pyo.Set(initialize=nodes)
+    model.LINES = pyo.Set(initialize=lines, dimen=2)
+    model.GENS = pyo.Set(initialize=gens, dimen=2)
+
+    # Mutable inputs: a scenario loop can overwrite these and re-solve the same model
+    model.capacity = pyo.Param(model.GENS, initialize=available_capacity, mutable=True)
+    model.demand = pyo.Param(model.NODES, initialize=nodal_demand, mutable=True)
+    model.line_limit = pyo.Param(model.LINES, initialize=line_cap, mutable=True)
+    model.reactance = pyo.Param(model.LINES, initialize=1.0 if reactance is None else reactance, mutable=True)
+
+    model.p_gen = pyo.Var(model.GENS, domain=pyo.NonNegativeReals)
+    model.p_flow = pyo.Var(model.LINES, domain=pyo.Reals)
+    model.theta = pyo.Var(model.NODES, domain=pyo.Reals)
+
+    # Objective: Minimize total system cost
+    model.OBJ = pyo.Objective(
+        expr=pyo.quicksum(costs[g] * model.p_gen[g] for g in gens),
+        sense=pyo.minimize,
+    )
+
+    # Nodal balance: gen + inflow - outflow = demand
+    def nodal_balance_rule(m, n):
+        gen_sum = pyo.quicksum(m.p_gen[g] for g in gens_at[n])
+        inflow = pyo.quicksum(m.p_flow[l] for l in lines_in[n])
+        outflow = pyo.quicksum(m.p_flow[l] for l in lines_out[n])
+        return gen_sum + inflow - outflow == m.demand[n]
+    model.NodalBalance = pyo.Constraint(model.NODES, rule=nodal_balance_rule)
+
+    # Generator capacity limits
+    def gen_capacity_rule(m, n, tech):
+        return m.p_gen[(n, tech)] <= m.capacity[(n, tech)]
+    model.GenCapacity = pyo.Constraint(model.GENS, rule=gen_capacity_rule)
+
+    # Line capacity limits
+    def line_capacity_rule_pos(m, i, j):
+        return m.p_flow[(i, j)] <= m.line_limit[(i, j)]
+    def line_capacity_rule_neg(m, i, j):
+        return m.p_flow[(i, j)] >= -m.line_limit[(i, j)]
+    model.LineCapacityPos = pyo.Constraint(model.LINES, rule=line_capacity_rule_pos)
+    model.LineCapacityNeg = pyo.Constraint(model.LINES, rule=line_capacity_rule_neg)
+
+    # DC Load Flow approximation: x * flow = theta_i - theta_j
+    def dc_flow_rule(m, i, j):
+        return m.reactance[(i, j)] * m.p_flow[(i, j)] == m.theta[i] - m.theta[j]
+    model.DCFlow = pyo.Constraint(model.LINES, rule=dc_flow_rule)
+
+    return model
+
+
+# ========== Uniform Dispatch (copper plate) ==========
+
+def build_uniform_model(available_capacity, costs, total_demand):
+    """Single-zone dispatch model from uniform_1_dispatch.py.
+
+    The objective breaks ties between units of equal cost in supply order
+    (gridmodel.meritorder.tie_break); GenerationCost is the cost without the tie-break.
+    """
+    gens = list(available_capacity.keys())
+    tied = dict(zip(gens, tie_break([costs[g] for g in gens])))
+
+    model = pyo.ConcreteModel()
+    model.GENS = pyo.Set(initialize=gens, dimen=2)
+
+    model.capacity = pyo.Param(model.GENS, initialize=available_capacity, mutable=True)
+    model.total_demand = pyo.Param(initialize=total_demand, mutable=True)
+
+    model.p_gen = pyo.Var(model.GENS, domain=pyo.NonNegativeReals)
+
+    model.GenerationCost = pyo.Expression(expr=pyo.quicksum(costs[g] * model.p_gen[g] for g in gens))
+    model.OBJ = pyo.Objective(
+        expr=pyo.quicksum(tied[g] * model.p_gen[g] for g in gens),
+        sense=pyo.minimize,
+    )
+
+    model.DemandConstraint = pyo.Constraint(
+        expr=pyo.quicksum(model.p_gen[g] for g in gens) == model.total_demand
+    )
+
+    def gen_capacity_rule(m, n, tech):
+        return m.p_gen[(n, tech)] <= m.capacity[(n, tech)]
+    model.GenCapacity = pyo.Constraint(model.GENS, rule=gen_capacity_rule)
+
+    return model
+
+
+
+# ========== Cost-Based Redispatch ==========
+
+# Small penalty per MW moved so that zero-cost swaps between units with equal
+# marginal cost are not reported as redispatch volume
+REDISPATCH_PENALTY = 1e-3
+
+
+def build_redispatch_model(nodes, base_dispatch, available_capacity, costs, line_cap, nodal_demand, reactance=None):
+    """Cheapest deviation from a market dispatch that satisfies the DC network limits.
+
+    Units ramped up are paid their marginal cost, units ramped down refund it
+    (cost-based redispatch), so the objective is the net change in system cost.
+    """
+    nodes = list(nodes)
+    gens = list(available_capacity.keys())
+    lines = list(line_cap.keys())
+    gens_at, lines_in, lines_out = build_adjacency(nodes, gens, lines)
+
+    model = pyo.ConcreteModel()
+    model.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+
+    model.NODES = pyo.Set(initialize=nodes)
+    model.LINES = pyo.Set(initialize=lines, dimen=2)
+    model.GENS = pyo.Set(initialize=gens, dimen=2)
+
+    model.base = pyo.Param(model.GENS, initialize=base_dispatch, mutable=True)
+    model.capacity = pyo.Param(model.GENS, initialize=available_capacity, mutable=True)
+    model.demand = pyo.Param(model.NODES, initialize=nodal_demand, mutable=True)
+    model.line_limit = pyo.Param(model.LINES, initialize=line_cap, mutable=True)
+    model.reactance = pyo.Param(model.LINES, initialize=1.0 if reactance is None else reactance, mutable=True)
+
+    model.p_up = pyo.Var(model.GENS, domain=pyo.NonNegativeReals)
+    model.p_down = pyo.Var(model.GENS, domain=pyo.NonNegativeReals)
+    model.p_flow = pyo.Var(model.LINES, domain=pyo.Reals)
+    model.theta = pyo.Var(model.NODES, domain=pyo.Reals)
+
+    model.OBJ = pyo.Objective(
+        expr=pyo.quicksum(
+            (costs[g] + REDISPATCH_PENALTY) * model.p_up[g] - (costs[g] - REDISPATCH_PENALTY) * model.p_down[g]
+            for g in gens
+        ),
+        sense=pyo.minimize,
+    )
+
+    def nodal_balance_rule(m, n):
+        gen_sum = pyo.quicksum(m.base[g] + m.p_up[g] - m.p_down[g] for g in gens_at[n])
+        inflow = pyo.quicksum(m.p_flow[l] for l in lines_in[n])
+        outflow = pyo.quicksum(m.p_flow[l] for l in lines_out[n])
+        return gen_sum + inflow - outflow == m.demand[n]
+    model.NodalBalance = pyo.Constraint(model.NODES, rule=nodal_balance_rule)
+
+    # Redispatched output stays within [0, available capacity]
+    def up_limit_rule(m, n, tech):
+        return m.base[(n, tech)] + m.p_up[(n, tech)] <= m.capacity[(n, tech)]
+    def down_limit_rule(m, n, tech):
+        return m.p_down[(n, tech)] <= m.base[(n, tech)]
+    model.UpLimit = pyo.Constraint(model.GENS, rule=up_limit_rule)
+    model.DownLimit = pyo.Constraint(model.GENS, rule=down_limit_rule)
+
+    def line_capacity_rule_pos(m, i, j):
+        return m.p_flow[(i, j)] <= m.line_limit[(i, j)]
+    def line_capacity_rule_neg(m, i, j):
+        return m.p_flow[(i, j)] >= -m.line_limit[(i, j)]
+    model.LineCapacityPos = pyo.Constraint(model.LINES, rule=line_capacity_rule_pos)
+    model.LineCapacityNeg = pyo.Constraint(model.LINES, rule=line_capacity_rule_neg)
+
+    def dc_flow_rule(m, i, j):
+        return m.reactance[(i, j)] * m.p_flow[(i, j)] == m.theta[i] - m.theta[j]
+    model.DCFlow = pyo.Constraint(model.LINES, rule=dc_flow_rule)
+
+    return model
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+import pandas as pd
+
+from gridmodel.data import frame_fingerprint
+from gridmodel.engine import resolve_solver
+
+# Content-addressed store for solved scenarios. The key is a hash of exactly the
+# inputs a solve depends on — the supply and lines tables, the one demand column, the
+# weather rows of the one scenario and the solver — so editing an unrelated scenario,
+# a plot script or an output table does not invalidate anything, while any change to
+# the data of a scenario gives it a new key and it is solved again.
+#
+#   cache = ResultCache()
+#   df = solve_nodal(supply, lines, demand, weather, "hs", "peak_demand", cache=cache)
+#
+# Entries are pickled to <root>/<key[:2]>/<key>.pkl. Reads refresh an entry's mtime,
+# and after every write the least recently used entries are removed until the cache
+# is below max_bytes. Writes go through a temporary file and os.replace, so worker
+# processes can share one cache directory.
+
+DEFAULT_DIR = ".cache/results"
+DEFAULT_MAX_BYTES = 512 * 2**20
+
+# Bump when the layout of a cached entry changes, so old entries are not served
+CACHE_VERSION = 4
+
+
+def input_key(kind, *parts):
+    """sha1 over the parts; DataFrames are hashed by content, everything else by repr."""
+    h = hashlib.sha1(f"{kind}:v{CACHE_VERSION}".encode())
+    for part in parts:
+        h.update(b"|")
+        h.update((frame_fingerprint(part) if isinstance(part, pd.DataFrame) else repr(part)).encode())
+    return h.hexdigest()
+
+
+def scenario_key(kind, supply, lines, demand, weather, scenario_name, demand_level, solver_name=None, **options):
+    """Key of one (scenario, demand level) solve; options are extra settings such as the redispatch mode."""
+    return input_key(
+        kind,
+        supply,
+        lines,
+        demand[["node", demand_level]],
+        weather[weather["scenario"] == scenario_name],
+        resolve_solver(solver_name),
+        sorted(options.items()),
+    )
+
+
+class ResultCache:
+
+    def __init__(self, root=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.pkl")
+
+    def get(self, key):
+        """Cached entry for key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            os.utime(path)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.evict()
+
+    def entries(self):
+        """(mtime, size, path) of every entry, least recently used first."""
+        found = []
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith(".pkl"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue    # evicted by another process
+                found.append((st.st_mtime, st.st_size, path))
+        return sorted(found)
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
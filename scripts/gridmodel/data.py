@@ -0,0 +1,231 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+RENEWABLE_TYPES = ["onshorewind", "offshorewind", "solar"]
+
+# Availability tables are memoized per input fingerprint (a hash of the file bytes
+# or of the DataFrame contents): the weather-adjusted capacity of every scenario is
+# computed once, as one (scenario x generator) array, and the scenario loops in the
+# scripts only pick a row of it with availability(...).for_scenario(). The Pyomo
+# model those rows feed is likewise built once per script (gridmodel.engine
+# ScenarioEngine); later scenarios only overwrite its mutable capacity and demand
+# params.
+_AVAILABILITY_CACHE = OrderedDict()
+_CACHE_SIZE = 16
+
+
+# Required columns of the input files; demand.csv has one further column per demand
+# level and weatherprofiles.csv one <tech>_profile column per renewable type.
+COLUMNS = {
+    "supply": ["node", "type", "mc", "adjusted_capacity"],
+    "lines": ["from_node", "to_node", "linecap"],
+    "demand": ["node"],
+    "weather": ["scenario", "node"],
+}
+
+
+def load_inputs(data_dir="data", lines_file="lines.csv"):
+    """supply, lines, demand, weather DataFrames, checked with validate_inputs."""
+    supply = read_csv(f"{data_dir}/supply_adjusted.csv")
+    lines = read_csv(f"{data_dir}/{lines_file}")
+    demand = read_csv(f"{data_dir}/demand.csv")
+    weather = read_csv(f"{data_dir}/weatherprofiles.csv")
+    validate_inputs(supply, lines, demand, weather)
+    return supply, lines, demand, weather
+
+
+# ========== Reading and Validation ==========
+
+def clean_header(name):
+    # Excel writes a UTF-8 byte order mark before the first header; read as cp1252 or
+    # latin-1 it shows up as "ï»¿"
+    return str(name).replace("\ufeff", "").replace("ï»¿", "").strip()
+
+
+def read_csv(path, **kwargs):
+    """pd.read_csv with byte order marks and surrounding blanks removed from the headers."""
+    df = pd.read_csv(path, encoding=kwargs.pop("encoding", "utf-8-sig"), **kwargs)
+    df.columns = [clean_header(c) for c in df.columns]
+    return df
+
+
+def validate_inputs(supply, lines, demand, weather):
+    """Raise ValueError listing every problem found in the model inputs.
+
+    Checks required columns, missing and negative values, duplicate generators, lines,
+    demand nodes and weather rows, self-loops, profiles outside [0, 1], non-positive
+    line reactances, and nodes in supply, lines and weather that have no row in demand.
+    """
+    problems = []
+    tables = {"supply": supply, "lines": lines, "demand": demand, "weather": weather}
+    for name, df in tables.items():
+        headers = [clean_header(c) for c in df.columns]
+        if headers != list(df.columns):
+            problems.append(f"{name}: unclean headers {list(df.columns)} (read with gridmodel.data.read_csv)")
+        missing = [c for c in COLUMNS[name] if c not in headers]
+        if missing:
+            problems.append(f"{name}: missing columns {missing}")
+    if problems:
+        raise ValueError("Invalid inputs:\n  " + "\n  ".join(problems))
+
+    levels = [c for c in demand.columns if c != "node"]
+    profile_cols = [c for c in weather.columns if c.endswith("_profile")]
+    numeric = {
+        "supply": ["node", "mc", "adjusted_capacity"],
+        "lines": ["from_node", "to_node", "linecap"] + [c for c in ["reactance"] if c in lines.columns],
+        "demand": ["node"] + levels,
+        "weather": ["node"] + profile_cols,
+    }
+    for name, cols in numeric.items():
+        df = tables[name]
+        for c in cols:
+            if not pd.api.types.is_numeric_dtype(df[c]):
+                problems.append(f"{name}: column {c!r} is not numeric")
+            elif df[c].isna().any():
+                problems.append(f"{name}: {int(df[c].isna().sum())} missing values in {c!r}")
+    if supply["type"].isna().any() or weather["scenario"].isna().any():
+        problems.append("supply/weather: missing generator types or scenario names")
+    if problems:
+        raise ValueError("Invalid inputs:\n  " + "\n  ".join(problems))
+
+    if not levels:
+        problems.append("demand: no demand level columns")
+    for name, cols in [("supply", ["mc", "adjusted_capacity"]), ("lines", ["linecap"]), ("demand", levels)]:
+        for c in cols:
+            if (tables[name][c] < 0).any():
+                problems.append(f"{name}: negative values in {c!r}")
+    if "reactance" in lines.columns and (lines["reactance"] <= 0).any():
+        problems.append("lines: reactance must be positive")
+    outside = (weather[profile_cols] < 0) | (weather[profile_cols] > 1)
+    if outside.to_numpy().any():
+        problems.append(f"weather: {int(outside.to_numpy().sum())} profile values outside [0, 1]")
+
+    if demand["node"].duplicated().any():
+        problems.append(f"demand: duplicate nodes {sorted(demand.loc[demand['node'].duplicated(), 'node'].tolist())}")
+    if supply.duplicated(["node", "type"]).any():
+        problems.append("supply: duplicate (node, type) generators")
+    if weather.duplicated(["scenario", "node"]).any():
+        problems.append("weather: duplicate (scenario, node) rows")
+    ends = pd.DataFrame(np.sort(lines[["from_node", "to_node"]].to_numpy(), axis=1))
+    if ends.duplicated().any():
+        problems.append("lines: parallel or duplicate lines")
+    if (lines["from_node"] == lines["to_node"]).any():
+        problems.append("lines: self-loops")
+
+    nodes = set(demand["node"].tolist())
+    for name, cols in [("supply", ["node"]), ("lines", ["from_node", "to_node"]), ("weather", ["node"])]:
+        unknown = sorted(set(tables[name][cols].to_numpy().ravel().tolist()) - nodes)
+        if unknown:
+            problems.append(f"{name}: nodes {unknown} not in demand")
+
+    if problems:
+        raise ValueError("Invalid inputs:\n  " + "\n  ".join(problems))
+
+
+# ========== Fingerprints ==========
+
+def file_fingerprint(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def frame_fingerprint(df):
+    h = hashlib.sha1()
+    h.update(",".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+# ========== Weather-Adjusted Availability ==========
+
+class AvailabilityTable:
+    """Available capacity for every (scenario, generator) pair.
+
+    capacity[s, g] = adjusted_capacity[g] * multiplier, where the multiplier is the
+    weather profile for renewables (0 if the node has no profile in that scenario)
+    and 1 for conventional units — the same rule the model scripts applied row by row.
+    """
+
+    def __init__(self, scenarios, gens, capacity, mc, base_capacity, is_renewable):
+        self.scenarios = list(scenarios)
+        self.gens = list(gens)              # (node, tech) in supply file order
+        self.capacity = capacity            # (scenario x generator) array
+        self.mc = mc                        # (generator,) array
+        self.base_capacity = base_capacity
+        self.is_renewable = is_renewable
+        self.scenario_index = {s: k for k, s in enumerate(self.scenarios)}
+
+    def row(self, scenario_name):
+        if scenario_name in self.scenario_index:
+            return self.capacity[self.scenario_index[scenario_name]]
+        # Unknown scenario: no weather profile, so renewables are unavailable
+        return np.where(self.is_renewable, 0.0, self.base_capacity)
+
+    def for_scenario(self, scenario_name):
+        """available_capacity and costs dicts keyed by (node, tech) for one scenario."""
+        return dict(zip(self.gens, self.row(scenario_name).tolist())), dict(zip(self.gens, self.mc.tolist()))
+
+
+def compute_availability(supply, weather):
+    scenarios = list(dict.fromkeys(weather["scenario"]))
+    profile_cols = [f"{t}_profile" for t in RENEWABLE_TYPES if f"{t}_profile" in weather.columns]
+
+    # Long format (scenario, node, type, multiplier), then one column per generator
+    profiles = weather.melt(id_vars=["scenario", "node"], value_vars=profile_cols, var_name="type", value_name="multiplier")
+    profiles["type"] = profiles["type"].str.slice(stop=-len("_profile"))
+    profiles = profiles.drop_duplicates(["scenario", "node", "type"], keep="first")
+    table = profiles.pivot(index="scenario", columns=["node", "type"], values="multiplier").reindex(scenarios)
+
+    gens = list(zip(supply["node"].tolist(), supply["type"].tolist()))
+    multiplier = table.reindex(columns=pd.MultiIndex.from_tuples(gens)).to_numpy(dtype=float)
+
+    is_renewable = supply["type"].isin(RENEWABLE_TYPES).to_numpy()
+    multiplier[:, ~is_renewable] = 1
+    multiplier[:, is_renewable] = np.nan_to_num(multiplier[:, is_renewable], nan=0.0)
+
+    base_capacity = supply["adjusted_capacity"].to_numpy(dtype=float)
+    return AvailabilityTable(scenarios, gens, multiplier * base_capacity, supply["mc"].to_numpy(), base_capacity, is_renewable)
+
+
+def availability(supply, weather):
+    """Memoized compute_availability; supply/weather may be DataFrames or CSV paths."""
+    key = tuple(
+        file_fingerprint(x) if isinstance(x, str) else frame_fingerprint(x)
+        for x in (supply, weather)
+    )
+    if key in _AVAILABILITY_CACHE:
+        _AVAILABILITY_CACHE.move_to_end(key)
+        return _AVAILABILITY_CACHE[key]
+
+    if isinstance(supply, str):
+        supply = read_csv(supply)
+    if isinstance(weather, str):
+        weather = read_csv(weather)
+
+    table = compute_availability(supply, weather)
+    _AVAILABILITY_CACHE[key] = table
+    if len(_AVAILABILITY_CACHE) > _CACHE_SIZE:
+        _AVAILABILITY_CACHE.popitem(last=False)
+    return table
+
+
+def scenario_inputs(supply, weather, scenario_name):
+    """available_capacity and costs keyed by (node, tech), as built in the model scripts."""
+    return availability(supply, weather).for_scenario(scenario_name)
+
+
+def line_capacities(lines):
+    return dict(zip(zip(lines["from_node"].tolist(), lines["to_node"].tolist()), lines["linecap"].tolist()))
+
+
+def line_reactances(lines):
+    """Reactance by line from the optional `reactance` column; None without it (all lines 1)."""
+    if "reactance" not in lines.columns:
+        return None
+    return dict(zip(zip(lines["from_node"].tolist(), lines["to_node"].tolist()), lines["reactance"].tolist()))
@@ -0,0 +1,157 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# LMP decomposition from the duals of a solved nodal model.
+#
+# In the DC OPF the LMPs are tied to the line-limit duals by the PTDFs. With a
+# reference bus r and PTDFs that are referenced to it (PTDF_r[l, n] = PTDF[l, n] -
+# PTDF[l, r]), every LMP splits into
+#
+#   LMP[n] = Energy + Σ_l mu[l] * PTDF_r[l, n] + Loss[n]
+#
+#   Energy        LMP at the reference bus (the same for all nodes)
+#   mu[l]         net shadow price of line l's flow, DualPos + DualNeg (€/MW, <= 0
+#                 when the line is binding in its from -> to direction)
+#   congestion    the sum, and its per-line terms mu[l] * PTDF_r[l, n]
+#   Loss          0: the model is lossless. Kept so the table matches the usual
+#                 energy/congestion/loss layout
+#
+# In the N-1 model (gridmodel.security) a binding contingency constraint on line l for
+# the outage of line k acts like a line with PTDF row PTDF_r[l] + LODF[l, k] * PTDF_r[k],
+# and is added to the congestion term the same way.
+#
+# Residual = LMP - Energy - Congestion - Loss is ~0 whenever the LMPs and line duals
+# come from the same solve, so it doubles as a consistency check. Everything is
+# computed from the stored LMPs and line duals, for any number of scenarios at once
+# (arrays K x N and K x L). No re-solve is needed.
+
+
+@dataclass
+class LMPComponents:
+    nodes: list
+    lines: list
+    ref: object                 # reference node
+    lmp: np.ndarray             # (K x N)
+    energy: np.ndarray          # (K,)
+    congestion: np.ndarray      # (K x N)
+    by_line: np.ndarray         # (K x L x N) congestion contribution of each line
+    loss: np.ndarray            # (K x N), zero in the DC model
+    residual: np.ndarray        # (K x N)
+
+
+def referenced_ptdf(ptdf, ref=None):
+    """(L x N) PTDFs for injections withdrawn at ref (default: the PTDF slack node)."""
+    r = ptdf.node_index[ptdf.slack if ref is None else ref]
+    return ptdf.ptdf - ptdf.ptdf[:, [r]]
+
+
+def decompose_lmps(ptdf, lmp, mu, ref=None, contingency=None):
+    """Split (K x N) LMPs in ptdf.nodes order, given (K x L) net line duals in ptdf.lines order.
+
+    ptdf is a gridmodel.ptdf.PTDFEngine; ref defaults to its slack node. contingency is
+    the (K x N) congestion term of N-1 constraints, if any.
+    """
+    lmp = np.atleast_2d(np.asarray(lmp, dtype=float))
+    mu = np.atleast_2d(np.asarray(mu, dtype=float))
+    ref = ptdf.slack if ref is None else ref
+    r = ptdf.node_index[ref]
+
+    shifted = referenced_ptdf(ptdf, ref)
+    by_line = mu[:, :, None] * shifted[None, :, :]
+    congestion = mu @ shifted
+    if contingency is not None:
+        congestion = congestion + contingency
+    energy = lmp[:, r]
+    loss = np.zeros_like(lmp)
+    residual = lmp - energy[:, None] - congestion - loss
+    return LMPComponents(ptdf.nodes, ptdf.lines, ref, lmp, energy, congestion, by_line, loss, residual)
+
+
+def decompose_tables(lmp, flows, ptdf, keys=("Scenario", "DemandLevel"), ref=None, contingencies=None, tol=1e-6):
+    """Decompose stacked result tables of many runs in one call.
+
+    lmp: <keys>, Node, LMP (as the store's nodal_lmp table); flows: <keys>, From, To,
+    DualPos, DualNeg (nodal_flows / gridmodel.nodal.line_duals); contingencies:
+    <keys>, Outage_From, Outage_To, From, To, PostFlow, Dual (the N-1 model's table).
+    All runs must share the topology of ptdf.
+
+    Returns (nodes, lines):
+      nodes  <keys>, Node, LMP, Energy, Congestion, Loss, Residual
+      lines  <keys>, From, To, Outage_From, Outage_To, Dual, Node, Contribution
+             (binding constraints only, |Dual| > tol; Outage_* empty for base-case limits)
+    """
+    keys = list(keys)
+    prices = lmp.pivot_table(index=keys, columns="Node", values="LMP", sort=False).reindex(columns=ptdf.nodes)
+    flows = flows.assign(Dual=flows["DualPos"].fillna(0) + flows["DualNeg"].fillna(0))
+    duals = (
+        flows.pivot_table(index=keys, columns=["From", "To"], values="Dual", sort=False)
+        .reindex(index=prices.index, columns=pd.MultiIndex.from_tuples(ptdf.lines))
+        .fillna(0)
+    )
+    K, N, L = len(prices), len(ptdf.nodes), len(ptdf.lines)
+
+    # N-1 constraints: dual * sign * (PTDF_r[l] + LODF[l, k] * PTDF_r[k]) per binding cut
+    extra, cut_rows = None, None
+    if contingencies is not None and len(contingencies):
+        cuts = contingencies[contingencies["Dual"].abs() > tol]
+        run = prices.index.get_indexer(
+            pd.MultiIndex.from_frame(cuts[keys]) if len(keys) > 1 else cuts[keys[0]]
+        )
+        line_index = {l: x for x, l in enumerate(ptdf.lines)}
+        l = np.array([line_index[x] for x in zip(cuts["From"], cuts["To"])], dtype=np.int64)
+        k = np.array([line_index[x] for x in zip(cuts["Outage_From"], cuts["Outage_To"])], dtype=np.int64)
+        shifted = referenced_ptdf(ptdf, ref)
+        rows = np.sign(cuts["PostFlow"].to_numpy())[:, None] * (shifted[l] + ptdf.lodf()[l, k, None] * shifted[k])
+        contribution = cuts["Dual"].to_numpy()[:, None] * rows
+        extra = np.zeros((K, N))
+        np.add.at(extra, run, contribution)
+        cut_rows = (cuts, run, contribution)
+
+    parts = decompose_lmps(ptdf, prices.to_numpy(), duals.to_numpy(), ref, extra)
+    run_keys = prices.index.to_frame(index=False)
+    nodes = pd.concat([
+        run_keys.loc[np.repeat(np.arange(K), N)].reset_index(drop=True),
+        pd.DataFrame({
+            "Node": np.tile(ptdf.nodes, K),
+            "LMP": parts.lmp.ravel(),
+            "Energy": np.repeat(parts.energy, N),
+            "Congestion": parts.congestion.ravel(),
+            "Loss": parts.loss.ravel(),
+            "Residual": parts.residual.ravel(),
+        }),
+    ], axis=1)
+
+    k, l = np.nonzero(np.abs(duals.to_numpy()) > tol)
+    k, l, n = np.repeat(k, N), np.repeat(l, N), np.tile(np.arange(N), len(k))
+    line_ends = np.array(ptdf.lines).reshape(L, 2)
+    frames = [pd.concat([
+        run_keys.loc[k].reset_index(drop=True),
+        pd.DataFrame({
+            "From": line_ends[l, 0],
+            "To": line_ends[l, 1],
+            "Outage_From": None,
+            "Outage_To": None,
+            "Dual": duals.to_numpy()[k, l],
+            "Node": np.asarray(ptdf.nodes)[n],
+            "Contribution": parts.by_line[k, l, n],
+        }),
+    ], axis=1)]
+    if cut_rows is not None:
+        cuts, run, contribution = cut_rows
+        C = len(cuts)
+        frames.append(pd.concat([
+            run_keys.loc[np.repeat(run, N)].reset_index(drop=True),
+            pd.DataFrame({
+                "From": np.repeat(cuts["From"].to_numpy(), N),
+                "To": np.repeat(cuts["To"].to_numpy(), N),
+                "Outage_From": np.repeat(cuts["Outage_From"].to_numpy(), N),
+                "Outage_To": np.repeat(cuts["Outage_To"].to_numpy(), N),
+                "Dual": np.repeat(cuts["Dual"].to_numpy(), N),
+                "Node": np.tile(ptdf.nodes, C),
+                "Contribution": contribution.ravel(),
+            }),
+        ], axis=1))
+    lines = pd.concat(frames, ignore_index=True)
+    return nodes, lines
@@ -0,0 +1,226 @@
+from functools import lru_cache
+
+import numpy as np
+import pyomo.environ as pyo
+from pyomo.common.collections import ComponentMap
+from pyomo.opt import SolverResults
+from pyomo.repn.plugins.standard_form import LinearStandardFormCompiler
+from scipy.optimize import linprog
+from scipy.sparse import diags
+
+from gridmodel import instrument
+
+# Solver backends, selected by name (--solver / solver_name):
+#
+#   highs   HiGHS through its Python bindings (pyomo appsi, persistent and in-process)
+#   gurobi, cplex   the same for the commercial solvers, if installed
+#   glpk    glpsol subprocess via an LP file (the thesis setup)
+#   scipy   the model is compiled straight to sparse matrices and solved with
+#           scipy.optimize.linprog; no file I/O and no subprocess
+#
+# Any other name is passed to pyo.SolverFactory unchanged. With no name the first
+# available persistent backend is used, falling back to GLPK. The persistent
+# interfaces keep the model loaded between solves: changes to mutable Params are
+# pushed to the solver as coefficient updates.
+BACKENDS = {
+    "highs": "appsi_highs",
+    "gurobi": "appsi_gurobi",
+    "cplex": "appsi_cplex",
+    "glpk": "glpk",
+}
+PERSISTENT_SOLVERS = ["highs", "gurobi", "cplex"]
+FALLBACK_SOLVER = "glpk"
+
+
+class LinprogSolver:
+    """Solve a Pyomo LP with scipy.optimize.linprog (HiGHS) from its sparse matrix form.
+
+    Mirrors the part of the Pyomo solver interface the scripts use: solve() returns a
+    SolverResults with status and termination condition and, for an optimal solve,
+    loads the primal values into the variables, the constraint duals into model.dual
+    and the reduced costs into model.rc. With load_solutions=False nothing is loaded
+    until load_vars(), get_duals() and get_reduced_costs() are called, as with the
+    appsi persistent solvers.
+    """
+
+    def __init__(self):
+        self._solution = None
+
+    def available(self, exception_flag=False):
+        return True
+
+    def solve(self, model, tee=False, load_solutions=True):
+        # Mixed form keeps each row's sense: 1 for <=, -1 for >=, 0 for ==
+        info = LinearStandardFormCompiler().write(model, mixed_form=True)
+        n_cols = len(info.columns)
+        c = info.c.toarray()[0] if info.c.shape[0] else np.zeros(n_cols)
+        sense = np.array([s for _, s in info.rows], dtype=int)
+        A = info.A.tocsr()
+        rhs = np.asarray(info.rhs, dtype=float)
+
+        ub_rows = np.flatnonzero(sense != 0)
+        eq_rows = np.flatnonzero(sense == 0)
+        sign = np.where(sense[ub_rows] < 0, -1.0, 1.0)      # >= rows are negated into <= rows
+        A_ub = diags(sign) @ A[ub_rows] if len(ub_rows) else None
+        b_ub = rhs[ub_rows] * sign if len(ub_rows) else None
+        A_eq = A[eq_rows] if len(eq_rows) else None
+        b_eq = rhs[eq_rows] if len(eq_rows) else None
+        bounds = [(v.lb, v.ub) for v in info.columns]
+
+        res = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, bounds=bounds, method="highs",
+                      options={"disp": tee})
+
+        results = SolverResults()
+        results.solver.name = "scipy_linprog"
+        results.solver.iterations = res.nit
+        self._solution = None
+        if res.status != 0:
+            results.solver.status = pyo.SolverStatus.warning
+            results.solver.termination_condition = (
+                pyo.TerminationCondition.infeasible if res.status == 2 else pyo.TerminationCondition.other
+            )
+            results.solver.message = res.message
+            return results
+
+        # linprog marginals are d(objective)/d(rhs), the sign convention of model.dual
+        duals = np.zeros(len(info.rows))
+        if len(ub_rows):
+            duals[ub_rows] = res.ineqlin.marginals * sign
+        if len(eq_rows):
+            duals[eq_rows] = res.eqlin.marginals
+        self._solution = (info, res.x, duals, res.lower.marginals + res.upper.marginals)
+
+        if load_solutions:
+            self.load_vars()
+            for name, get in (("dual", self.get_duals), ("rc", self.get_reduced_costs)):
+                if hasattr(model, name):
+                    getattr(model, name).clear()
+                    getattr(model, name).update(get())
+
+        results.solver.status = pyo.SolverStatus.ok
+        results.solver.termination_condition = pyo.TerminationCondition.optimal
+        return results
+
+    def load_vars(self):
+        info, x, _, _ = self._solution
+        for var, value in zip(info.columns, x):
+            var.set_value(value, skip_validation=True)
+        for var, expr in info.eliminated_vars:
+            var.set_value(pyo.value(expr), skip_validation=True)
+
+    def get_duals(self):
+        info, _, duals, _ = self._solution
+        result = ComponentMap()
+        for (con, _), y in zip(info.rows, duals):
+            result[con] = result.get(con, 0) + y        # a ranged constraint spans two rows
+        return result
+
+    def get_reduced_costs(self):
+        info, _, _, rc = self._solution
+        return ComponentMap(zip(info.columns, rc))
+
+
+def make_solver(name=None):
+    """Return (solver_name, solver). With name=None the first available persistent solver is used."""
+    if name == "scipy":
+        return name, LinprogSolver()
+    if name is not None:
+        return name, pyo.SolverFactory(BACKENDS.get(name, name))
+
+    for candidate in PERSISTENT_SOLVERS:
+        try:
+            solver = pyo.SolverFactory(BACKENDS[candidate])
+            if solver.available(exception_flag=False):
+                return candidate, solver
+        except Exception:
+            continue
+
+    return FALLBACK_SOLVER, pyo.SolverFactory(FALLBACK_SOLVER)
+
+
+@lru_cache(maxsize=None)
+def resolve_solver(name=None):
+    """Name of the solver make_solver(name) would pick, without keeping an instance."""
+    return make_solver(name)[0]
+
+
+class ScenarioEngine:
+    """Solve one model many times, changing only its mutable Params between solves.
+
+    Typical use with the nodal model from gridmodel.builder:
+
+        engine = ScenarioEngine(build_nodal_model(...))
+        for scenario_name in scenarios:
+            for demand_level in demand_levels:
+                engine.update(capacity=available_capacity, demand=nodal_demand)
+                results = engine.solve()
+    """
+
+    def __init__(self, model, solver_name=None):
+        self.model = model
+        self.solver_name, self.solver = make_solver(solver_name)
+
+    def update(self, **params):
+        # e.g. update(capacity={(1, "solar"): 5400.0, ...}, demand={1: 11411.7, ...})
+        for name, values in params.items():
+            component = getattr(self.model, name)
+            if isinstance(values, dict):
+                component.store_values(values)
+            else:
+                component.set_value(values)
+
+    def solve(self, label=""):
+        """Solve the model; returns the SolverResults, test them with optimal(results).
+
+        The solution is loaded only if the solve is optimal. Otherwise the variables are
+        left without values and the dual/rc suffixes empty (NaN in the extracted arrays),
+        so nothing from an earlier solve is reported for this one.
+        """
+        results = self.solver.solve(self.model, tee=False, load_solutions=False)
+
+        if optimal(results):
+            self.load_solution(results)
+        else:
+            print(f"WARNING: Solver failed for {label}")
+            self.clear_solution()
+
+        if instrument.active():
+            instrument.note_solve(self.model.nvariables(), self.model.nconstraints(), solver_iterations(self.solver, results))
+        return results
+
+    def load_solution(self, results):
+        model = self.model
+        if hasattr(self.solver, "load_vars"):       # appsi persistent solvers, LinprogSolver
+            self.solver.load_vars()
+            for name, get in (("dual", self.solver.get_duals), ("rc", self.solver.get_reduced_costs)):
+                if hasattr(model, name):
+                    getattr(model, name).clear()
+                    getattr(model, name).update(get())
+        else:
+            model.solutions.load_from(results)
+
+    def clear_solution(self):
+        model = self.model
+        for var in model.component_data_objects(pyo.Var):
+            if not var.fixed:
+                var.set_value(None)
+        for name in ("dual", "rc"):
+            if hasattr(model, name):
+                getattr(model, name).clear()
+
+
+def optimal(results):
+    """True if the solve behind results (from ScenarioEngine.solve) found an optimal solution."""
+    return (results.solver.status == pyo.SolverStatus.ok
+            and results.solver.termination_condition == pyo.TerminationCondition.optimal)
+
+
+def solver_iterations(solver, results):
+    """Simplex/barrier iterations of the last solve, where the backend reports them (else None)."""
+    native = getattr(solver, "_solver_model", None)     # model object of the appsi persistent solvers
+    if hasattr(native, "getInfo"):                      # highspy.Highs
+        info = native.getInfo()
+        return info.simplex_iteration_count + info.ipm_iteration_count
+    if hasattr(native, "IterCount"):                    # gurobipy.Model
+        return int(native.IterCount)
+    return getattr(results.solver, "iterations", None)
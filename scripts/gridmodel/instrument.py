@@ -0,0 +1,153 @@
+import cProfile
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource     # not available on Windows
+except ImportError:
+    resource = None
+
+# Per-stage run log.
+#
+# Pipeline stages are wrapped in `with stage(log, "nodal.solve", Scenario=..., ...)`.
+# Every stage that finishes appends one JSON line to the log file:
+#
+#   {"stage": "nodal.solve", "Scenario": "hs", "DemandLevel": "peak_demand",
+#    "wall_s": 0.031, "rss_mb": 182.4, "peak_mb": 1.2, "variables": 99,
+#    "constraints": 104, "iterations": 14, "solves": 1}
+#
+#   wall_s       wall time of the stage
+#   rss_mb       process peak resident memory so far (high-water mark, Unix only)
+#   peak_mb      peak extra Python memory during the stage (only with memory=True;
+#                uses tracemalloc, which slows allocation-heavy code)
+#   variables, constraints, iterations, solves
+#                filled in by the solver calls inside the stage (ScenarioEngine,
+#                SparseNodalModel); iterations are summed over the stage's solves
+#
+# With profile_dir set, each outermost stage also runs under cProfile and is dumped
+# to <profile_dir>/<stage>_<context>.prof (open with `python -m pstats` or snakeviz).
+#
+# Lines are written with one O_APPEND write each, so worker processes can share a log
+# file. With log=None, stage() does nothing and costs nothing.
+
+_ACTIVE = []    # records of the running stages, innermost last
+
+
+def note_solve(variables=None, constraints=None, iterations=None):
+    """Record model size and solver iterations on the innermost running stage, if any."""
+    if not _ACTIVE:
+        return
+    record = _ACTIVE[-1]
+    record["solves"] = record.get("solves", 0) + 1
+    if variables is not None:
+        record["variables"] = variables
+    if constraints is not None:
+        record["constraints"] = constraints
+    if iterations is not None:
+        record["iterations"] = record.get("iterations", 0) + iterations
+
+
+def active():
+    return bool(_ACTIVE)
+
+
+def _rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 2**10     # bytes on macOS, KiB elsewhere
+
+
+class StageLog:
+
+    def __init__(self, path=None, memory=False, profile_dir=None, **context):
+        """path: JSON-lines file (None keeps records in self.records); context is added to every record."""
+        self.path = path
+        self.memory = memory
+        self.profile_dir = profile_dir
+        self.context = context
+        self.records = []
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    def write(self, record):
+        if not self.path:
+            self.records.append(record)
+            return
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (json.dumps(record, default=str) + "\n").encode())
+        finally:
+            os.close(fd)
+
+    def _profile_path(self, record):
+        label = "_".join(str(v) for k, v in record.items() if k != "stage")
+        name = re.sub(r"[^\w.-]+", "-", f"{record['stage']}_{label}".strip("_"))
+        return os.path.join(self.profile_dir, f"{name}.prof")
+
+    @contextmanager
+    def stage(self, name, **context):
+        record = {"stage": name, **self.context, **context}
+        outer = list(_ACTIVE)
+
+        # Peak memory: fold the peak so far into the enclosing stages, then measure from here
+        started = False
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started = True
+            current, peak = tracemalloc.get_traced_memory()
+            for rec in outer:
+                rec["_peak"] = max(rec.get("_peak", 0), peak)
+            tracemalloc.reset_peak()
+            start_mem = current
+
+        profiler = None
+        if self.profile_dir and not outer:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        _ACTIVE.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["wall_s"] = time.perf_counter() - start
+            _ACTIVE.pop()
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(self._profile_path({"stage": name, **context}))
+            if self.memory:
+                peak = max(tracemalloc.get_traced_memory()[1], record.pop("_peak", 0))
+                record["peak_mb"] = (peak - start_mem) / 2**20
+                for rec in outer:
+                    rec["_peak"] = max(rec.get("_peak", 0), peak)
+                if started:
+                    tracemalloc.stop()
+            record["rss_mb"] = _rss_mb()
+            self.write(record)
+
+
+@contextmanager
+def stage(log, name, **context):
+    """log.stage(name, **context), or a no-op when log is None."""
+    if log is None:
+        yield {}
+    else:
+        with log.stage(name, **context) as record:
+            yield record
+
+
+def read_log(path):
+    """Records of a JSON-lines stage log as a DataFrame."""
+    with open(path) as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
@@ -0,0 +1,113 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# Closed-form uniform (copper-plate) market clearing.
+#
+# The uniform dispatch LP has one balance constraint and box bounds, so its optimum
+# is the merit order: units are sorted by marginal cost once and filled until
+# cumulative capacity reaches demand. With capacities as a (K x G) array and demand
+# as a (K,) vector, K demand levels or hours are cleared in a few array operations.
+#
+# Price: the marginal cost of the first unit (in merit order) where cumulative output
+# reaches demand - EPSILON, as in uniform_2_price.py. The cumulative output is
+# non-decreasing along each row, so the first such position is searchsorted(cum[k],
+# demand[k] - EPSILON) for every row k; counting the positions below the threshold,
+# (cum < threshold).sum(axis=1), gives all rows in one array operation.
+#
+# Ties: among units with equal marginal cost, clear() fills output in supply-file
+# order. The dispatch LP alone has many optimal vertices there, and which one a solver
+# returns is arbitrary; build_uniform_model therefore prices the LP with tie_break()
+# costs, which add TIE_STEP per position within each tie. That makes supply order the
+# LP's unique optimum, so clear() returns the LP's dispatch (not only its cost and
+# price) with any solver, and line flows, overloads and redispatch match as well.
+
+EPSILON = 0.01
+TIE_STEP = 1e-4     # €/MWh between consecutive units of equal marginal cost
+
+
+def tie_break(mc):
+    """Marginal costs plus TIE_STEP * (position among units of equal cost, in supply order).
+
+    The step is reduced where needed so that no unit moves past a unit of higher cost.
+    """
+    mc = np.asarray(mc, dtype=float)
+    order = np.argsort(mc, kind="stable")
+    sorted_mc = mc[order]
+    position = np.arange(len(mc))
+    first = np.r_[True, sorted_mc[1:] != sorted_mc[:-1]] if len(mc) else np.zeros(0, dtype=bool)
+    rank = position - np.maximum.accumulate(np.where(first, position, 0))
+
+    step = TIE_STEP
+    gaps = np.diff(sorted_mc[first])
+    if len(gaps) and rank.max() > 0:
+        step = min(step, gaps.min() / (rank.max() + 1))
+    broken = np.empty_like(mc)
+    broken[order] = sorted_mc + step * rank
+    return broken
+
+
+@dataclass
+class MeritOrderResult:
+    dispatch: np.ndarray        # (K x G) output per unit, in supply order
+    price: np.ndarray           # (K,) clearing price, NaN where demand exceeds capacity
+    surplus: np.ndarray         # (K x G) (price - mc) * dispatch
+    total_cost: np.ndarray      # (K,)
+    total_paid: np.ndarray      # (K,) price * demand
+    unserved: np.ndarray        # (K,) demand that could not be met
+
+
+class MeritOrder:
+
+    def __init__(self, mc):
+        self.mc = np.asarray(mc, dtype=float)
+        self.order = np.argsort(self.mc, kind="stable")     # stable: ties keep supply order
+        self.sorted_mc = self.mc[self.order]
+
+    def clear(self, capacity, demand):
+        """Clear (G,) or (K x G) capacities against a scalar or (K,) demand."""
+        capacity = np.atleast_2d(np.asarray(capacity, dtype=float))
+        demand = np.atleast_1d(np.asarray(demand, dtype=float))
+        if capacity.shape[0] == 1 and demand.shape[0] > 1:
+            capacity = np.broadcast_to(capacity, (demand.shape[0], capacity.shape[1]))
+
+        cap_sorted = capacity[:, self.order]
+        cum = np.cumsum(cap_sorted, axis=1)
+
+        # Output in merit order: everything below demand, partial at the marginal unit
+        before = cum - cap_sorted
+        gen_sorted = np.clip(demand[:, None] - before, 0, None)
+        gen_sorted = np.minimum(gen_sorted, cap_sorted)
+
+        dispatch = np.empty_like(gen_sorted)
+        dispatch[:, self.order] = gen_sorted
+        return self.settle(dispatch, demand)
+
+    def settle(self, dispatch, demand):
+        """Price, surplus and totals of a given (K x G) dispatch (e.g. the LP's) against (K,) demand."""
+        dispatch = np.atleast_2d(np.asarray(dispatch, dtype=float))
+        demand = np.atleast_1d(np.asarray(demand, dtype=float))
+
+        # Marginal unit: first position where cumulative output reaches demand
+        cum_gen = np.cumsum(dispatch[:, self.order], axis=1)
+        marginal = (cum_gen < (demand - EPSILON)[:, None]).sum(axis=1)
+        served = marginal < dispatch.shape[1]
+        price = np.full(demand.shape, np.nan)
+        price[served] = self.sorted_mc[marginal[served]]
+
+        surplus = (price[:, None] - self.mc) * dispatch
+        return MeritOrderResult(
+            dispatch=dispatch,
+            price=price,
+            surplus=surplus,
+            total_cost=dispatch @ self.mc,
+            total_paid=price * demand,
+            unserved=demand - dispatch.sum(axis=1),
+        )
+
+
+def clear_scenarios(table, demand, scenario_levels):
+    """Clear (scenario, demand level) pairs from an AvailabilityTable in one call."""
+    capacity = np.array([table.row(s) for s, _ in scenario_levels])
+    total_demand = np.array([demand[level].sum() for _, level in scenario_levels])
+    return MeritOrder(table.mc).clear(capacity, total_demand)
@@ -0,0 +1,380 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from gridmodel.builder import build_uniform_model
+from gridmodel.data import availability, line_capacities
+from gridmodel.engine import ScenarioEngine, optimal
+from gridmodel.meritorder import MeritOrder
+from gridmodel.ptdf import PTDFEngine
+from gridmodel.settlement import NodalSolution, settle, values
+from gridmodel.sparse_opf import SparseNodalModel
+
+# Monte Carlo uncertainty around one weather scenario / demand level.
+#
+# Every draw scales the scenario's wind and solar profiles and the nodal demand by
+# correlated random shocks. The shocks are standard normals correlated across nodes
+# (spatial_corr) and across quantities (wind/solar/demand), and they are mapped to
+# multipliers:
+#
+#   renewables  capacity = adjusted_capacity * clip(profile * exp(sigma z - sigma²/2), 0, 1)
+#   demand      demand   = demand * max(1 + demand_sigma z, 0)
+#
+# Onshore and offshore wind share the wind shock of their node, as they share a
+# profile in data/weatherprofiles.csv.
+#
+# Draws are evaluated in batches:
+#   - the uniform track is cleared for the whole batch at once (merit order + PTDF
+#     flows), so its price, cost and overloads are array operations; the merit order
+#     breaks ties like the dispatch LP (gridmodel.meritorder), so its dispatch is the
+#     one the uniform track would solve for (check_lp=True re-solves the dispatch LP of
+#     every draw and reports draws where the two differ, as a cross-check);
+#   - the nodal track re-solves one SparseNodalModel (matrix built once) per draw.
+# The redispatch of a draw is the move from its uniform dispatch to the nodal optimum
+# of the same draw. Its net cost is that of optimal_redispatch in gridmodel.redispatch;
+# where several dispatches are optimal, the split into ramp-up and curtailment can
+# differ from that LP's.
+#
+# Per-draw results are folded into running moments and quantile sketches batch by
+# batch, so memory does not grow with the number of draws:
+#
+#   engine = MonteCarloEngine(supply, lines, demand, weather, "hs", "peak_demand")
+#   result = engine.run(10_000, workers=4)
+#   result.summary      # Metric, Node, Count, Mean, Std, Min, P5, P50, P95, Max
+
+SYSTEM_METRICS = [
+    "UniformPrice", "UniformCost", "UniformPaid", "NodalCost", "NodalPaid",
+    "CongestionCost", "RedispatchCost", "Curtailment", "Violations", "Overload",
+]
+
+
+@dataclass
+class Uncertainty:
+    wind_sigma: float = 0.3         # log-normal spread of wind profiles
+    solar_sigma: float = 0.2        # log-normal spread of solar profiles
+    demand_sigma: float = 0.05      # relative spread of nodal demand
+    spatial_corr: float = 0.8       # correlation of one quantity between two nodes
+    wind_solar_corr: float = -0.2
+    wind_demand_corr: float = 0.0
+    solar_demand_corr: float = 0.0
+
+    def correlation(self, n_nodes):
+        """(3N x 3N) correlation of the shocks, ordered [wind (N), solar (N), demand (N)]."""
+        factor = np.array([
+            [1.0, self.wind_solar_corr, self.wind_demand_corr],
+            [self.wind_solar_corr, 1.0, self.solar_demand_corr],
+            [self.wind_demand_corr, self.solar_demand_corr, 1.0],
+        ])
+        spatial = np.full((n_nodes, n_nodes), self.spatial_corr)
+        np.fill_diagonal(spatial, 1.0)
+        return np.kron(factor, spatial)
+
+
+@dataclass
+class MonteCarloResult:
+    summary: pd.DataFrame       # Metric, Node, Count, Mean, Std, Min, <quantiles>, Max
+    draws: int
+    nodal_infeasible: int       # draws without a feasible nodal dispatch (left out of the nodal metrics)
+    uniform_unserved: int       # draws where demand exceeds available capacity
+
+
+# ========== Streaming Statistics ==========
+
+class QuantileSketch:
+    """Streaming quantiles of several columns with relative accuracy rel_error.
+
+    Values are counted in logarithmic buckets (γ^(i-1), γ^i] (as in DDSketch), so
+    memory depends on the range of the values, not on how many are added. Each bucket
+    also keeps the sum of its values and a quantile is reported as the mean of its
+    bucket. With γ = 1 + rel_error that mean is within rel_error of every value in the
+    bucket, so of the true quantile, and exact when all values in the bucket are equal
+    (e.g. prices set by one marginal cost). Values with magnitude below min_value
+    count as 0.
+    """
+
+    def __init__(self, n_columns, rel_error=0.001, min_value=1e-9):
+        self.gamma = 1 + rel_error
+        self.log_gamma = np.log(self.gamma)
+        self.min_value = min_value
+        self.offset = int(np.ceil(np.log(min_value) / self.log_gamma)) - 1
+        self.buckets = [{} for _ in range(n_columns)]
+
+    def _keys(self, values):
+        # Signed bucket index: 0 for zero, ±(i - offset) >= 1 otherwise, so keys sort like values
+        magnitude = np.abs(values)
+        index = np.ceil(np.log(np.maximum(magnitude, self.min_value)) / self.log_gamma).astype(np.int64) - self.offset
+        return np.where(magnitude < self.min_value, 0, np.sign(values).astype(np.int64) * index)
+
+    def update(self, batch):
+        """Add a (rows x n_columns) batch; NaN entries are skipped."""
+        rows, cols = np.nonzero(~np.isnan(batch))
+        if len(rows) == 0:
+            return
+        values = batch[rows, cols]
+        pairs, inverse, counts = np.unique(
+            np.column_stack([cols, self._keys(values)]), axis=0, return_inverse=True, return_counts=True
+        )
+        sums = np.bincount(inverse.ravel(), weights=values, minlength=len(pairs))
+        for (col, key), count, total in zip(pairs.tolist(), counts.tolist(), sums.tolist()):
+            bucket = self.buckets[col].setdefault(key, [0, 0.0])
+            bucket[0] += count
+            bucket[1] += total
+
+    def quantile(self, q):
+        """(n_columns,) estimates of quantile q; NaN for columns without values."""
+        out = np.full(len(self.buckets), np.nan)
+        for col, buckets in enumerate(self.buckets):
+            if not buckets:
+                continue
+            keys = sorted(buckets)
+            cum = np.cumsum([buckets[k][0] for k in keys])
+            count, total = buckets[keys[np.searchsorted(cum, q * (cum[-1] - 1), side="right")]]
+            out[col] = total / count
+        return out
+
+
+class StreamingStats:
+    """Count, mean, std, min, max and quantiles of several columns, updated batch by batch."""
+
+    def __init__(self, n_columns, quantiles=(0.05, 0.5, 0.95), rel_error=0.001):
+        self.quantiles = list(quantiles)
+        self.count = np.zeros(n_columns, dtype=np.int64)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.min = np.full(n_columns, np.inf)
+        self.max = np.full(n_columns, -np.inf)
+        self.sketch = QuantileSketch(n_columns, rel_error)
+
+    def update(self, batch):
+        batch = np.atleast_2d(np.asarray(batch, dtype=float))
+        valid = ~np.isnan(batch)
+        n_b = valid.sum(axis=0)
+        has = n_b > 0
+        if not has.any():
+            return
+
+        # Batch moments, merged into the running ones (Chan et al.)
+        mean_b = np.where(has, np.nansum(batch, axis=0) / np.maximum(n_b, 1), 0.0)
+        m2_b = np.nansum((batch - mean_b) ** 2, axis=0)
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean = np.where(has, self.mean + delta * n_b / np.maximum(n, 1), self.mean)
+        self.m2 = np.where(has, self.m2 + m2_b + delta ** 2 * self.count * n_b / np.maximum(n, 1), self.m2)
+        self.count = n
+
+        self.min = np.fmin(self.min, np.where(valid, batch, np.inf).min(axis=0))
+        self.max = np.fmax(self.max, np.where(valid, batch, -np.inf).max(axis=0))
+        self.sketch.update(batch)
+
+    def table(self):
+        """Columns Count, Mean, Std, Min, P<q>..., Max (one row per column)."""
+        empty = self.count == 0
+        std = np.sqrt(self.m2 / np.maximum(self.count - 1, 1))
+        columns = {
+            "Count": self.count,
+            "Mean": np.where(empty, np.nan, self.mean),
+            "Std": np.where(empty, np.nan, std),
+            "Min": np.where(empty, np.nan, self.min),
+        }
+        for q in self.quantiles:
+            columns[f"P{q * 100:g}"] = self.sketch.quantile(q)
+        columns["Max"] = np.where(empty, np.nan, self.max)
+        return pd.DataFrame(columns)
+
+
+# ========== Engine ==========
+
+class MonteCarloEngine:
+
+    def __init__(self, supply, lines, demand, weather, scenario_name, demand_level, uncertainty=None,
+                 check_lp=False, solver_name=None):
+        self.scenario = scenario_name
+        self.demand_level = demand_level
+        self.uncertainty = Uncertainty() if uncertainty is None else uncertainty
+        self.check_lp = check_lp
+        self.solver_name = solver_name
+        self._uniform = None        # ScenarioEngine of the uniform dispatch LP, built in each process
+
+        self.model = SparseNodalModel.from_inputs(supply, lines, demand["node"].unique())
+        nodes = self.model.nodes
+        N = len(nodes)
+        node_index = {n: k for k, n in enumerate(nodes)}
+
+        table = availability(supply, weather)
+        gen_index = {g: k for k, g in enumerate(table.gens)}
+        order = [gen_index[g] for g in self.model.gens]
+        self.mc = table.mc[order].astype(float)
+        self.base_capacity = table.base_capacity[order]
+        self.capacity = table.row(scenario_name)[order]
+        self.profile = np.divide(self.capacity, self.base_capacity, out=np.zeros_like(self.capacity),
+                                 where=self.base_capacity > 0)
+        self.is_renewable = table.is_renewable[order]
+
+        # Shock column of every renewable unit: its node's wind or solar shock
+        self.shock_column = np.array([(N if t == "solar" else 0) + node_index[n] for n, t in self.model.gens])
+        self.sigma = np.repeat([self.uncertainty.wind_sigma, self.uncertainty.solar_sigma, self.uncertainty.demand_sigma], N)
+        try:
+            self.chol = np.linalg.cholesky(self.uncertainty.correlation(N))
+        except np.linalg.LinAlgError:
+            raise ValueError("Correlation settings do not give a valid (positive definite) correlation matrix.")
+
+        nodal_demand = dict(zip(demand["node"], demand[demand_level]))
+        self.demand = np.array([nodal_demand.get(n, 0) for n in nodes], dtype=float)
+        line_cap = line_capacities(lines)
+        self.line_cap = np.array([line_cap[l] for l in self.model.lines], dtype=float)
+
+        self.merit = MeritOrder(self.mc)
+        self.ptdf = PTDFEngine.from_lines(lines, nodes=nodes)
+        self.gen_incidence = np.zeros((len(self.model.gens), N))
+        self.gen_incidence[np.arange(len(self.model.gens)), self.model.gen_node] = 1
+
+        self.metrics = [("LMP", n) for n in nodes] + [(m, "System") for m in SYSTEM_METRICS]
+
+    def __getstate__(self):
+        # Worker processes build their own uniform LP (solver objects do not pickle)
+        return {**self.__dict__, "_uniform": None}
+
+    # ========== Sampling ==========
+
+    def sample(self, rng, size):
+        """(size x G) available capacity and (size x N) nodal demand."""
+        N = len(self.model.nodes)
+        z = rng.standard_normal((size, 3 * N)) @ self.chol.T
+        shock = np.exp(self.sigma[:2 * N] * z[:, :2 * N] - self.sigma[:2 * N] ** 2 / 2)
+
+        capacity = np.tile(self.capacity, (size, 1))
+        ren = self.is_renewable
+        multiplier = np.clip(self.profile[ren] * shock[:, self.shock_column[ren]], 0, 1)
+        capacity[:, ren] = self.base_capacity[ren] * multiplier
+
+        demand = self.demand * np.clip(1 + self.sigma[2 * N:] * z[:, 2 * N:], 0, None)
+        return capacity, demand
+
+    # ========== Evaluation ==========
+
+    def uniform_dispatch(self, capacity, total_demand):
+        """(draws x G) dispatch of the uniform dispatch LP, one solve per draw (check_lp).
+
+        Where demand exceeds total capacity every unit runs at capacity (no LP is solved).
+        """
+        gens = self.model.gens
+        if self._uniform is None:
+            model = build_uniform_model(dict(zip(gens, self.capacity)), dict(zip(gens, self.mc)), self.demand.sum())
+            self._uniform = ScenarioEngine(model, self.solver_name)
+        engine = self._uniform
+
+        dispatch = capacity.copy()
+        for k in np.flatnonzero(capacity.sum(axis=1) >= total_demand):
+            engine.update(capacity=dict(zip(gens, capacity[k])), total_demand=total_demand[k])
+            results = engine.solve(f"{self.scenario} | {self.demand_level} | uniform draw")
+            dispatch[k] = values(engine.model.p_gen) if optimal(results) else np.nan
+        return dispatch
+
+    def evaluate(self, capacity, demand):
+        """(draws x metrics) array in the order of self.metrics, plus the nodal infeasible count."""
+        size = capacity.shape[0]
+        N = len(self.model.nodes)
+        out = np.full((size, len(self.metrics)), np.nan)
+        col = {m: N + k for k, m in enumerate(SYSTEM_METRICS)}
+
+        # Uniform track for the whole batch
+        uniform = self.merit.clear(capacity, demand.sum(axis=1))
+        if self.check_lp:
+            lp = self.uniform_dispatch(capacity, demand.sum(axis=1))
+            differ = (np.abs(lp - uniform.dispatch) > 1e-3).any(axis=1)
+            if differ.any():
+                print(f"WARNING: merit order and dispatch LP differ in {differ.sum()} of {size} draws")
+        served = uniform.unserved <= 1e-3
+        injection = uniform.dispatch @ self.gen_incidence - demand
+        overload = self.ptdf.overloads(injection)
+        violations = (overload > 0).sum(axis=1)
+        out[:, col["UniformPrice"]] = uniform.price
+        out[:, col["UniformCost"]] = uniform.total_cost
+        out[:, col["UniformPaid"]] = uniform.total_paid
+        out[:, col["Violations"]] = np.where(served, violations, np.nan)
+        out[:, col["Overload"]] = np.where(served, overload.sum(axis=1), np.nan)
+
+        # Nodal track, one re-solve per draw
+        generation = np.full_like(capacity, np.nan)
+        for k in range(size):
+            result = self.model.solve(capacity[k], self.mc, demand[k], self.line_cap)
+            if result.status != 0:
+                continue
+            generation[k] = result.generation
+            out[k, :N] = result.lmp
+            out[k, col["NodalCost"]] = result.total_cost
+        nodal_missing = np.isnan(out[:, col["NodalCost"]])
+        solution = NodalSolution(self.model.gens, self.model.lines, self.model.nodes, self.model.gen_node, self.mc,
+                                 generation, None, None, out[:, :N], out[:, col["NodalCost"]])
+        out[:, col["NodalPaid"]] = settle(solution).total_paid      # NaN where the draw has no nodal solution
+
+        # Redispatch from the uniform to the nodal dispatch (none where the uniform one is feasible)
+        change = generation - uniform.dispatch
+        needed = served & (violations > 0)
+        out[:, col["CongestionCost"]] = out[:, col["NodalCost"]] - uniform.total_cost
+        out[:, col["RedispatchCost"]] = np.where(needed, np.clip(change, 0, None) @ self.mc, 0.0)
+        out[:, col["Curtailment"]] = np.where(needed, np.clip(-change[:, self.is_renewable], 0, None).sum(axis=1), 0.0)
+        out[nodal_missing | ~served, col["RedispatchCost"]] = np.nan
+        out[nodal_missing | ~served, col["Curtailment"]] = np.nan
+        return out, int(nodal_missing.sum()), int((~served).sum())
+
+    def run_batch(self, seed, size):
+        capacity, demand = self.sample(np.random.default_rng(seed), size)
+        return self.evaluate(capacity, demand)
+
+    def run(self, n_draws, batch_size=250, seed=0, workers=1, quantiles=(0.05, 0.5, 0.95), rel_error=0.001):
+        """Evaluate n_draws draws and return their streamed summary.
+
+        Batch k always uses the k-th child of SeedSequence(seed), so results do not
+        depend on the number of workers (workers=1 runs in-process).
+        """
+        sizes = [min(batch_size, n_draws - start) for start in range(0, n_draws, batch_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        stats = StreamingStats(len(self.metrics), quantiles, rel_error)
+        counts = {"nodal_infeasible": 0, "uniform_unserved": 0}
+
+        def collect(batch):
+            values, infeasible, unserved = batch
+            stats.update(values)
+            counts["nodal_infeasible"] += infeasible
+            counts["uniform_unserved"] += unserved
+
+        if workers == 1:
+            for s, size in zip(seeds, sizes):
+                collect(self.run_batch(s, size))
+        else:
+            # At most two batches per worker in flight, so memory stays bounded. Batches are
+            # collected in seed order: the statistics do not depend on worker timing
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as pool:
+                limit = 2 * (workers or os.cpu_count())
+                pending = deque()
+                for s, size in zip(seeds, sizes):
+                    if len(pending) >= limit:
+                        collect(pending.popleft().result())
+                    pending.append(pool.submit(_run_worker_batch, s, size))
+                while pending:
+                    collect(pending.popleft().result())
+
+        summary = pd.concat([
+            pd.DataFrame(self.metrics, columns=["Metric", "Node"]),
+            stats.table(),
+        ], axis=1)
+        return MonteCarloResult(summary, n_draws, **counts)
+
+
+# ========== Worker Processes ==========
+
+_WORKER_ENGINE = None
+
+
+def _init_worker(engine):
+    global _WORKER_ENGINE
+    _WORKER_ENGINE = engine
+
+
+def _run_worker_batch(seed, size):
+    return _WORKER_ENGINE.run_batch(seed, size)
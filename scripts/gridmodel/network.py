@@ -0,0 +1,332 @@
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from gridmodel.data import RENEWABLE_TYPES, load_inputs
+
+# Typed network and fleet data model.
+#
+# The input CSVs are loaded and validated once (gridmodel.data.load_inputs) and held as
+# contiguous NumPy arrays indexed by integer position, with index maps back to the labels:
+#
+#   Network   nodes (N,) node ids, in demand.csv order; node_index {node id: position}
+#             line_from, line_to (L,) node positions; linecap (L,)
+#             demand (D x N) per demand level; level_index {level: row}
+#   Fleet     node (G,) node positions; tech (G,) codes into techs; tech_index {tech: code}
+#             mc, capacity (G,); availability (S x G) weather-adjusted capacity per
+#             scenario (the rule of gridmodel.data.AvailabilityTable); scenario_index
+#
+# Both use __slots__ and hold nothing but arrays and small label tuples. Optional input
+# columns (reactance, ramp_rate, ...) are kept as extra arrays next to them. Dict views in
+# the shape the model builders take (available_capacity[(node, tech)], line_cap[(i, j)],
+# nodal_demand[node]) are produced on demand, and frames() gives back the DataFrames of
+# load_inputs for code that still takes those.
+#
+# Grid.share() copies every array into one shared-memory block and returns a small
+# picklable handle; worker processes attach to it with Grid.attach(handle) and get
+# read-only views of the same memory instead of re-reading and re-parsing the CSVs:
+#
+#   grid = Grid.load("data", "lines.csv")
+#   with grid.share() as handle:
+#       pool = ProcessPoolExecutor(initializer=init, initargs=(handle,))    # init: Grid.attach(handle)
+
+
+class Network:
+    __slots__ = ("nodes", "line_from", "line_to", "linecap", "levels", "demand", "node_index", "level_index")
+
+    def __init__(self, nodes, line_from, line_to, linecap, levels, demand):
+        self.nodes = nodes              # (N,) int64 node ids
+        self.line_from = line_from      # (L,) int64 node positions
+        self.line_to = line_to          # (L,) int64 node positions
+        self.linecap = linecap          # (L,) float64
+        self.levels = tuple(levels)     # demand level names
+        self.demand = demand            # (D x N) float64
+        self.node_index = {n: k for k, n in enumerate(self.nodes.tolist())}
+        self.level_index = {d: k for k, d in enumerate(self.levels)}
+
+    @classmethod
+    def from_frames(cls, lines, demand):
+        nodes = demand["node"].to_numpy(dtype=np.int64)
+        index = {n: k for k, n in enumerate(nodes.tolist())}
+        levels = [c for c in demand.columns if c != "node"]
+        return cls(
+            nodes,
+            np.array([index[n] for n in lines["from_node"].tolist()], dtype=np.int64),
+            np.array([index[n] for n in lines["to_node"].tolist()], dtype=np.int64),
+            lines["linecap"].to_numpy(dtype=np.float64),
+            levels,
+            np.ascontiguousarray(demand[levels].to_numpy(dtype=np.float64).T),
+        )
+
+    @property
+    def lines(self):
+        """(from, to) node ids in file order."""
+        return list(zip(self.nodes[self.line_from].tolist(), self.nodes[self.line_to].tolist()))
+
+    def line_capacities(self):
+        """{(i, j): linecap}, as gridmodel.data.line_capacities."""
+        return dict(zip(self.lines, self.linecap.tolist()))
+
+    def nodal_demand(self, demand_level):
+        """{node: demand} of one demand level."""
+        return dict(zip(self.nodes.tolist(), self.demand[self.level_index[demand_level]].tolist()))
+
+
+class Fleet:
+    __slots__ = ("node", "tech", "techs", "mc", "capacity", "scenarios", "availability", "tech_index",
+                 "scenario_index")
+
+    def __init__(self, node, tech, techs, mc, capacity, scenarios, availability):
+        self.node = node                    # (G,) int64 node positions
+        self.tech = tech                    # (G,) int64 codes into techs
+        self.techs = tuple(techs)
+        self.mc = mc                        # (G,) float64
+        self.capacity = capacity            # (G,) float64 adjusted capacity
+        self.scenarios = tuple(scenarios)
+        self.availability = availability    # (S x G) float64
+        self.tech_index = {t: k for k, t in enumerate(self.techs)}
+        self.scenario_index = {s: k for k, s in enumerate(self.scenarios)}
+
+    @classmethod
+    def from_frames(cls, supply, weather, network):
+        techs = list(dict.fromkeys(supply["type"].tolist()))
+        tech_index = {t: k for k, t in enumerate(techs)}
+        node = np.array([network.node_index[n] for n in supply["node"].tolist()], dtype=np.int64)
+        tech = np.array([tech_index[t] for t in supply["type"].tolist()], dtype=np.int64)
+        capacity = supply["adjusted_capacity"].to_numpy(dtype=np.float64)
+
+        # (scenario x node x renewable type) profiles; NaN where a node has no profile
+        scenarios = list(dict.fromkeys(weather["scenario"].tolist()))
+        scenario_pos = np.array([scenarios.index(s) for s in weather["scenario"].tolist()])
+        node_pos = np.array([network.node_index[n] for n in weather["node"].tolist()], dtype=np.int64)
+        profile = np.full((len(scenarios), len(network.nodes), len(RENEWABLE_TYPES)), np.nan)
+        for k, t in enumerate(RENEWABLE_TYPES):
+            if f"{t}_profile" in weather.columns:
+                profile[scenario_pos, node_pos, k] = weather[f"{t}_profile"].to_numpy(dtype=np.float64)
+
+        # Renewables scale with their node's profile (0 without one), other units are fully available
+        renewable = np.array([tech_index.get(t, -1) for t in RENEWABLE_TYPES])
+        kind = np.full(len(techs), -1)
+        kind[renewable[renewable >= 0]] = np.flatnonzero(renewable >= 0)
+        gen_kind = kind[tech]
+        multiplier = np.ones((len(scenarios), len(node)))
+        is_renewable = gen_kind >= 0
+        multiplier[:, is_renewable] = np.nan_to_num(profile[:, node[is_renewable], gen_kind[is_renewable]], nan=0.0)
+
+        return cls(node, tech, techs, supply["mc"].to_numpy(dtype=np.float64), capacity, scenarios,
+                   multiplier * capacity)
+
+    @property
+    def is_renewable(self):
+        return np.isin(self.tech, [self.tech_index[t] for t in RENEWABLE_TYPES if t in self.tech_index])
+
+    def gens(self, network):
+        """(node id, tech) in supply file order, the generator keys of the model builders."""
+        return list(zip(network.nodes[self.node].tolist(), [self.techs[t] for t in self.tech.tolist()]))
+
+    def available(self, scenario_name):
+        """(G,) available capacity; renewables are unavailable in a scenario without profiles."""
+        if scenario_name in self.scenario_index:
+            return self.availability[self.scenario_index[scenario_name]]
+        return np.where(self.is_renewable, 0.0, self.capacity)
+
+
+# ========== Grid ==========
+
+# (owner, attribute) of every array, in shared-memory layout order
+_ARRAYS = [
+    ("network", "nodes"), ("network", "line_from"), ("network", "line_to"), ("network", "linecap"),
+    ("network", "demand"),
+    ("fleet", "node"), ("fleet", "tech"), ("fleet", "mc"), ("fleet", "capacity"), ("fleet", "availability"),
+    ("weather", "scenario"), ("weather", "node"), ("weather", "profile"),
+    ("extra", "supply"), ("extra", "lines"),
+]
+
+# Columns rebuilt from the Network/Fleet arrays; any other column of supply and lines
+# (e.g. ramp_rate, reactance) is carried along as an extra column
+_MODEL_COLUMNS = {
+    "supply": ["node", "type", "mc", "adjusted_capacity"],
+    "lines": ["from_node", "to_node", "linecap"],
+    "weather": ["scenario", "node"],
+}
+
+
+def _extra_columns(df, name):
+    """Columns of df beyond the model ones: numeric ones as one (rows x columns) float64
+    array, the others (labels) as tuples."""
+    columns = [c for c in df.columns if c not in _MODEL_COLUMNS[name]]
+    numeric = [c for c in columns if pd.api.types.is_numeric_dtype(df[c])]
+    values = np.ascontiguousarray(df[numeric].to_numpy(dtype=np.float64)).reshape(len(df), len(numeric))
+    other = {c: tuple(df[c].tolist()) for c in columns if c not in numeric}
+    return {"columns": tuple(numeric), "values": values, "other": other}
+
+
+@dataclass
+class SharedGrid:
+    """Picklable handle of a Grid in shared memory (see Grid.share / Grid.attach)."""
+    name: str                   # shared memory block
+    layout: list                # (owner, attribute, dtype, shape, offset)
+    labels: dict                # levels, techs, scenarios, profile columns, frame dtypes
+
+
+class Grid:
+    __slots__ = ("network", "fleet", "weather", "extra", "dtypes", "_shm")
+
+    def __init__(self, network, fleet, weather, extra, dtypes):
+        self.network = network
+        self.fleet = fleet
+        # Weather rows as arrays (scenario codes, node positions, profiles), for frames()
+        self.weather = weather
+        self.extra = extra          # {"supply"/"lines": _extra_columns}, for frames()
+        self.dtypes = dtypes        # {frame: {column: dtype}} of the loaded DataFrames
+        self._shm = None
+
+    @classmethod
+    def from_frames(cls, supply, lines, demand, weather):
+        network = Network.from_frames(lines, demand)
+        fleet = Fleet.from_frames(supply, weather, network)
+        profiles = _extra_columns(weather, "weather")
+        rows = {
+            "scenario": np.array([fleet.scenario_index[s] for s in weather["scenario"].tolist()], dtype=np.int64),
+            "node": np.array([network.node_index[n] for n in weather["node"].tolist()], dtype=np.int64),
+            "profile": profiles["values"],
+            "columns": profiles["columns"],
+            "other": profiles["other"],
+        }
+        extra = {"supply": _extra_columns(supply, "supply"), "lines": _extra_columns(lines, "lines")}
+        dtypes = {name: df.dtypes.to_dict() for name, df in
+                  [("supply", supply), ("lines", lines), ("demand", demand), ("weather", weather)]}
+        return cls(network, fleet, rows, extra, dtypes)
+
+    @classmethod
+    def load(cls, data_dir="data", lines_file="lines.csv"):
+        """Read and validate the input files (gridmodel.data.load_inputs) into arrays."""
+        return cls.from_frames(*load_inputs(data_dir, lines_file))
+
+    # ========== Model Inputs ==========
+
+    @property
+    def gens(self):
+        return self.fleet.gens(self.network)
+
+    def scenario_inputs(self, scenario_name):
+        """available_capacity and costs keyed by (node, tech), as gridmodel.data.scenario_inputs."""
+        gens = self.gens
+        return dict(zip(gens, self.fleet.available(scenario_name).tolist())), dict(zip(gens, self.fleet.mc.tolist()))
+
+    def line_capacities(self):
+        return self.network.line_capacities()
+
+    def line_reactances(self):
+        """{(i, j): reactance}, as gridmodel.data.line_reactances (None without the column)."""
+        extra = self.extra["lines"]
+        if "reactance" not in extra["columns"]:
+            return None
+        return dict(zip(self.network.lines, extra["values"][:, extra["columns"].index("reactance")].tolist()))
+
+    def nodal_demand(self, demand_level):
+        return self.network.nodal_demand(demand_level)
+
+    def frames(self):
+        """supply, lines, demand, weather DataFrames with the columns and dtypes of load_inputs."""
+        network, fleet, weather = self.network, self.fleet, self.weather
+        supply = pd.DataFrame({
+            "node": network.nodes[fleet.node],
+            "type": [fleet.techs[t] for t in fleet.tech.tolist()],
+            "mc": fleet.mc,
+            "adjusted_capacity": fleet.capacity,
+            **self._extra_frame_columns("supply"),
+        })
+        lines = pd.DataFrame({
+            "from_node": network.nodes[network.line_from],
+            "to_node": network.nodes[network.line_to],
+            "linecap": network.linecap,
+            **self._extra_frame_columns("lines"),
+        })
+        demand = pd.DataFrame({"node": network.nodes, **dict(zip(network.levels, network.demand))})
+        weather = pd.DataFrame({
+            "scenario": [fleet.scenarios[s] for s in weather["scenario"].tolist()],
+            "node": network.nodes[weather["node"]],
+            **dict(zip(weather["columns"], weather["profile"].T)),
+            **weather["other"],
+        })
+        frames = {"supply": supply, "lines": lines, "demand": demand, "weather": weather}
+        return tuple(
+            frames[name][list(self.dtypes[name])].astype(self.dtypes[name])
+            for name in ("supply", "lines", "demand", "weather")
+        )
+
+    def _extra_frame_columns(self, name):
+        extra = self.extra[name]
+        return {**dict(zip(extra["columns"], extra["values"].T)), **extra["other"]}
+
+    # ========== Shared Memory ==========
+
+    def _array(self, owner, attribute):
+        if owner == "weather":
+            return self.weather[attribute]
+        if owner == "extra":
+            return self.extra[attribute]["values"]
+        return getattr(getattr(self, owner), attribute)
+
+    @contextmanager
+    def share(self):
+        """Copy all arrays into one shared-memory block; yields the SharedGrid handle.
+
+        The block is released when the with-block ends, so worker processes must be done
+        with it by then (e.g. shut the pool down inside the block).
+        """
+        layout, offset = [], 0
+        for owner, attribute in _ARRAYS:
+            array = self._array(owner, attribute)
+            offset = -(-offset // 8) * 8        # 8-byte aligned
+            layout.append((owner, attribute, array.dtype.str, array.shape, offset))
+            offset += array.nbytes
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        try:
+            for (owner, attribute, dtype, shape, start) in layout:
+                view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+                view[...] = self._array(owner, attribute)
+                del view
+            labels = {
+                "levels": self.network.levels,
+                "techs": self.fleet.techs,
+                "scenarios": self.fleet.scenarios,
+                "columns": self.weather["columns"],
+                "other": self.weather["other"],
+                "extra": {name: {k: v for k, v in extra.items() if k != "values"} for name, extra in self.extra.items()},
+                "dtypes": self.dtypes,
+            }
+            yield SharedGrid(shm.name, layout, labels)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    @classmethod
+    def attach(cls, handle):
+        """Grid of read-only views into the shared-memory block of handle (no copies)."""
+        # Python >= 3.13: the creating process owns the block, attaching ones must not track it
+        kwargs = {"track": False} if sys.version_info >= (3, 13) else {}
+        shm = shared_memory.SharedMemory(name=handle.name, **kwargs)
+        arrays = {}
+        for (owner, attribute, dtype, shape, start) in handle.layout:
+            view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+            view.flags.writeable = False
+            arrays[owner, attribute] = view
+
+        labels = handle.labels
+        network = Network(*(arrays["network", a] for a in ("nodes", "line_from", "line_to", "linecap")),
+                          labels["levels"], arrays["network", "demand"])
+        fleet = Fleet(arrays["fleet", "node"], arrays["fleet", "tech"], labels["techs"], arrays["fleet", "mc"],
+                      arrays["fleet", "capacity"], labels["scenarios"], arrays["fleet", "availability"])
+        weather = {a: arrays["weather", a] for a in ("scenario", "node", "profile")}
+        weather["columns"] = labels["columns"]
+        weather["other"] = labels["other"]
+        extra = {name: {**columns, "values": arrays["extra", name]} for name, columns in labels["extra"].items()}
+        grid = cls(network, fleet, weather, extra, labels["dtypes"])
+        grid._shm = shm         # keeps the mapping alive as long as the grid
+        return grid
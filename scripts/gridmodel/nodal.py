@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from gridmodel.builder import build_nodal_model
+from gridmodel.cache import scenario_key
+from gridmodel.data import line_capacities, line_reactances, scenario_inputs
+from gridmodel.engine import ScenarioEngine, optimal
+from gridmodel.instrument import stage
+from gridmodel.security import SecureNodalModel, solve_nodal_n1
+from gridmodel.settlement import duals, from_pyomo, output_table, values
+from gridmodel.sparse_opf import SparseNodalModel, bound_status, solve_nodal_sparse
+
+
+def collect_outputs(model, costs):
+    """Long-format result table (Node, Type, Category, Value) as written to outputs/nodal/."""
+    return output_table(from_pyomo(model, costs))
+
+
+def line_duals(model):
+    """Duals of the line limits (€/MW of extra capacity) and basis status, one row per line."""
+    lines = list(model.LINES)
+    flow = values(model.p_flow)
+    capacity = values(model.line_limit)
+    return pd.DataFrame({
+        "From": [i for i, _ in lines],
+        "To": [j for _, j in lines],
+        "Flow": flow,
+        "Capacity": capacity,
+        "DualPos": duals(model.dual, model.LineCapacityPos, 0),
+        "DualNeg": duals(model.dual, model.LineCapacityNeg, 0),
+        "Basis": bound_status(flow, -capacity, capacity),
+    })
+
+
+def generator_duals(model):
+    """Capacity duals, reduced costs and basis status, one row per generator."""
+    gens = list(model.GENS)
+    generation = values(model.p_gen)
+    capacity = values(model.capacity)
+    return pd.DataFrame({
+        "Node": [n for n, _ in gens],
+        "Type": [t for _, t in gens],
+        "Generation": generation,
+        "Capacity": capacity,
+        "CapacityDual": duals(model.dual, model.GenCapacity, 0),
+        "ReducedCost": np.array([model.rc.get(v, 0) for v in model.p_gen.values()], dtype=float),
+        "Basis": bound_status(generation, 0.0, capacity),
+    })
+
+
+def nodal_model(supply, lines, demand, method="pyomo", solver_name=None):
+    """Model that nodal_results(model=...) re-solves for every scenario and demand level.
+
+    method="pyomo": a ScenarioEngine of build_nodal_model, whose mutable capacity,
+    demand and line limit params are overwritten per solve; "sparse" / "n1": the
+    SparseNodalModel / SecureNodalModel of the topology.
+    """
+    nodes = demand["node"].unique()
+    if method == "sparse":
+        return SparseNodalModel.from_inputs(supply, lines, nodes)
+    if method == "n1":
+        return SecureNodalModel.from_inputs(supply, lines, nodes)
+    gens = list(zip(supply["node"], supply["type"]))
+    model = build_nodal_model(nodes, dict(zip(gens, supply["adjusted_capacity"])), dict(zip(gens, supply["mc"])),
+                              line_capacities(lines), dict.fromkeys(nodes, 0), line_reactances(lines))
+    return ScenarioEngine(model, solver_name)
+
+
+def nodal_results(supply, lines, demand, weather, scenario_name, demand_level, solver_name=None, cache=None,
+                  method="pyomo", log=None, model=None):
+    """Solve one scenario / demand level; returns {"outputs", "line_duals", "generators", "solver",
+    "optimal"}, where "optimal" is False if the solver found no optimal solution (or,
+    for method="n1", post-contingency violations were left).
+
+    method="sparse" solves the same LP assembled as sparse matrices
+    (gridmodel.sparse_opf) instead of building the Pyomo model; method="n1" adds
+    N-1 security constraints (gridmodel.security) and the entry also holds the
+    "contingencies" that were enforced.
+
+    With a gridmodel.cache.ResultCache the entry is looked up by input hash first and
+    only solved if these exact inputs have not been solved before; only optimal
+    solves are cached. With a
+    gridmodel.instrument.StageLog, the prepare/build/solve/extract stages are logged.
+    model (from nodal_model() with the same method) is updated and re-solved instead
+    of building a new model.
+    """
+    keys = {"Scenario": scenario_name, "DemandLevel": demand_level}
+
+    def solve():
+        if method == "sparse":
+            return solve_nodal_sparse(supply, lines, demand, weather, scenario_name, demand_level, model, log)
+        if method == "n1":
+            return solve_nodal_n1(supply, lines, demand, weather, scenario_name, demand_level, model, log)
+
+        with stage(log, "nodal.prepare", **keys):
+            available_capacity, costs = scenario_inputs(supply, weather, scenario_name)
+            line_cap = line_capacities(lines)
+            nodal_demand = dict(zip(demand["node"], demand[demand_level]))
+
+        with stage(log, "nodal.build", **keys):
+            if model is None:
+                engine = ScenarioEngine(
+                    build_nodal_model(demand["node"].unique(), available_capacity, costs, line_cap, nodal_demand,
+                                      line_reactances(lines)),
+                    solver_name,
+                )
+            else:
+                engine = model
+                engine.update(capacity=available_capacity, demand=nodal_demand, line_limit=line_cap)
+        with stage(log, "nodal.solve", **keys):
+            results = engine.solve(f"{scenario_name} | {demand_level}")
+        with stage(log, "nodal.extract", **keys):
+            return {
+                "outputs": collect_outputs(engine.model, costs),
+                "line_duals": line_duals(engine.model),
+                "generators": generator_duals(engine.model),
+                "solver": engine.solver_name,
+                "optimal": optimal(results),
+            }
+
+    if cache is None:
+        return solve()
+    key = scenario_key("nodal", supply, lines, demand, weather, scenario_name, demand_level, solver_name, method=method)
+    with stage(log, "nodal.cache", **keys) as record:
+        entry = cache.get(key)
+        record["hit"] = entry is not None
+    if entry is None:
+        entry = solve()
+        if entry["optimal"]:        # failed solves are tried again next time
+            cache.put(key, entry)
+    return entry
+
+
+def solve_nodal(supply, lines, demand, weather, scenario_name, demand_level, solver_name=None, cache=None,
+                method="pyomo"):
+    """Solve one scenario / demand level and return the nodalmodel.py output table."""
+    return nodal_results(supply, lines, demand, weather, scenario_name, demand_level, solver_name, cache, method)["outputs"]
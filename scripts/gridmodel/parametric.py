@@ -0,0 +1,170 @@
+from dataclasses import dataclass
+
+import highspy
+import numpy as np
+import pandas as pd
+
+from gridmodel.data import availability, line_capacities
+from gridmodel.sparse_opf import SparseNodalModel
+
+# Parametric (right-hand-side) analysis of one nodal solve.
+#
+# The sparse nodal LP (gridmodel.sparse_opf) is passed to HiGHS directly, and after
+# the solve HiGHS ranging gives, for every bound and row, the interval over which the
+# optimal basis stays the same. Inside that interval the LMPs and the set of binding
+# lines (the congestion pattern) do not change, and total cost moves linearly with the
+# dual:
+#
+#   line limit (i, j)   capacity in [CapacityLow, CapacityHigh], cost slope = Dual
+#   nodal demand n      demand in [DemandLow, DemandHigh], cost slope = LMP[n]
+#
+# so questions like "how much would 200 MW more on line 1-4 save, and does the price
+# pattern hold?" are answered from one solve. Outside the interval the basis changes
+# and a re-solve (e.g. gridmodel.sweep) is needed.
+#
+# For a line that is not binding, the limit can shrink down to the current |flow| and
+# grow without bound.
+
+
+@dataclass
+class ParametricResult:
+    total_cost: float
+    iterations: int
+    lmp: pd.DataFrame           # Node, Demand, LMP, Basis, DemandLow, DemandHigh, CostAtLow, CostAtHigh
+    lines: pd.DataFrame         # From, To, Flow, Capacity, Dual, Basis, CapacityLow, CapacityHigh, CostAtLow, CostAtHigh
+    generators: pd.DataFrame    # Node, Type, Generation, Capacity, MarginalCost, ReducedCost, Basis
+
+
+BASIS_LABELS = {
+    highspy.HighsBasisStatus.kLower: "lower",
+    highspy.HighsBasisStatus.kBasic: "basic",
+    highspy.HighsBasisStatus.kUpper: "upper",
+    highspy.HighsBasisStatus.kZero: "zero",
+    highspy.HighsBasisStatus.kNonbasic: "nonbasic",
+}
+
+
+class ParametricNodal:
+
+    def __init__(self, model):
+        self.model = model      # SparseNodalModel
+        self.A = model.A_eq.tocsc()
+
+    def _highs(self, c, bounds, b_eq):
+        lp = highspy.HighsLp()
+        lp.num_col_ = self.model.n_cols
+        lp.num_row_ = self.A.shape[0]
+        lp.col_cost_ = c
+        lp.col_lower_ = np.where(np.isinf(bounds[:, 0]), -highspy.kHighsInf, bounds[:, 0])
+        lp.col_upper_ = np.where(np.isinf(bounds[:, 1]), highspy.kHighsInf, bounds[:, 1])
+        lp.row_lower_ = b_eq
+        lp.row_upper_ = b_eq
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = self.A.indptr
+        lp.a_matrix_.index_ = self.A.indices
+        lp.a_matrix_.value_ = self.A.data
+        lp.a_matrix_.num_col_ = self.model.n_cols
+        lp.a_matrix_.num_row_ = self.A.shape[0]
+
+        h = highspy.Highs()
+        h.setOptionValue("output_flag", False)
+        h.passModel(lp)
+        return h
+
+    def analyse(self, capacity, mc, demand, line_cap):
+        """Solve once and range every line limit and nodal demand; arrays in model order."""
+        m = self.model
+        G, L, N = len(m.gens), len(m.lines), len(m.nodes)
+        capacity = np.asarray(capacity, dtype=float)
+        demand = np.asarray(demand, dtype=float)
+        line_cap = np.asarray(line_cap, dtype=float)
+
+        h = self._highs(*m.lp_data(capacity, mc, demand, line_cap))
+        h.run()
+        if h.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+            raise RuntimeError(f"Parametric analysis needs an optimal solve, got {h.modelStatusToString(h.getModelStatus())}")
+
+        solution, basis, info = h.getSolution(), h.getBasis(), h.getInfo()
+        _, ranging = h.getRanging()
+        x = np.array(solution.col_value)
+        col_dual = np.array(solution.col_dual)
+        row_dual = np.array(solution.row_dual)
+        col_basis = [BASIS_LABELS[s] for s in basis.col_status]
+        row_basis = [BASIS_LABELS[s] for s in basis.row_status]
+        total_cost = info.objective_function_value
+
+        def ranges(r):
+            return np.array(r.value_), np.array(r.objective_)
+
+        # Lines: the active bound is +cap (upper) or -cap (lower)
+        up_val, up_obj = ranges(ranging.col_bound_up)
+        dn_val, dn_obj = ranges(ranging.col_bound_dn)
+        k = slice(G, G + L)
+        flow, line_basis = x[k], col_basis[k]
+        cap_low = np.abs(flow).copy()
+        cap_high = np.full(L, np.inf)
+        cost_low = np.full(L, total_cost)
+        cost_high = np.full(L, total_cost)
+        for l, status in enumerate(line_basis):
+            c = G + l
+            if status == "upper":
+                cap_low[l], cap_high[l] = dn_val[c], up_val[c]
+                cost_low[l], cost_high[l] = dn_obj[c], up_obj[c]
+            elif status == "lower":
+                cap_low[l], cap_high[l] = -up_val[c], -dn_val[c]
+                cost_low[l], cost_high[l] = up_obj[c], dn_obj[c]
+
+        lines = pd.DataFrame({
+            "From": [i for i, _ in m.lines],
+            "To": [j for _, j in m.lines],
+            "Flow": flow,
+            "Capacity": line_cap,
+            "Dual": np.where(np.array(line_basis) == "lower", -col_dual[k], col_dual[k]),
+            "Basis": line_basis,
+            "CapacityLow": np.clip(cap_low, 0, None),
+            "CapacityHigh": cap_high,
+            "CostAtLow": cost_low,
+            "CostAtHigh": cost_high,
+        })
+
+        # Nodal demand: balance rows
+        rup_val, rup_obj = ranges(ranging.row_bound_up)
+        rdn_val, rdn_obj = ranges(ranging.row_bound_dn)
+        lmp = pd.DataFrame({
+            "Node": m.nodes,
+            "Demand": demand,
+            "LMP": row_dual[:N],
+            "Basis": row_basis[:N],
+            "DemandLow": rdn_val[:N],
+            "DemandHigh": rup_val[:N],
+            "CostAtLow": rdn_obj[:N],
+            "CostAtHigh": rup_obj[:N],
+        })
+
+        generators = pd.DataFrame({
+            "Node": [n for n, _ in m.gens],
+            "Type": [t for _, t in m.gens],
+            "Generation": x[:G],
+            "Capacity": capacity,
+            "MarginalCost": np.asarray(mc, dtype=float),
+            "ReducedCost": col_dual[:G],
+            "Basis": col_basis[:G],
+        })
+        return ParametricResult(total_cost, info.simplex_iteration_count, lmp, lines, generators)
+
+
+def parametric_analysis(supply, lines, demand, weather, scenario_name, demand_level):
+    """ParametricResult for one scenario / demand level of the nodal model."""
+    model = SparseNodalModel.from_inputs(supply, lines, demand["node"].unique())
+    table = availability(supply, weather)
+    gen_index = {g: k for k, g in enumerate(table.gens)}
+    order = [gen_index[g] for g in model.gens]
+    nodal_demand = dict(zip(demand["node"], demand[demand_level]))
+    line_cap = line_capacities(lines)
+
+    return ParametricNodal(model).analyse(
+        table.row(scenario_name)[order],
+        table.mc[order],
+        np.array([nodal_demand.get(n, 0) for n in model.nodes], dtype=float),
+        np.array([line_cap[l] for l in model.lines], dtype=float),
+    )
@@ -0,0 +1,114 @@
+import numpy as np
+
+# DC load flow via power transfer distribution factors.
+#
+# For fixed net injections the DC flows are the solution of a linear system, so no
+# LP is needed: flows = PTDF @ injections. With the PTDF computed once per topology,
+# a whole batch of injection vectors (dispatches, Monte Carlo draws) is checked with
+# one matrix multiply.
+#
+# Line outage distribution factors (LODFs) follow from the PTDF of the same topology:
+# after line k trips, flow_l becomes flow_l + LODF[l, k] * flow_k, so every single-line
+# outage is screened with one more matrix product (gridmodel.security).
+#
+# Lines default to reactance 1, i.e. flow = theta_i - theta_j as in the Pyomo models.
+# An optional `reactance` column in the lines file gives flow = (theta_i - theta_j) / x.
+
+
+class PTDFEngine:
+
+    def __init__(self, nodes, line_cap, reactance=None, slack=None):
+        self.nodes = list(nodes)
+        self.lines = list(line_cap.keys())
+        self.line_cap = line_cap
+        self.node_index = {n: k for k, n in enumerate(self.nodes)}
+        self.capacity = np.array([line_cap[l] for l in self.lines], dtype=float)
+        self.reactance = (
+            np.ones(len(self.lines)) if reactance is None
+            else np.array([reactance[l] for l in self.lines], dtype=float)
+        )
+        self.slack = self.nodes[0] if slack is None else slack
+
+        # Line-node incidence: +1 at the from-node, -1 at the to-node
+        self.incidence = np.zeros((len(self.lines), len(self.nodes)))
+        for k, (i, j) in enumerate(self.lines):
+            self.incidence[k, self.node_index[i]] = 1
+            self.incidence[k, self.node_index[j]] = -1
+
+        self.ptdf = self._compute_ptdf()
+        self._lodf = None
+
+    @classmethod
+    def from_lines(cls, lines, nodes=None, slack=None):
+        """Build from a lines DataFrame (from_node, to_node, linecap[, reactance])."""
+        line_cap = {(i, j): cap for i, j, cap in lines[["from_node", "to_node", "linecap"]].itertuples(index=False)}
+        reactance = None
+        if "reactance" in lines.columns:
+            reactance = {(i, j): x for i, j, x in lines[["from_node", "to_node", "reactance"]].itertuples(index=False)}
+        if nodes is None:
+            nodes = sorted(set(lines["from_node"]).union(lines["to_node"]))
+        return cls(nodes, line_cap, reactance, slack)
+
+    def _compute_ptdf(self):
+        b = 1.0 / self.reactance
+        bf = b[:, None] * self.incidence              # line flows per unit angle (L x N)
+        bbus = self.incidence.T @ bf                  # nodal susceptance matrix (N x N)
+
+        keep = [k for k, n in enumerate(self.nodes) if n != self.slack]
+        ptdf = np.zeros((len(self.lines), len(self.nodes)))
+        try:
+            ptdf[:, keep] = np.linalg.solve(bbus[np.ix_(keep, keep)], bf[:, keep].T).T
+        except np.linalg.LinAlgError:
+            raise ValueError("Network is not connected; PTDF is undefined.")
+        return ptdf
+
+    def lodf(self, tol=1e-9):
+        """Line outage distribution factors (L x L), computed on first use and kept.
+
+        lodf[l, k] is the change of flow on line l per MW line k carried before it
+        tripped; lodf[k, k] = -1. Columns of lines whose outage splits the network
+        (bridges) are NaN: no dispatch survives those outages without islanding.
+        """
+        if self._lodf is None:
+            # Flow on every line for 1 MW sent from the from-node to the to-node of line k
+            transfer = self.ptdf @ self.incidence.T
+            denom = 1.0 - np.diag(transfer)
+            bridge = np.abs(denom) < tol
+            lodf = transfer / np.where(bridge, 1.0, denom)
+            lodf[np.diag_indices_from(lodf)] = -1.0
+            lodf[:, bridge] = np.nan
+            self._lodf = lodf
+        return self._lodf
+
+    def bridges(self):
+        """Indices of lines whose outage islands part of the network."""
+        return np.flatnonzero(np.isnan(self.lodf()[0]))
+
+    def injection_vector(self, net_injection):
+        """Dict {node: MW} → array in node order (missing nodes are 0)."""
+        return np.array([net_injection.get(n, 0) for n in self.nodes], dtype=float)
+
+    def flows(self, injections):
+        """Line flows for one (N,) or a batch (K x N) of balanced net injections."""
+        return np.asarray(injections, dtype=float) @ self.ptdf.T
+
+    def overloads(self, injections, tol=1e-3):
+        """Overload (|flow| - capacity, 0 where within limits) with the same shape as flows()."""
+        over = np.abs(self.flows(injections)) - self.capacity
+        return np.where(over > tol, over, 0.0)
+
+    def violations(self, net_injection, tol=1e-3):
+        """Violated lines for one dispatch, as the records uniform_3_feasibility.py writes."""
+        flows = self.flows(self.injection_vector(net_injection))
+        violations = []
+        for k, (i, j) in enumerate(self.lines):
+            cap = self.line_cap[(i, j)]
+            if abs(flows[k]) > cap + tol:
+                violations.append({
+                    "From": i,
+                    "To": j,
+                    "Flow": flows[k],
+                    "Capacity": cap,
+                    "Overload": abs(flows[k]) - cap,
+                })
+        return violations
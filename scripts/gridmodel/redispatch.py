@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from gridmodel.builder import build_redispatch_model
+from gridmodel.data import RENEWABLE_TYPES
+from gridmodel.engine import ScenarioEngine
+
+# Two ways to remove line overloads from a uniform (copper-plate) dispatch:
+#   heuristic_redispatch → the thesis method from uniform_4_redispatch.py (10 MW steps)
+#   optimal_redispatch   → one cost-minimising LP with the DC flow constraints
+# Both return (dispatch after redispatch, curtailment in MW, redispatch cost in €),
+# where the cost is what is paid to units that are ramped up.
+
+STEP = 10
+MAX_ITER = 1000
+
+
+def heuristic_redispatch(dispatch, violations, supply):
+    """uniform_4_redispatch.py: stepwise curtailment / ramp-up; returns (dispatch, curtailment, cost)."""
+    df = dispatch.copy()
+    cap = dict(zip(zip(supply["node"], supply["type"]), supply["adjusted_capacity"]))
+    df["adjusted_capacity"] = [cap[(n, t)] for n, t in zip(df["Node"], df["Type"])]
+
+    exporting_nodes = set(violations["From"])
+    importing_nodes = set(violations["To"])
+
+    curtailment = 0
+    redispatch_cost = 0
+
+    for _ in range(MAX_ITER):
+        changes = 0
+
+        for node in exporting_nodes:
+            vre_units = df[(df["Node"] == node) & (df["Type"].isin(RENEWABLE_TYPES)) & (df["Value"] > 0)]
+            vre_units = vre_units.sort_values("mc")
+            for idx in vre_units.index:
+                reduce = min(STEP, df.at[idx, "Value"])
+                if reduce > 0:
+                    df.at[idx, "Value"] -= reduce
+                    curtailment += reduce
+                    changes += 1
+                    break
+
+        for node in importing_nodes:
+            conv_units = df[(df["Node"] == node) & (~df["Type"].isin(RENEWABLE_TYPES))]
+            conv_units = conv_units.sort_values("mc")
+            for idx in conv_units.index:
+                room = df.at[idx, "adjusted_capacity"] - df.at[idx, "Value"]
+                increase = min(STEP, room)
+                if increase > 0:
+                    df.at[idx, "Value"] += increase
+                    redispatch_cost += increase * df.at[idx, "mc"]
+                    changes += 1
+                    break
+
+        if changes == 0:
+            break
+
+    return df.drop(columns="adjusted_capacity"), curtailment, redispatch_cost
+
+
+def optimal_redispatch(dispatch, available_capacity, line_cap, nodal_demand, solver_name=None, reactance=None):
+    """Cost-based redispatch LP; dispatch has Node, Type, Value, mc (as from uniform_dispatch)."""
+    gens = list(zip(dispatch["Node"], dispatch["Type"]))
+    costs = dict(zip(gens, dispatch["mc"]))
+
+    # Clip solver noise (-0.0, tiny overshoots) so the base dispatch is within bounds
+    base = {g: min(max(v, 0.0), available_capacity[g]) for g, v in zip(gens, dispatch["Value"])}
+    nodes = sorted(set(nodal_demand).union(n for n, _ in gens))
+
+    model = build_redispatch_model(nodes, base, available_capacity, costs, line_cap, nodal_demand, reactance)
+    ScenarioEngine(model, solver_name).solve("optimal redispatch")
+
+    # NaN if the solve failed
+    up = np.array([model.p_up[g].value for g in gens], dtype=float)
+    down = np.array([model.p_down[g].value for g in gens], dtype=float)
+
+    df = dispatch.copy()
+    df["Up"] = up
+    df["Down"] = down
+    df["Value"] = [base[g] + u - d for g, u, d in zip(gens, up, down)]
+
+    curtailment = df.loc[df["Type"].isin(RENEWABLE_TYPES), "Down"].sum()
+    redispatch_cost = (df["Up"] * df["mc"]).sum()
+    return df, curtailment, redispatch_cost
@@ -0,0 +1,176 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from functools import lru_cache
+from itertools import product
+
+import pandas as pd
+
+from gridmodel.cache import ResultCache
+from gridmodel.data import load_inputs
+from gridmodel.instrument import StageLog, stage
+from gridmodel.network import Grid
+from gridmodel.nodal import nodal_results
+from gridmodel.store import ResultStore, nodal_tables, uniform_tables
+from gridmodel.uniform import run_uniform
+
+# Parallel scenario runner: every (weather scenario, demand level, line dataset)
+# combination is an independent solve, so the grid is spread over a process pool
+# and the results are merged into one table per output type. Each run also reports
+# its system totals, which can be streamed into a gridmodel.aggregate.ScenarioAggregator.
+
+SCENARIOS = ["hs", "hw", "lwls"]
+DEMAND_LEVELS = ["offpeak_demand", "average_demand", "peak_demand"]
+LINE_FILES = ["lines.csv"]
+TRACKS = ["nodal", "uniform"]
+
+
+# Input grids shared by the parent process, by (data_dir, lines_file); see run_grid
+_SHARED_GRIDS = {}
+
+
+def _init_worker(handles):
+    for key, handle in handles.items():
+        _SHARED_GRIDS[key] = Grid.attach(handle)
+
+
+@lru_cache(maxsize=None)
+def _inputs(data_dir, lines_file):
+    # Each worker process builds the inputs once and re-uses them for all its tasks: from
+    # the parent's shared-memory grid if there is one, else from the CSVs
+    grid = _SHARED_GRIDS.get((data_dir, lines_file))
+    if grid is not None:
+        return grid.frames()
+    return load_inputs(data_dir, lines_file)
+
+
+def run_task(task):
+    """Solve one grid point; runs inside a worker process.
+
+    Returns (keys, results, totals, failed): results are the per-run tables, totals the
+    system values of each track ({"nodal": {...}, "uniform": {...}}), failed the tracks
+    whose solve found no optimal solution.
+    """
+    (scenario_name, demand_level, lines_file, tracks, data_dir, solver_name, redispatch, cache_dir, store_dir,
+     nodal_method, log_options) = task
+    supply, lines, demand, weather = _inputs(data_dir, lines_file)
+    cache = ResultCache(cache_dir) if cache_dir else None
+    store = ResultStore(store_dir) if store_dir else None
+    keys = {"Scenario": scenario_name, "DemandLevel": demand_level, "Lines": os.path.splitext(lines_file)[0]}
+    log = StageLog(**log_options, Lines=keys["Lines"]) if log_options else None
+    results = {}
+    totals = {}
+    failed = []
+
+    with stage(log, "run", Scenario=scenario_name, DemandLevel=demand_level, pid=os.getpid()):
+        if "nodal" in tracks:
+            entry = nodal_results(
+                supply, lines, demand, weather, scenario_name, demand_level, solver_name, cache, nodal_method, log
+            )
+            if store is not None:
+                # Each task owns its partition, so workers write to the store directly
+                with stage(log, "nodal.store", Scenario=scenario_name, DemandLevel=demand_level):
+                    store.write_tables(nodal_tables(entry["outputs"], entry["line_duals"], supply, entry["solver"],
+                                                    entry.get("contingencies")), **keys)
+            else:
+                results["nodal"] = entry["outputs"].assign(**keys, Solver=entry["solver"])
+                results["nodal_flows"] = entry["line_duals"].assign(**keys)
+                if entry.get("contingencies") is not None and not entry["contingencies"].empty:
+                    results["nodal_contingencies"] = entry["contingencies"].assign(**keys)
+            if not entry["optimal"]:
+                failed.append("nodal")
+            outputs = entry["outputs"]
+            totals["nodal"] = outputs[outputs["Node"] == "System"].set_index("Category")["Value"].astype(float).to_dict()
+
+        if "uniform" in tracks:
+            result = run_uniform(
+                supply, lines, demand, weather, scenario_name, demand_level, solver_name, redispatch, cache=cache, log=log
+            )
+            if store is not None:
+                with stage(log, "uniform.store", Scenario=scenario_name, DemandLevel=demand_level):
+                    store.write_tables(uniform_tables(result), **keys)
+            else:
+                results["uniform_summary"] = pd.DataFrame([{**keys, **result.record()}])
+                violations = result.feasibility.violations
+                if violations is not None and not violations.empty:
+                    results["uniform_violations"] = violations.assign(**keys)
+            totals["uniform"] = result.record()
+            if not result.optimal:
+                failed.append("uniform")
+
+    return keys, results, totals, failed
+
+
+def scenario_grid(scenarios=SCENARIOS, demand_levels=DEMAND_LEVELS, line_files=LINE_FILES,
+                  tracks=TRACKS, data_dir="data", solver_name=None, redispatch="heuristic", cache_dir=None,
+                  store_dir=None, nodal_method="pyomo", log_options=None):
+    """Task tuples for run_grid; with store_dir set, results go to a ResultStore instead of merged tables.
+
+    log_options are gridmodel.instrument.StageLog arguments (path, memory, profile_dir);
+    every task then logs its stages to that file.
+    """
+    return [
+        (scenario_name, demand_level, lines_file, tuple(tracks), data_dir, solver_name, redispatch, cache_dir, store_dir,
+         nodal_method, log_options)
+        for lines_file, scenario_name, demand_level in product(line_files, scenarios, demand_levels)
+    ]
+
+
+def run_grid(tasks, workers=None, aggregator=None, keep=True):
+    """Solve all tasks (workers=1 runs in-process) and return {output name: DataFrame}.
+
+    Every finished run is passed to aggregator.add(keys, totals). With keep=False the
+    per-run tables are dropped as soon as they are aggregated (an empty dict is
+    returned), so memory does not grow with the number of tasks.
+    """
+    collected = {}
+
+    def collect(keys, results, totals, failed):
+        label = f"{keys['Scenario']} | {keys['DemandLevel']} | {keys['Lines']}"
+        print(f"⚠️ {label}: no optimal solution ({', '.join(failed)})" if failed else f"✅ {label}")
+        if aggregator is not None:
+            aggregator.add(keys, totals)
+        if keep:
+            for name, df in results.items():
+                collected.setdefault(name, []).append(df)
+
+    if workers == 1:
+        for task in tasks:
+            collect(*run_task(task))
+    else:
+        # Inputs are read and validated once here and passed to the workers in shared memory
+        with ExitStack() as shared:
+            handles = {
+                key: shared.enter_context(Grid.load(*key).share())
+                for key in dict.fromkeys((t[4], t[2]) for t in tasks)
+            }
+            # A bounded number of tasks in flight, so finished results are not held by pending futures
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(handles,)) as pool:
+                limit = 2 * (workers or os.cpu_count())
+                pending = set()
+                for task in tasks:
+                    if len(pending) >= limit:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            collect(*future.result())
+                    pending.add(pool.submit(run_task, task))
+                for future in wait(pending).done:
+                    collect(*future.result())
+
+    # Key columns first, rows in grid order regardless of completion order
+    order = {(t[0], t[1], os.path.splitext(t[2])[0]): k for k, t in enumerate(tasks)}
+    merged = {}
+    for name, frames in collected.items():
+        df = pd.concat(frames, ignore_index=True)
+        key_cols = ["Scenario", "DemandLevel", "Lines"]
+        df = df[key_cols + [c for c in df.columns if c not in key_cols]]
+        rank = df[key_cols].apply(tuple, axis=1).map(order)
+        merged[name] = df.iloc[rank.argsort(kind="stable")].reset_index(drop=True)
+
+    return merged
+
+
+def write_results(merged, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, df in merged.items():
+        df.to_csv(os.path.join(out_dir, f"{name}.csv"), index=False)
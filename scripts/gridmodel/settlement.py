@@ -0,0 +1,174 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Settlement of solved nodal models as array operations.
+#
+# The primal and dual values are pulled out of the model once, into arrays stacked
+# over K solves (scenarios, demand levels, hours, ...):
+#
+#   generation (K x G), flow (K x L), theta (K x N), lmp (K x N), total_cost (K,)
+#
+# and every settlement quantity follows from a few array operations:
+#
+#   surplus[k, g]        (lmp[k, node(g)] - mc[g]) * generation[k, g]
+#   total_paid[k]        Σ_g lmp[k, node(g)] * generation[k, g]
+#   total_surplus[k]     total_paid[k] - total_cost[k]
+#   check_surplus_sum[k] Σ_g surplus[k, g]  (equals total_surplus[k], a consistency check)
+#
+# A missing balance dual (solver returned none) counts as a price of 0 in the
+# payments, and is NaN in the LMP rows, as before.
+#
+#   solution = stack([from_pyomo(model, costs) for ...])      # or from_sparse(...)
+#   table = output_table(solution, keys=[{"Scenario": "hs", ...}, ...])
+
+
+def values(component):
+    """Values of an indexed Pyomo variable or mutable Param in index order (NaN where unset)."""
+    return np.array([v.value for v in component.values()], dtype=float)
+
+
+def duals(suffix, constraint, default=np.nan):
+    """Duals of an indexed constraint in index order from a model.dual / model.rc suffix."""
+    return np.array([suffix.get(c, default) for c in constraint.values()], dtype=float)
+
+
+@dataclass
+class NodalSolution:
+    gens: list                  # (node, tech)
+    lines: list                 # (from, to)
+    nodes: list
+    gen_node: np.ndarray        # (G,) position of each generator's node in nodes
+    mc: np.ndarray              # (G,)
+    generation: np.ndarray      # (K x G)
+    flow: np.ndarray            # (K x L)
+    theta: np.ndarray           # (K x N)
+    lmp: np.ndarray             # (K x N), NaN where no dual was returned
+    total_cost: np.ndarray      # (K,)
+
+    def __len__(self):
+        return len(self.total_cost)
+
+
+def from_pyomo(model, costs):
+    """Solution of a solved gridmodel.builder.build_nodal_model model (K = 1).
+
+    The objective is Σ costs * p_gen, so total cost is taken as mc @ generation instead
+    of evaluating the Pyomo objective expression term by term.
+    """
+    gens, lines, nodes = list(model.GENS), list(model.LINES), list(model.NODES)
+    node_index = {n: k for k, n in enumerate(nodes)}
+    mc = np.array([costs[g] for g in gens], dtype=float)
+    generation = values(model.p_gen)
+    return NodalSolution(
+        gens, lines, nodes,
+        gen_node=np.array([node_index[n] for n, _ in gens], dtype=np.int64),
+        mc=mc,
+        generation=generation[None, :],
+        flow=values(model.p_flow)[None, :],
+        theta=values(model.theta)[None, :],
+        lmp=duals(model.dual, model.NodalBalance)[None, :],
+        total_cost=np.array([mc @ generation]),
+    )
+
+
+def from_sparse(model, result, mc):
+    """Solution of a gridmodel.sparse_opf.SparseNodalModel solve (K = 1)."""
+    return NodalSolution(
+        model.gens, model.lines, model.nodes,
+        gen_node=model.gen_node,
+        mc=np.asarray(mc, dtype=float),
+        generation=result.generation[None, :],
+        flow=result.flow[None, :],
+        theta=result.theta[None, :],
+        lmp=result.lmp[None, :],
+        total_cost=np.array([result.total_cost]),
+    )
+
+
+def stack(solutions):
+    """One NodalSolution of all solves; they must share generators, lines and nodes."""
+    first = solutions[0]
+    return NodalSolution(
+        first.gens, first.lines, first.nodes, first.gen_node, first.mc,
+        generation=np.concatenate([s.generation for s in solutions]),
+        flow=np.concatenate([s.flow for s in solutions]),
+        theta=np.concatenate([s.theta for s in solutions]),
+        lmp=np.concatenate([s.lmp for s in solutions]),
+        total_cost=np.concatenate([s.total_cost for s in solutions]),
+    )
+
+
+@dataclass
+class Settlement:
+    surplus: np.ndarray             # (K x G)
+    total_cost: np.ndarray          # (K,)
+    total_paid: np.ndarray          # (K,)
+    total_surplus: np.ndarray       # (K,)
+    check_surplus_sum: np.ndarray   # (K,)
+
+
+def settle(solution):
+    gen_lmp = np.nan_to_num(solution.lmp, nan=0.0)[:, solution.gen_node]
+    surplus = (gen_lmp - solution.mc) * solution.generation
+    total_paid = np.einsum("kg,kg->k", gen_lmp, solution.generation)
+    return Settlement(
+        surplus=surplus,
+        total_cost=solution.total_cost,
+        total_paid=total_paid,
+        total_surplus=total_paid - solution.total_cost,
+        check_surplus_sum=surplus.sum(axis=1),
+    )
+
+
+def output_table(solution, settlement=None, keys=None):
+    """Long-format rows (Node, Type, Category, Value) as written to outputs/nodal/, for all K solves.
+
+    Rows of each solve: Generation/Surplus per generator, Flow per line, LMP/Angle per
+    node, then TotalCost, TotalPaid, TotalSurplus and CheckSurplusSum. keys (one dict
+    per solve) are added as leading columns.
+    """
+    if settlement is None:
+        settlement = settle(solution)
+    G, L, N = len(solution.gens), len(solution.lines), len(solution.nodes)
+    K = len(solution)
+
+    # Row labels are the same for every solve; values are (K x rows)
+    system = ["TotalCost", "TotalPaid", "TotalSurplus", "CheckSurplusSum"]
+    node = np.concatenate([
+        np.repeat(np.array([n for n, _ in solution.gens], dtype=object), 2),
+        np.array([i for i, _ in solution.lines], dtype=object),
+        np.repeat(np.array(solution.nodes, dtype=object), 2),
+        np.full(len(system), "System", dtype=object),
+    ])
+    kind = np.concatenate([
+        np.repeat(np.array([t for _, t in solution.gens], dtype=object), 2),
+        np.array([f"to_{j}" for _, j in solution.lines], dtype=object),
+        np.full(2 * N + len(system), "", dtype=object),
+    ])
+    category = np.concatenate([
+        np.tile(["Generation", "Surplus"], G),
+        np.full(L, "Flow"),
+        np.tile(["LMP", "Angle"], N),
+        system,
+    ])
+    value = np.concatenate([
+        np.stack([solution.generation, settlement.surplus], axis=2).reshape(K, 2 * G),
+        solution.flow,
+        np.stack([solution.lmp, solution.theta], axis=2).reshape(K, 2 * N),
+        np.column_stack([settlement.total_cost, settlement.total_paid,
+                         settlement.total_surplus, settlement.check_surplus_sum]),
+    ], axis=1)
+
+    rows = len(category)
+    table = pd.DataFrame({
+        "Node": np.tile(node, K),
+        "Type": np.tile(kind, K),
+        "Category": np.tile(category, K),
+        "Value": value.ravel(),
+    })
+    if keys is not None:
+        key_cols = pd.DataFrame(list(keys)).loc[np.repeat(np.arange(K), rows)].reset_index(drop=True)
+        table = pd.concat([key_cols, table], axis=1)
+    return table
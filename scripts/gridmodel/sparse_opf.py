@@ -0,0 +1,201 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linprog
+from scipy.sparse import coo_array
+
+from gridmodel import instrument
+from gridmodel.data import availability, line_capacities
+from gridmodel.settlement import from_sparse, output_table
+
+# Nodal DC-OPF assembled directly as sparse matrices, without Pyomo expressions.
+#
+# Columns are x = [p_gen (G), p_flow (L), theta (N)] and the equality rows are
+#
+#   NodalBalance (N):  Σ p_gen at n + Σ inflow - Σ outflow = demand[n]
+#   DCFlow (L):        p_flow[i, j] - (theta[i] - theta[j]) / x = 0
+#
+# Generator and line capacities are variable bounds, so their duals are the bound
+# marginals HiGHS reports. The constraint matrix depends only on the topology: it is
+# built once, and a scenario only changes the bounds, costs and right-hand side.
+# Results are the same LP as gridmodel.builder.build_nodal_model (LMPs are the
+# balance-row duals), in the nodalmodel.py output format.
+
+
+@dataclass
+class SparseNodalResult:
+    generation: np.ndarray      # (G,)
+    flow: np.ndarray            # (L,)
+    theta: np.ndarray           # (N,)
+    lmp: np.ndarray             # (N,) duals of the balance rows
+    line_dual_pos: np.ndarray   # (L,) duals of flow <= limit
+    line_dual_neg: np.ndarray   # (L,) duals of flow >= -limit
+    capacity_dual: np.ndarray   # (G,) duals of p_gen <= capacity
+    reduced_cost: np.ndarray    # (G,) reduced cost of p_gen at its lower bound 0
+    total_cost: float
+    status: int                 # scipy.optimize.linprog status, 0 = optimal
+    message: str = ""
+    ineq_dual: np.ndarray = None    # duals of the extra A_ub rows, if any
+
+
+class SparseNodalModel:
+
+    def __init__(self, nodes, gens, lines, reactance=None):
+        self.nodes = list(nodes)
+        self.gens = list(gens)              # (node, tech)
+        self.lines = list(lines)            # (from, to)
+        node_index = {n: k for k, n in enumerate(self.nodes)}
+
+        N, G, L = len(self.nodes), len(self.gens), len(self.lines)
+        self.n_cols = G + L + N
+        self.gen_node = np.array([node_index[n] for n, _ in self.gens], dtype=np.int64)
+        frm = np.array([node_index[i] for i, _ in self.lines], dtype=np.int64)
+        to = np.array([node_index[j] for _, j in self.lines], dtype=np.int64)
+        b = np.ones(L) if reactance is None else 1.0 / np.asarray(reactance, dtype=float)
+
+        gen_cols = np.arange(G)
+        flow_cols = G + np.arange(L)
+        theta_cols = G + L
+        dc_rows = N + np.arange(L)
+
+        rows = np.concatenate([
+            self.gen_node, to, frm,                                 # balance: generation, inflow, outflow
+            dc_rows, dc_rows, dc_rows,                              # DC flow
+        ])
+        cols = np.concatenate([
+            gen_cols, flow_cols, flow_cols,
+            flow_cols, theta_cols + frm, theta_cols + to,
+        ])
+        vals = np.concatenate([
+            np.ones(G), np.ones(L), -np.ones(L),
+            np.ones(L), -b, b,
+        ])
+        self.A_eq = coo_array((vals, (rows, cols)), shape=(N + L, self.n_cols)).tocsr()
+
+    @classmethod
+    def from_inputs(cls, supply, lines, nodes=None):
+        """Topology from the supply and lines tables (an optional lines `reactance` column is used)."""
+        gens = list(zip(supply["node"].tolist(), supply["type"].tolist()))
+        line_keys = list(zip(lines["from_node"].tolist(), lines["to_node"].tolist()))
+        if nodes is None:
+            nodes = list(dict.fromkeys(supply["node"].tolist() + lines["from_node"].tolist() + lines["to_node"].tolist()))
+        reactance = lines["reactance"].to_numpy() if "reactance" in lines.columns else None
+        return cls(nodes, gens, line_keys, reactance)
+
+    def lp_data(self, capacity, mc, demand, line_cap):
+        """Cost vector, (n_cols x 2) bounds and equality rhs for one scenario."""
+        G, L, N = len(self.gens), len(self.lines), len(self.nodes)
+        line_cap = np.asarray(line_cap, dtype=float)
+
+        c = np.concatenate([np.asarray(mc, dtype=float), np.zeros(L + N)])
+        bounds = np.empty((self.n_cols, 2))
+        bounds[:G, 0], bounds[:G, 1] = 0.0, capacity
+        bounds[G:G + L, 0], bounds[G:G + L, 1] = -line_cap, line_cap
+        bounds[G + L:] = -np.inf, np.inf
+        b_eq = np.concatenate([np.asarray(demand, dtype=float), np.zeros(L)])
+        return c, bounds, b_eq
+
+    def solve(self, capacity, mc, demand, line_cap, A_ub=None, b_ub=None):
+        """Solve for (G,) capacity and mc, (N,) demand and (L,) line limits, all in model order.
+
+        A_ub x <= b_ub adds inequality rows over the same columns (e.g. contingency limits).
+        """
+        G, L, N = len(self.gens), len(self.lines), len(self.nodes)
+        c, bounds, b_eq = self.lp_data(capacity, mc, demand, line_cap)
+
+        res = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=self.A_eq, b_eq=b_eq, bounds=bounds, method="highs")
+        n_rows = self.A_eq.shape[0] + (0 if A_ub is None else A_ub.shape[0])
+        instrument.note_solve(self.n_cols, n_rows, res.nit)
+        if res.status != 0:
+            nan = np.full(self.n_cols, np.nan)
+            return SparseNodalResult(
+                nan[:G], nan[:L], nan[:N], nan[:N], nan[:L], nan[:L], nan[:G], nan[:G], np.nan, res.status, res.message
+            )
+
+        x = res.x
+        return SparseNodalResult(
+            generation=x[:G],
+            flow=x[G:G + L],
+            theta=x[G + L:],
+            lmp=res.eqlin.marginals[:N],
+            line_dual_pos=res.upper.marginals[G:G + L],
+            line_dual_neg=res.lower.marginals[G:G + L],
+            capacity_dual=res.upper.marginals[:G],
+            reduced_cost=res.lower.marginals[:G],
+            total_cost=res.fun,
+            status=res.status,
+            message=res.message,
+            ineq_dual=None if A_ub is None else res.ineqlin.marginals,
+        )
+
+    # ========== Outputs ==========
+
+    def outputs(self, result, mc):
+        """Long-format rows in the same order and schema as gridmodel.nodal.collect_outputs."""
+        return output_table(from_sparse(self, result, mc))
+
+    def line_duals(self, result, line_cap):
+        """Same columns as gridmodel.nodal.line_duals."""
+        line_cap = np.asarray(line_cap, dtype=float)
+        return pd.DataFrame({
+            "From": [i for i, _ in self.lines],
+            "To": [j for _, j in self.lines],
+            "Flow": result.flow,
+            "Capacity": line_cap,
+            "DualPos": result.line_dual_pos,
+            "DualNeg": result.line_dual_neg,
+            "Basis": bound_status(result.flow, -line_cap, line_cap),
+        })
+
+    def generator_duals(self, result, capacity):
+        """Same columns as gridmodel.nodal.generator_duals."""
+        capacity = np.asarray(capacity, dtype=float)
+        return pd.DataFrame({
+            "Node": [n for n, _ in self.gens],
+            "Type": [t for _, t in self.gens],
+            "Generation": result.generation,
+            "Capacity": capacity,
+            "CapacityDual": result.capacity_dual,
+            "ReducedCost": result.reduced_cost,
+            "Basis": bound_status(result.generation, 0.0, capacity),
+        })
+
+
+def bound_status(value, lower, upper, tol=1e-6):
+    """"upper"/"lower" where value sits on a bound, "basic" in between (the LP basis status
+    of a bounded variable, barring degeneracy)."""
+    value = np.asarray(value, dtype=float)
+    return np.where(value >= upper - tol, "upper", np.where(value <= lower + tol, "lower", "basic"))
+
+
+def solve_nodal_sparse(supply, lines, demand, weather, scenario_name, demand_level, model=None, log=None):
+    """Sparse-matrix counterpart of gridmodel.nodal.nodal_results; returns the same entry."""
+    keys = {"Scenario": scenario_name, "DemandLevel": demand_level}
+    with instrument.stage(log, "nodal.build", **keys):
+        model = SparseNodalModel.from_inputs(supply, lines, demand["node"].unique()) if model is None else model
+        table = availability(supply, weather)
+
+        # Scenario inputs as arrays in model order
+        gen_index = {g: k for k, g in enumerate(table.gens)}
+        order = [gen_index[g] for g in model.gens]
+        capacity = table.row(scenario_name)[order]
+        mc = table.mc[order]
+        nodal_demand = dict(zip(demand["node"], demand[demand_level]))
+        demand_vec = np.array([nodal_demand.get(n, 0) for n in model.nodes], dtype=float)
+        line_cap = line_capacities(lines)
+        cap_vec = np.array([line_cap[l] for l in model.lines], dtype=float)
+
+    with instrument.stage(log, "nodal.solve", **keys):
+        result = model.solve(capacity, mc, demand_vec, cap_vec)
+    if result.status != 0:
+        print(f"WARNING: Solver failed for {scenario_name} | {demand_level}")
+
+    with instrument.stage(log, "nodal.extract", **keys):
+        return {
+            "outputs": model.outputs(result, mc),
+            "line_duals": model.line_duals(result, cap_vec),
+            "generators": model.generator_duals(result, capacity),
+            "solver": "sparse",
+            "optimal": result.status == 0,
+        }
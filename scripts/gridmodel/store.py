@@ -0,0 +1,156 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Typed columnar result store. Instead of one long-format CSV per run (mixed "System"
+# and integer nodes in one column, labels like "TotalPaid" inside numeric columns),
+# every result type is its own Parquet table with a fixed schema, partitioned by run:
+#
+#   outputs/store/<table>/Lines=lines/Scenario=hs/DemandLevel=peak_demand/part-0.parquet
+#
+# Reads go through pyarrow.dataset, so partition filters skip whole directories and
+# only the requested columns are decoded:
+#
+#   store = ResultStore("outputs/store")
+#   lmp = store.read("nodal_lmp", columns=["Node", "LMP"], Scenario="hs")
+
+PARTITIONS = ["Lines", "Scenario", "DemandLevel"]
+PARTITION_SCHEMA = pa.schema([(p, pa.string()) for p in PARTITIONS])
+
+SCHEMAS = {
+    "nodal_generation": pa.schema([
+        ("Node", pa.int64()), ("Type", pa.string()),
+        ("Generation", pa.float64()), ("MarginalCost", pa.float64()), ("Surplus", pa.float64()),
+    ]),
+    "nodal_flows": pa.schema([
+        ("From", pa.int64()), ("To", pa.int64()),
+        ("Flow", pa.float64()), ("Capacity", pa.float64()), ("DualPos", pa.float64()), ("DualNeg", pa.float64()),
+    ]),
+    "nodal_lmp": pa.schema([
+        ("Node", pa.int64()), ("LMP", pa.float64()), ("Angle", pa.float64()),
+    ]),
+    "nodal_contingencies": pa.schema([
+        ("Outage_From", pa.int64()), ("Outage_To", pa.int64()), ("From", pa.int64()), ("To", pa.int64()),
+        ("PostFlow", pa.float64()), ("Limit", pa.float64()), ("Dual", pa.float64()), ("Round", pa.int64()),
+    ]),
+    "nodal_system": pa.schema([
+        ("TotalCost", pa.float64()), ("TotalPaid", pa.float64()),
+        ("TotalSurplus", pa.float64()), ("CheckSurplusSum", pa.float64()), ("Solver", pa.string()),
+    ]),
+    "uniform_generation": pa.schema([
+        ("Node", pa.int64()), ("Type", pa.string()), ("MarginalCost", pa.float64()),
+        ("Generation", pa.float64()), ("Surplus", pa.float64()), ("Redispatched", pa.float64()),
+    ]),
+    "uniform_violations": pa.schema([
+        ("From", pa.int64()), ("To", pa.int64()),
+        ("Flow", pa.float64()), ("Capacity", pa.float64()), ("Overload", pa.float64()),
+    ]),
+    "uniform_system": pa.schema([
+        ("TotalDemand", pa.float64()), ("TotalCost", pa.float64()), ("ClearingPrice", pa.float64()),
+        ("TotalPaid", pa.float64()), ("TotalSurplus", pa.float64()), ("Violations", pa.int64()),
+        ("Adjusted_TEC", pa.float64()), ("Adjusted_TPC", pa.float64()), ("Curtailment_MWh", pa.float64()),
+        ("Redispatch_Cost", pa.float64()), ("Redispatch_Mode", pa.string()), ("Solver", pa.string()),
+    ]),
+}
+
+
+# ========== Result → Tables ==========
+
+def nodal_tables(outputs, line_duals, supply, solver=None, contingencies=None):
+    """Split a nodalmodel.py output table (plus gridmodel.nodal.line_duals and, for N-1
+    runs, the contingency constraints) into typed tables."""
+    gens = outputs[outputs["Category"].isin(["Generation", "Surplus"])]
+    generation = gens.pivot_table(index=["Node", "Type"], columns="Category", values="Value", sort=False, dropna=False).reset_index()
+    generation["Node"] = generation["Node"].astype("int64")
+    mc = supply.rename(columns={"node": "Node", "type": "Type", "mc": "MarginalCost"})
+    generation = generation.merge(mc[["Node", "Type", "MarginalCost"]], on=["Node", "Type"], how="left")
+
+    nodes = outputs[outputs["Category"].isin(["LMP", "Angle"])]
+    lmp = nodes.pivot_table(index="Node", columns="Category", values="Value", sort=False, dropna=False).reset_index()
+    lmp["Node"] = lmp["Node"].astype("int64")
+
+    system = outputs[outputs["Node"] == "System"].set_index("Category")["Value"].astype(float)
+    tables = {
+        "nodal_generation": generation,
+        "nodal_flows": line_duals,
+        "nodal_lmp": lmp,
+        "nodal_system": pd.DataFrame([{**system.to_dict(), "Solver": solver}]),
+    }
+    if contingencies is not None:
+        tables["nodal_contingencies"] = contingencies
+    return tables
+
+
+def uniform_tables(result):
+    """Typed tables of one gridmodel.uniform.RedispatchResult."""
+    feasibility = result.feasibility
+    price = feasibility.price
+    dispatch = price.dispatch
+
+    generation = dispatch.dispatch.rename(columns={"Value": "Generation", "mc": "MarginalCost"})
+    generation["Surplus"] = (
+        (price.clearing_price - generation["MarginalCost"]) * generation["Generation"]
+        if price.clearing_price is not None else float("nan")
+    )
+    generation["Redispatched"] = result.dispatch["Value"].to_numpy()
+
+    record = result.record()
+    system = {
+        "TotalDemand": dispatch.total_demand,
+        "ClearingPrice": price.clearing_price,
+        "TotalSurplus": price.total_surplus,
+        **{k: record[k] for k in ["TotalCost", "TotalPaid", "Violations", "Adjusted_TEC", "Adjusted_TPC",
+                                  "Curtailment_MWh", "Redispatch_Cost", "Redispatch_Mode", "Solver"]},
+    }
+    tables = {"uniform_generation": generation, "uniform_system": pd.DataFrame([system])}
+    if feasibility.violations is not None:
+        tables["uniform_violations"] = feasibility.violations
+    return tables
+
+
+# ========== Store ==========
+
+class ResultStore:
+
+    def __init__(self, root="outputs/store"):
+        self.root = root
+
+    def _dir(self, table, partition):
+        parts = [f"{p}={partition[p]}" for p in PARTITIONS]
+        return os.path.join(self.root, table, *parts)
+
+    def write(self, table, df, **partition):
+        """Write (replace) one partition of a table; partition gives Lines, Scenario and DemandLevel."""
+        schema = SCHEMAS[table]
+        arrow = pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+        path = self._dir(table, partition)
+        os.makedirs(path, exist_ok=True)
+        pq.write_table(arrow, os.path.join(path, "part-0.parquet"))
+
+    def write_tables(self, tables, **partition):
+        for table, df in tables.items():
+            self.write(table, df, **partition)
+
+    def dataset(self, table):
+        return ds.dataset(
+            os.path.join(self.root, table),
+            format="parquet",
+            partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+        )
+
+    def read(self, table, columns=None, filter=None, **partitions):
+        """Read a table as a DataFrame.
+
+        columns selects columns (partition columns included by name); partitions filter
+        on Lines/Scenario/DemandLevel by value or list of values; filter is any further
+        pyarrow.dataset expression, e.g. ds.field("LMP") > 100.
+        """
+        expression = filter
+        for name, value in partitions.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            condition = ds.field(name).isin(list(values))
+            expression = condition if expression is None else expression & condition
+        return self.dataset(table).to_table(columns=columns, filter=expression).to_pandas()
@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from gridmodel.builder import build_nodal_model
+from gridmodel.data import line_capacities, line_reactances, scenario_inputs
+from gridmodel.engine import ScenarioEngine, optimal
+from gridmodel.ptdf import PTDFEngine
+from gridmodel.settlement import duals, from_pyomo, settle
+from gridmodel.uniform import dispatch_stage, feasibility_stage, price_stage
+
+# Line-capacity sensitivity sweeps.
+#
+# The nodal model for one scenario is built once; every sweep point only overwrites
+# the mutable line_limit Param and re-solves. With a persistent backend (HiGHS via
+# appsi) the changed limits are pushed into the loaded LP, and the simplex restarts
+# from the previous optimal basis, so neighbouring points cost a few iterations
+# each. Points are solved in increasing factor order to keep those steps small.
+#
+# A sweep target is "all" (every line scaled by the factor) or one line (i, j)
+# (only that line scaled, all others at their base capacity):
+#
+#   result = sweep_line_capacity(supply, lines, demand, weather, "hs", "peak_demand",
+#                                factors=np.linspace(0.5, 2.0, 16), targets=["all", (1, 4)])
+#
+# The uniform dispatch does not depend on line capacities, so its line flows are
+# computed once with PTDFs and only compared against the scaled limits.
+
+ALL_LINES = "all"
+
+
+@dataclass
+class SweepResult:
+    system: pd.DataFrame    # Target, Factor, Status, TotalCost, TotalPaid, CongestionRent, UniformViolations, UniformOverload
+    lmp: pd.DataFrame       # Target, Factor, Node, LMP
+    lines: pd.DataFrame     # Target, Factor, From, To, Capacity, Flow, Dual, CongestionRent
+
+
+def target_label(target):
+    return target if target == ALL_LINES else f"{target[0]}-{target[1]}"
+
+
+def scaled_capacities(base_cap, target, factor):
+    if target == ALL_LINES:
+        return {l: cap * factor for l, cap in base_cap.items()}
+    return {**base_cap, target: base_cap[target] * factor}
+
+
+def sweep_line_capacity(supply, lines, demand, weather, scenario_name, demand_level, factors,
+                        targets=(ALL_LINES,), solver_name=None):
+    """Re-solve one scenario for every (target, factor) and return the response curves."""
+    base_cap = line_capacities(lines)
+    available_capacity, costs = scenario_inputs(supply, weather, scenario_name)
+    nodal_demand = dict(zip(demand["node"], demand[demand_level]))
+    nodes = list(demand["node"].unique())
+    factors = sorted(factors)
+
+    engine = ScenarioEngine(
+        build_nodal_model(nodes, available_capacity, costs, base_cap, nodal_demand, line_reactances(lines)), solver_name
+    )
+    model = engine.model
+    line_list = list(model.LINES)
+    line_ends = np.array(line_list)
+    node_index = {n: k for k, n in enumerate(model.NODES)}
+    line_from = np.array([node_index[i] for i, _ in line_list])
+    line_to = np.array([node_index[j] for _, j in line_list])
+
+    # Uniform dispatch flows (fixed for all points)
+    ptdf = PTDFEngine.from_lines(lines)
+    uniform = feasibility_stage(price_stage(dispatch_stage(supply, demand, weather, scenario_name, demand_level, method="merit")), ptdf)
+    uniform_flow = dict(zip(ptdf.lines, ptdf.flows(ptdf.injection_vector(uniform.net_injection))))
+    uniform_abs = np.abs([uniform_flow[l] for l in line_list])
+
+    system_rows, lmp_rows, line_rows = [], [], []
+    for target in targets:
+        label = target_label(target)
+        for factor in factors:
+            caps = scaled_capacities(base_cap, target, factor)
+            engine.update(line_limit=caps)
+            cap_vec = np.array([caps[l] for l in line_list])
+            over = np.clip(uniform_abs - cap_vec, 0, None)
+            uniform_cols = {"UniformViolations": int((over > 1e-3).sum()), "UniformOverload": over[over > 1e-3].sum()}
+
+            results = engine.solve(f"{scenario_name} | {demand_level} | {label} x{factor:g}")
+            if not optimal(results):
+                system_rows.append({"Target": label, "Factor": factor, "Status": "infeasible", **uniform_cols})
+                continue
+
+            solution = from_pyomo(model, costs)
+            accounts = settle(solution)
+            lmp, flow = solution.lmp[0], solution.flow[0]
+            dual = duals(model.dual, model.LineCapacityPos, 0) + duals(model.dual, model.LineCapacityNeg, 0)
+            rent = flow * (lmp[line_to] - lmp[line_from])
+            line_rows.append(pd.DataFrame({
+                "Target": label, "Factor": factor, "From": line_ends[:, 0], "To": line_ends[:, 1],
+                "Capacity": cap_vec, "Flow": flow, "Dual": dual, "CongestionRent": rent,
+            }))
+            lmp_rows.append(pd.DataFrame({"Target": label, "Factor": factor, "Node": solution.nodes, "LMP": lmp}))
+            system_rows.append({
+                "Target": label, "Factor": factor, "Status": "optimal",
+                "TotalCost": accounts.total_cost[0], "TotalPaid": accounts.total_paid[0], "CongestionRent": rent.sum(),
+                **uniform_cols,
+            })
+
+        engine.update(line_limit=base_cap)
+
+    lmp_table = pd.concat(lmp_rows, ignore_index=True) if lmp_rows else pd.DataFrame()
+    line_table = pd.concat(line_rows, ignore_index=True) if line_rows else pd.DataFrame()
+    return SweepResult(pd.DataFrame(system_rows), lmp_table, line_table)
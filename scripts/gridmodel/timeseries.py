@@ -0,0 +1,354 @@
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+
+from gridmodel.builder import build_adjacency
+from gridmodel.engine import ScenarioEngine, optimal
+from gridmodel.meritorder import MeritOrder
+from gridmodel.settlement import NodalSolution, duals, settle, values
+
+# Hourly (time-indexed) nodal market clearing.
+#
+# Inputs use the columns of data/demand.csv and data/weatherprofiles.csv with a
+# `timestamp` column in place of the scenario / demand-level choice:
+#   demand  → timestamp, node, <demand column>
+#   weather → timestamp, node, onshorewind_profile, offshorewind_profile, solar_profile
+#
+# Hours are cleared in chunks: one multi-period LP with `chunk_size` periods is built
+# once and its mutable capacity/demand params are overwritten for every chunk, so a
+# full year needs a single Pyomo build and memory is bounded by the chunk size.
+#
+# Intertemporal constraints couple the hours:
+#   storage  units with power (MW), energy (MWh) and round-trip efficiency; charging
+#            and discharging enter the nodal balance, state of charge carries over
+#   ramping  |p_gen[t] - p_gen[t-1]| <= ramp limit (MW/h) for conventional units
+#
+# With these, chunks are solved as a rolling horizon: each LP covers `chunk_size +
+# overlap` hours, only the first `chunk_size` are kept, and the next LP starts from
+# the kept state of charge and generator output. The overlap is look-ahead, so storage
+# is not emptied just because the LP ends; overlap=0 gives independent chunks.
+#
+# A window can be infeasible in a rolling horizon even though the hours are not: ramp
+# limits start from the last kept hour of the previous LP, which may not be able to
+# follow the next window's demand. Every node therefore has load-shedding and
+# spillage slacks priced at the value of lost load (voll), so such windows are cleared
+# with unserved or spilled energy (reported per hour) instead of failing.
+
+RENEWABLE_TYPES = ["onshorewind", "offshorewind", "solar"]
+VOLL = 10_000   # €/MWh of unserved (or spilled) energy
+
+
+def load_hourly(demand_file, weather_file):
+    demand = pd.read_csv(demand_file, parse_dates=["timestamp"])
+    weather = pd.read_csv(weather_file, parse_dates=["timestamp"])
+    return demand, weather
+
+
+def load_storage(path):
+    """Storage units: node, name, power_mw, energy_mwh, efficiency (round trip), and
+    optionally initial_soc (share of energy_mwh at the first hour, default 0.5)."""
+    storage = pd.read_csv(path)
+    if "initial_soc" not in storage.columns:
+        storage["initial_soc"] = 0.5
+    storage["name"] = storage["name"].astype(str)
+    if storage["name"].duplicated().any():
+        raise ValueError("Storage unit names must be unique")
+    return storage
+
+
+def ramp_limits(supply, ramp_rate=None):
+    """{(node, tech): MW per hour} for ramp-limited units.
+
+    A `ramp_rate` column in the supply table (share of adjusted_capacity per hour,
+    empty = unlimited) takes precedence; otherwise the ramp_rate argument applies to
+    every conventional unit.
+    """
+    gens = list(zip(supply["node"], supply["type"]))
+    capacity = supply["adjusted_capacity"].to_numpy(dtype=float)
+    if "ramp_rate" in supply.columns:
+        rate = supply["ramp_rate"].to_numpy(dtype=float)
+    elif ramp_rate is not None:
+        rate = np.where(supply["type"].isin(RENEWABLE_TYPES), np.nan, ramp_rate)
+    else:
+        return {}
+    return {g: r * c for g, r, c in zip(gens, rate, capacity) if not np.isnan(r)}
+
+
+def hourly_inputs(supply, demand, weather, demand_column):
+    """Return timestamps, nodes, gens, costs and the (T x N) demand / (T x G) availability arrays."""
+    timestamps = pd.Index(sorted(demand["timestamp"].unique()))
+    nodes = sorted(demand["node"].unique())
+
+    nodal_demand = (
+        demand.pivot(index="timestamp", columns="node", values=demand_column)
+        .reindex(index=timestamps, columns=nodes)
+        .fillna(0)
+        .to_numpy()
+    )
+
+    gens = list(zip(supply["node"], supply["type"]))
+    costs = dict(zip(gens, supply["mc"]))
+    base_cap = supply["adjusted_capacity"].to_numpy(dtype=float)
+    node_col = {n: k for k, n in enumerate(nodes)}
+
+    # Weather multiplier per hour and generator; conventional units are always 1,
+    # renewables without a profile at their node get 0 (same as the scenario scripts)
+    multiplier = np.ones((len(timestamps), len(gens)))
+    for tech in RENEWABLE_TYPES:
+        is_tech = (supply["type"] == tech).to_numpy()
+        if not is_tech.any():
+            continue
+        profile = (
+            weather.pivot(index="timestamp", columns="node", values=f"{tech}_profile")
+            .reindex(index=timestamps, columns=nodes)
+            .fillna(0)
+            .to_numpy()
+        )
+        cols = [node_col.get(n, -1) for n in supply.loc[is_tech, "node"]]
+        tech_mult = np.zeros((len(timestamps), len(cols)))
+        known = [k for k, c in enumerate(cols) if c >= 0]
+        tech_mult[:, known] = profile[:, [cols[k] for k in known]]
+        multiplier[:, is_tech] = tech_mult
+
+    available = multiplier * base_cap
+    return timestamps, nodes, gens, costs, nodal_demand, available
+
+
+def clear_hourly(supply, demand, weather, demand_column):
+    """Uniform prices for every hour, cleared with the merit order (gridmodel.meritorder)."""
+    timestamps, _, gens, costs, nodal_demand, available = hourly_inputs(supply, demand, weather, demand_column)
+    result = MeritOrder([costs[g] for g in gens]).clear(available, nodal_demand.sum(axis=1))
+    return timestamps, gens, result
+
+
+def build_multiperiod_model(nodes, gens, costs, line_cap, n_periods, storage=None, ramp_gens=(), reactance=None,
+                            voll=VOLL):
+    """Nodal model from builder.build_nodal_model with every component indexed by period.
+
+    storage: table from load_storage(); ramp_gens: units with a ramp[t, g] limit. The
+    state before the first period (soc_init, p_prev) is a mutable Param, so the model
+    can be rolled forward without rebuilding it. p_shed / p_spill are the
+    load-shedding and spillage slacks, priced at voll (None: no slacks).
+    """
+    nodes = list(nodes)
+    lines = list(line_cap.keys())
+    gens_at, lines_in, lines_out = build_adjacency(nodes, gens, lines)
+    units = [] if storage is None else storage["name"].tolist()
+    storage_at = {n: [] for n in nodes}
+    if storage is not None:
+        for name, node in zip(storage["name"], storage["node"]):
+            storage_at[node].append(name)
+
+    model = pyo.ConcreteModel()
+    model.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+
+    model.T = pyo.RangeSet(0, n_periods - 1)
+    model.NODES = pyo.Set(initialize=nodes)
+    model.LINES = pyo.Set(initialize=lines, dimen=2)
+    model.GENS = pyo.Set(initialize=gens, dimen=2)
+
+    model.capacity = pyo.Param(model.T, model.GENS, initialize=0, mutable=True)
+    model.demand = pyo.Param(model.T, model.NODES, initialize=0, mutable=True)
+    model.line_limit = pyo.Param(model.LINES, initialize=line_cap, mutable=True)
+    model.reactance = pyo.Param(model.LINES, initialize=1.0 if reactance is None else reactance, mutable=True)
+
+    model.p_gen = pyo.Var(model.T, model.GENS, domain=pyo.NonNegativeReals)
+    model.p_flow = pyo.Var(model.T, model.LINES, domain=pyo.Reals)
+    model.theta = pyo.Var(model.T, model.NODES, domain=pyo.Reals)
+
+    cost = pyo.quicksum(costs[g] * model.p_gen[t, g] for t in model.T for g in gens)
+    model.SLACK_NODES = pyo.Set(initialize=nodes if voll is not None else [])
+    model.p_shed = pyo.Var(model.T, model.SLACK_NODES, domain=pyo.NonNegativeReals)
+    model.p_spill = pyo.Var(model.T, model.SLACK_NODES, domain=pyo.NonNegativeReals)
+    if voll is not None:
+        cost += voll * pyo.quicksum(model.p_shed[t, n] + model.p_spill[t, n] for t in model.T for n in nodes)
+    model.OBJ = pyo.Objective(expr=cost, sense=pyo.minimize)
+
+    # ========== Storage ==========
+    model.STORAGE = pyo.Set(initialize=units)
+    if units:
+        power = dict(zip(units, storage["power_mw"].astype(float)))
+        energy = dict(zip(units, storage["energy_mwh"].astype(float)))
+        # Round-trip losses split evenly between charging and discharging
+        eta = dict(zip(units, np.sqrt(storage["efficiency"].astype(float))))
+        initial = dict(zip(units, storage["initial_soc"].astype(float) * storage["energy_mwh"].astype(float)))
+
+        model.soc_init = pyo.Param(model.STORAGE, initialize=initial, mutable=True)
+        model.p_charge = pyo.Var(model.T, model.STORAGE, bounds=lambda m, t, s: (0, power[s]))
+        model.p_discharge = pyo.Var(model.T, model.STORAGE, bounds=lambda m, t, s: (0, power[s]))
+        model.soc = pyo.Var(model.T, model.STORAGE, bounds=lambda m, t, s: (0, energy[s]))
+
+        def soc_rule(m, t, s):
+            before = m.soc_init[s] if t == 0 else m.soc[t - 1, s]
+            return m.soc[t, s] == before + eta[s] * m.p_charge[t, s] - m.p_discharge[t, s] / eta[s]
+        model.StateOfCharge = pyo.Constraint(model.T, model.STORAGE, rule=soc_rule)
+
+    # ========== Ramping ==========
+    model.RAMP_GENS = pyo.Set(initialize=list(ramp_gens), dimen=2)
+    if ramp_gens:
+        model.ramp = pyo.Param(model.T, model.RAMP_GENS, initialize=0, mutable=True)
+        model.p_prev = pyo.Param(model.RAMP_GENS, initialize=0, mutable=True)
+
+        def ramp_up_rule(m, t, n, tech):
+            before = m.p_prev[(n, tech)] if t == 0 else m.p_gen[t - 1, (n, tech)]
+            return m.p_gen[t, (n, tech)] - before <= m.ramp[t, (n, tech)]
+        def ramp_down_rule(m, t, n, tech):
+            before = m.p_prev[(n, tech)] if t == 0 else m.p_gen[t - 1, (n, tech)]
+            return before - m.p_gen[t, (n, tech)] <= m.ramp[t, (n, tech)]
+        model.RampUp = pyo.Constraint(model.T, model.RAMP_GENS, rule=ramp_up_rule)
+        model.RampDown = pyo.Constraint(model.T, model.RAMP_GENS, rule=ramp_down_rule)
+
+    def nodal_balance_rule(m, t, n):
+        gen_sum = pyo.quicksum(m.p_gen[t, g] for g in gens_at[n])
+        inflow = pyo.quicksum(m.p_flow[t, l] for l in lines_in[n])
+        outflow = pyo.quicksum(m.p_flow[t, l] for l in lines_out[n])
+        stored = pyo.quicksum(m.p_discharge[t, s] - m.p_charge[t, s] for s in storage_at[n])
+        slack = m.p_shed[t, n] - m.p_spill[t, n] if voll is not None else 0
+        return gen_sum + stored + slack + inflow - outflow == m.demand[t, n]
+    model.NodalBalance = pyo.Constraint(model.T, model.NODES, rule=nodal_balance_rule)
+
+    def gen_capacity_rule(m, t, n, tech):
+        return m.p_gen[t, (n, tech)] <= m.capacity[t, (n, tech)]
+    model.GenCapacity = pyo.Constraint(model.T, model.GENS, rule=gen_capacity_rule)
+
+    def line_capacity_rule_pos(m, t, i, j):
+        return m.p_flow[t, (i, j)] <= m.line_limit[(i, j)]
+    def line_capacity_rule_neg(m, t, i, j):
+        return m.p_flow[t, (i, j)] >= -m.line_limit[(i, j)]
+    model.LineCapacityPos = pyo.Constraint(model.T, model.LINES, rule=line_capacity_rule_pos)
+    model.LineCapacityNeg = pyo.Constraint(model.T, model.LINES, rule=line_capacity_rule_neg)
+
+    def dc_flow_rule(m, t, i, j):
+        return m.reactance[(i, j)] * m.p_flow[t, (i, j)] == m.theta[t, i] - m.theta[t, j]
+    model.DCFlow = pyo.Constraint(model.T, model.LINES, rule=dc_flow_rule)
+
+    return model
+
+
+def solve_timeseries(supply, line_cap, demand, weather, demand_column, chunk_size=168, solver_name=None,
+                     storage=None, ramp_rate=None, overlap=0, reactance=None, voll=VOLL):
+    """Clear all hours chunk by chunk; yields one dict of result DataFrames per chunk.
+
+    Keys: "generation" (timestamp, node, type, generation, surplus), "flows" (timestamp,
+    from_node, to_node, flow), "lmp" (timestamp, node, lmp) and "system" (timestamp,
+    total_cost, total_paid, total_surplus, unserved, spilled; total_cost is the
+    generation cost, without the voll penalty). With storage (see load_storage) also
+    "storage" (timestamp, node, name, charge, discharge, soc, revenue) and a
+    storage_revenue column in "system".
+
+    ramp_rate (share of capacity per hour, see ramp_limits) adds ramp limits; overlap
+    extends every LP by that many look-ahead hours whose results are discarded.
+    reactance (per line, gridmodel.data.line_reactances) defaults to 1. voll prices
+    the load-shedding and spillage slacks (€/MWh; None: no slacks, a window that
+    cannot be balanced then fails).
+    """
+    timestamps, nodes, gens, costs, nodal_demand, available = hourly_inputs(supply, demand, weather, demand_column)
+    lines = list(line_cap.keys())
+    n_hours = len(timestamps)
+    chunk_size = min(chunk_size, n_hours)
+    window = min(chunk_size + overlap, n_hours)
+
+    ramp = ramp_limits(supply, ramp_rate)
+    ramp_gens = list(ramp)
+    engine = ScenarioEngine(
+        build_multiperiod_model(nodes, gens, costs, line_cap, window, storage, ramp_gens, reactance, voll), solver_name
+    )
+    model = engine.model
+    units = list(model.STORAGE)
+    mc = np.array([costs[g] for g in gens], dtype=float)
+    gen_node = np.array([nodes.index(g[0]) for g in gens])
+    unit_node = np.array([] if storage is None else [nodes.index(n) for n in storage["node"]], dtype=int)
+
+    # Ramp limit per hour; a full-capacity "limit" leaves an hour unconstrained
+    gen_index = {g: k for k, g in enumerate(gens)}
+    base_cap = supply["adjusted_capacity"].to_numpy(dtype=float)
+    ramp_mw = np.array([ramp[g] for g in ramp_gens])
+    no_limit = np.array([base_cap[gen_index[g]] for g in ramp_gens])
+
+    for start in range(0, n_hours, chunk_size):
+        stop = min(start + chunk_size, n_hours)
+        size = stop - start
+        horizon = min(start + window, n_hours) - start
+
+        # Hours past the end of the data are padded empty (no demand, no capacity)
+        cap = np.zeros((window, len(gens)))
+        dem = np.zeros((window, len(nodes)))
+        cap[:horizon] = available[start:start + horizon]
+        dem[:horizon] = nodal_demand[start:start + horizon]
+
+        params = {
+            "capacity": {(t, *g): cap[t, k] for t in range(window) for k, g in enumerate(gens)},
+            "demand": {(t, n): dem[t, k] for t in range(window) for k, n in enumerate(nodes)},
+        }
+        if ramp_gens:
+            limit = np.tile(ramp_mw, (window, 1))
+            limit[horizon:] = no_limit
+            if start == 0:
+                limit[0] = no_limit     # no output before the first hour to ramp from
+            params["ramp"] = {(t, *g): limit[t, k] for t in range(window) for k, g in enumerate(ramp_gens)}
+        engine.update(**params)
+        solved = optimal(engine.solve(f"hours {start}-{stop - 1}"))
+
+        # (hour x item) arrays of the kept hours; variables are indexed hour-major
+        gen = values(model.p_gen).reshape(window, -1)[:size]
+        flow = values(model.p_flow).reshape(window, -1)[:size]
+        lmp = duals(model.dual, model.NodalBalance, 0 if solved else np.nan).reshape(window, -1)[:size]
+        shed = values(model.p_shed).reshape(window, -1)[:size]
+        spill = values(model.p_spill).reshape(window, -1)[:size]
+
+        # Roll forward: the next LP starts from the last kept hour (a failed window, NaN
+        # throughout, leaves the previous state in place)
+        if ramp_gens and solved:
+            engine.update(p_prev={g: gen[-1, gen_index[g]] for g in ramp_gens})
+        if units:
+            charge = values(model.p_charge).reshape(window, -1)[:size]
+            discharge = values(model.p_discharge).reshape(window, -1)[:size]
+            soc = values(model.soc).reshape(window, -1)[:size]
+            if solved:
+                engine.update(soc_init=dict(zip(units, soc[-1])))
+
+        hours = timestamps[start:stop]
+        accounts = settle(NodalSolution(gens, lines, nodes, gen_node, mc, gen, flow, None, lmp, gen @ mc))
+        surplus, total_cost, total_paid = accounts.surplus, accounts.total_cost, accounts.total_paid
+
+        chunk = {
+            "generation": pd.DataFrame({
+                "timestamp": np.repeat(hours, len(gens)),
+                "node": np.tile([g[0] for g in gens], size),
+                "type": np.tile([g[1] for g in gens], size),
+                "generation": gen.ravel(),
+                "surplus": surplus.ravel(),
+            }),
+            "flows": pd.DataFrame({
+                "timestamp": np.repeat(hours, len(lines)),
+                "from_node": np.tile([l[0] for l in lines], size),
+                "to_node": np.tile([l[1] for l in lines], size),
+                "flow": flow.ravel(),
+            }),
+            "lmp": pd.DataFrame({
+                "timestamp": np.repeat(hours, len(nodes)),
+                "node": np.tile(nodes, size),
+                "lmp": lmp.ravel(),
+            }),
+            "system": pd.DataFrame({
+                "timestamp": hours,
+                "total_cost": total_cost,
+                "total_paid": total_paid,
+                "total_surplus": accounts.total_surplus,
+                "unserved": shed.sum(axis=1),
+                "spilled": spill.sum(axis=1),
+            }),
+        }
+        if units:
+            revenue = lmp[:, unit_node] * (discharge - charge)
+            chunk["storage"] = pd.DataFrame({
+                "timestamp": np.repeat(hours, len(units)),
+                "node": np.tile(storage["node"].to_numpy(), size),
+                "name": np.tile(units, size),
+                "charge": charge.ravel(),
+                "discharge": discharge.ravel(),
+                "soc": soc.ravel(),
+                "revenue": revenue.ravel(),
+            })
+            chunk["system"]["storage_revenue"] = revenue.sum(axis=1)
+        yield chunk
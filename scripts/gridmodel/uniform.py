@@ -0,0 +1,299 @@
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from gridmodel.builder import build_uniform_model
+from gridmodel.cache import scenario_key
+from gridmodel.data import line_capacities, line_reactances, scenario_inputs
+from gridmodel.engine import ScenarioEngine, optimal
+from gridmodel.instrument import stage
+from gridmodel.meritorder import MeritOrder
+from gridmodel.ptdf import PTDFEngine
+from gridmodel.redispatch import heuristic_redispatch, optimal_redispatch
+from gridmodel.settlement import values as settlement_values
+
+# In-memory version of the uniform track. Each stage of the four uniform scripts is a
+# function that takes the previous stage's result object and returns the next one:
+#
+#   dispatch = dispatch_stage(supply, demand, weather, "hs", "peak_demand")
+#   price = price_stage(dispatch)
+#   feasibility = feasibility_stage(price, PTDFEngine.from_lines(lines))
+#   redispatch = redispatch_stage(feasibility, supply, line_cap)
+#
+# Nothing is written to disk unless save_uniform() is called on the results.
+
+EPSILON = 0.01  # tolerance to account for float imprecision (clearing price)
+
+
+@dataclass
+class DispatchResult:
+    scenario: str
+    demand_level: str
+    dispatch: pd.DataFrame          # Node, Type, Value, mc
+    total_cost: float
+    total_demand: float
+    nodal_demand: dict
+    available_capacity: dict = field(repr=False)
+    solver: str = None              # backend that solved the dispatch ("merit" for the merit order)
+    optimal: bool = True            # False if the dispatch LP has no solution (demand above capacity)
+
+
+@dataclass
+class PriceResult:
+    dispatch: DispatchResult
+    clearing_price: float           # None if no unit meets demand
+    surplus: pd.DataFrame           # merit order: Node, Type, Generation, MarginalCost, ClearingPrice, Surplus
+    total_paid: float
+    total_surplus: float
+
+
+@dataclass
+class FeasibilityResult:
+    price: PriceResult
+    violations: pd.DataFrame        # From, To, Flow, Capacity, Overload (None if injections don't balance)
+    net_injection: dict
+
+    @property
+    def feasible(self):
+        return self.violations is not None and self.violations.empty
+
+
+@dataclass
+class RedispatchResult:
+    feasibility: FeasibilityResult
+    dispatch: pd.DataFrame          # Node, Type, Value, mc after redispatch
+    curtailment: float
+    redispatch_cost: float
+    mode: str
+
+    @property
+    def optimal(self):
+        """Dispatch and (optimal mode) redispatch LP solved; a failed redispatch LP costs NaN."""
+        return self.feasibility.price.dispatch.optimal and not pd.isna(self.redispatch_cost)
+
+    @property
+    def adjusted_TEC(self):
+        return (self.dispatch["Value"] * self.dispatch["mc"]).sum()
+
+    @property
+    def adjusted_TPC(self):
+        return self.feasibility.price.total_paid + self.redispatch_cost
+
+    def record(self):
+        """Unrounded results of the whole chain, as one row of the runner's uniform_summary.csv."""
+        feasibility = self.feasibility
+        price = feasibility.price
+        return {
+            "TotalCost": price.dispatch.total_cost,
+            "Clearing_Price": price.clearing_price,
+            "TotalPaid": price.total_paid,
+            "Violations": 0 if feasibility.violations is None else len(feasibility.violations),
+            "Adjusted_TEC": self.adjusted_TEC,
+            "Adjusted_TPC": self.adjusted_TPC,
+            "Total_Surplus": self.adjusted_TPC - self.adjusted_TEC,
+            "Curtailment_MWh": self.curtailment,
+            "Redispatch_Cost": self.redispatch_cost,
+            "Marginal_Cost_Curtailment": self.redispatch_cost / self.curtailment if self.curtailment > 0 else None,
+            "Redispatch_Mode": self.mode,
+            "Solver": price.dispatch.solver,
+        }
+
+    def summary(self):
+        """One row of summary_redispatch.csv (same columns and rounding as uniform_4_redispatch.py)."""
+        price = self.feasibility.price
+        return {
+            "Scenario": price.dispatch.scenario,
+            "DemandLevel": price.dispatch.demand_level,
+            "Adjusted_TEC": round(self.adjusted_TEC, 2),
+            "Adjusted_TPC": round(self.adjusted_TPC, 2),
+            "Total_Surplus": round(self.adjusted_TPC - self.adjusted_TEC, 2),
+            "Clearing_Price": round(float(price.clearing_price), 2),
+            "Curtailment_MWh": self.curtailment,
+            "Redispatch_Cost": round(self.redispatch_cost, 2),
+            "Marginal_Cost_Curtailment": round(self.redispatch_cost / self.curtailment, 2) if self.curtailment > 0 else "",
+        }
+
+
+# ========== Stages ==========
+
+def dispatch_stage(supply, demand, weather, scenario_name, demand_level, solver_name=None, method="lp"):
+    """uniform_1_dispatch.py: copper-plate dispatch for one scenario.
+
+    method="lp" solves the dispatch LP; method="merit" uses the closed-form merit
+    order from gridmodel.meritorder (same cost and price, no solver call).
+    """
+    available_capacity, costs = scenario_inputs(supply, weather, scenario_name)
+    total_demand = demand[demand_level].sum()
+    gens = list(available_capacity.keys())
+
+    if method == "merit":
+        result = MeritOrder([costs[g] for g in gens]).clear([available_capacity[g] for g in gens], total_demand)
+        values = result.dispatch[0].tolist()
+        total_cost = result.total_cost[0]
+        solver = "merit"
+        solved = result.unserved[0] <= EPSILON
+    else:
+        model = build_uniform_model(available_capacity, costs, total_demand)
+        engine = ScenarioEngine(model, solver_name)
+        solved = optimal(engine.solve(f"{scenario_name} | {demand_level}"))
+        values = settlement_values(model.p_gen).tolist()     # NaN if the solve failed
+        total_cost = float(np.dot([costs[g] for g in gens], values))
+        solver = engine.solver_name
+
+    dispatch = pd.DataFrame(
+        [{"Node": n, "Type": t, "Value": v, "mc": costs[(n, t)]} for (n, t), v in zip(gens, values)]
+    )
+    return DispatchResult(
+        scenario=scenario_name,
+        demand_level=demand_level,
+        dispatch=dispatch,
+        total_cost=total_cost,
+        total_demand=total_demand,
+        nodal_demand=dict(zip(demand["node"], demand[demand_level])),
+        available_capacity=available_capacity,
+        solver=solver,
+        optimal=solved,
+    )
+
+
+def price_stage(dispatch):
+    """uniform_2_price.py: marginal cost of the first unit where cumulative generation meets demand."""
+    df_sorted = dispatch.dispatch.sort_values(by="mc").reset_index(drop=True)
+    df_sorted["cumgen"] = df_sorted["Value"].cumsum()
+
+    df_above = df_sorted[df_sorted["cumgen"] >= dispatch.total_demand - EPSILON]
+    if df_above.empty:
+        return PriceResult(dispatch, None, None, float("nan"), float("nan"))
+
+    clearing_price = df_above.iloc[0]["mc"]
+    df_sorted["ClearingPrice"] = clearing_price
+    df_sorted["Surplus"] = (clearing_price - df_sorted["mc"]) * df_sorted["Value"]
+
+    surplus = df_sorted[["Node", "Type", "Value", "mc", "ClearingPrice", "Surplus"]]
+    surplus.columns = ["Node", "Type", "Generation", "MarginalCost", "ClearingPrice", "Surplus"]
+
+    total_paid = clearing_price * dispatch.total_demand
+    return PriceResult(dispatch, clearing_price, surplus, total_paid, df_sorted["Surplus"].sum())
+
+
+def feasibility_stage(price, ptdf):
+    """uniform_3_feasibility.py: DC load flow of the dispatch via PTDFs."""
+    dispatch = price.dispatch
+    nodal_gen = dispatch.dispatch.groupby("Node")["Value"].sum().to_dict()
+
+    net_injection = {n: nodal_gen.get(n, 0) - dispatch.nodal_demand.get(n, 0) for n in ptdf.nodes}
+    net_sum = sum(net_injection.values())
+    if not abs(net_sum) <= 1e-3:       # also a failed dispatch (NaN)
+        return FeasibilityResult(price, None, net_injection)
+    net_injection[ptdf.nodes[-1]] -= net_sum  # force balance
+
+    violations = pd.DataFrame(ptdf.violations(net_injection), columns=["From", "To", "Flow", "Capacity", "Overload"])
+    return FeasibilityResult(price, violations, net_injection)
+
+
+def redispatch_stage(feasibility, supply, line_cap, mode="heuristic", solver_name=None, reactance=None):
+    """uniform_4_redispatch.py; mode "heuristic" (thesis) or "optimal" (redispatch LP)."""
+    dispatch = feasibility.price.dispatch
+
+    if feasibility.violations is None or feasibility.violations.empty:
+        df, curtailment, redispatch_cost = dispatch.dispatch, 0, 0
+    elif mode == "optimal":
+        df, curtailment, redispatch_cost = optimal_redispatch(
+            dispatch.dispatch, dispatch.available_capacity, line_cap, dispatch.nodal_demand, solver_name, reactance
+        )
+    else:
+        df, curtailment, redispatch_cost = heuristic_redispatch(dispatch.dispatch, feasibility.violations, supply)
+
+    return RedispatchResult(feasibility, df, curtailment, redispatch_cost, mode)
+
+
+def run_uniform(supply, lines, demand, weather, scenario_name, demand_level, solver_name=None,
+                redispatch="heuristic", ptdf=None, dispatch_method="lp", cache=None, log=None):
+    """Whole uniform chain for one scenario, in memory; returns the RedispatchResult.
+
+    With a gridmodel.cache.ResultCache, a chain already run on the same inputs and
+    settings is returned from the cache instead of being solved again (only chains
+    whose LPs were solved are cached). With a gridmodel.instrument.StageLog, every
+    stage is logged.
+    """
+    keys = {"Scenario": scenario_name, "DemandLevel": demand_level}
+
+    def run():
+        with stage(log, "uniform.dispatch", **keys):
+            dispatch = dispatch_stage(supply, demand, weather, scenario_name, demand_level, solver_name, dispatch_method)
+        with stage(log, "uniform.price", **keys):
+            price = price_stage(dispatch)
+        with stage(log, "uniform.feasibility", **keys):
+            engine = PTDFEngine.from_lines(lines) if ptdf is None else ptdf
+            feasibility = feasibility_stage(price, engine)
+        with stage(log, "uniform.redispatch", **keys, mode=redispatch):
+            return redispatch_stage(feasibility, supply, line_capacities(lines), redispatch, solver_name,
+                                    line_reactances(lines))
+
+    if cache is None:
+        return run()
+    key = scenario_key(
+        "uniform", supply, lines, demand, weather, scenario_name, demand_level, solver_name,
+        redispatch=redispatch, dispatch_method=dispatch_method,
+    )
+    with stage(log, "uniform.cache", **keys) as record:
+        result = cache.get(key)
+        record["hit"] = result is not None
+    if result is None:
+        result = run()
+        if result.optimal:          # failed solves are tried again next time
+            cache.put(key, result)
+    return result
+
+
+# ========== Optional Sink ==========
+
+def save_uniform(results, out_dir="outputs"):
+    """Write RedispatchResults in the file layout of the four uniform scripts."""
+    for d in ["uniform_dispatch", "uniform_processed", "uniform_violations", "uniform_redispatch"]:
+        os.makedirs(os.path.join(out_dir, d), exist_ok=True)
+
+    summary_rows = []
+    for result in results:
+        feasibility = result.feasibility
+        price = feasibility.price
+        dispatch = price.dispatch
+        scenario, level = dispatch.scenario, dispatch.demand_level
+
+        # uniform_1: dispatch
+        df = dispatch.dispatch[["Node", "Type"]].assign(Category="Generation", Value=dispatch.dispatch["Value"])
+        system = pd.DataFrame([{"Node": "System", "Type": "", "Category": "TotalCost", "Value": dispatch.total_cost}])
+        pd.concat([df, system], ignore_index=True).to_csv(
+            f"{out_dir}/uniform_dispatch/dispatch_{scenario}_{level}.csv", index=False
+        )
+
+        if price.clearing_price is None:
+            continue
+
+        # uniform_2: clearing price and surplus
+        system_rows = pd.DataFrame([
+            {"Node": "System", "Type": "", "Generation": dispatch.total_demand, "MarginalCost": "", "ClearingPrice": price.clearing_price, "Surplus": ""},
+            {"Node": "System", "Type": "", "Generation": "", "MarginalCost": "", "ClearingPrice": "TotalPaid", "Surplus": price.total_paid},
+            {"Node": "System", "Type": "", "Generation": "", "MarginalCost": "", "ClearingPrice": "TotalSurplus", "Surplus": price.total_surplus},
+        ])
+        pd.concat([price.surplus, system_rows], ignore_index=True).to_csv(
+            f"{out_dir}/uniform_processed/results_{scenario}_{level}.csv", index=False
+        )
+
+        if feasibility.violations is None or feasibility.violations.empty:
+            continue
+
+        # uniform_3: violations
+        safe_level = level.replace("_demand", "")
+        feasibility.violations.to_csv(f"{out_dir}/uniform_violations/violations_{scenario}_{safe_level}.csv", index=False)
+
+        # uniform_4: redispatch
+        df_out = result.dispatch[["Node", "Type", "Value"]].copy()
+        df_out["Category"] = "Redispatch"
+        df_out["Cost"] = result.dispatch["mc"] * result.dispatch["Value"]
+        df_out.to_csv(f"{out_dir}/uniform_redispatch/redispatch_{scenario}_{level}.csv", index=False)
+        summary_rows.append(result.summary())
+
+    pd.DataFrame(summary_rows).to_csv(f"{out_dir}/uniform_redispatch/summary_redispatch.csv", index=False)
@@ -0,0 +1,398 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linprog
+from scipy.sparse import coo_array
+
+from gridmodel import instrument
+from gridmodel.data import availability, line_capacities, line_reactances
+from gridmodel.ptdf import PTDFEngine
+from gridmodel.sparse_opf import solve_nodal_sparse
+from gridmodel.uniform import DispatchResult, PriceResult, feasibility_stage, redispatch_stage
+
+# Zonal pricing: between fully nodal (one price per node) and uniform (one price).
+#
+# A zoning maps every node to a bidding zone, e.g. {1: "N", 2: "N", 3: "N", 4: "S",
+# 5: "S", 6: "S"}. Each zone is a copper plate; the market is cleared with one balance
+# row per zone and limits on the exchanges between zones:
+#
+#   mode="ntc"   one exchange per pair of neighbouring zones, bounded by its net
+#                transfer capacity (default: sum of the capacities of the lines
+#                crossing that border)
+#   mode="fb"    flow-based: zonal net positions, line flows = zonal PTDF @ net
+#                positions, limited on the critical lines (cnec="border": lines
+#                between zones, "all": every line). The zonal PTDF is the nodal PTDF
+#                weighted by generation shift keys (nodal demand shares by default).
+#
+# Zonal prices are the duals of the zone balance rows. The zonal dispatch is then
+# checked with the nodal DC load flow and redispatched, by the same feasibility and
+# redispatch stages as the uniform track (gridmodel.uniform). One zone reproduces the
+# uniform market; one zone per node with mode="fb", cnec="all" reproduces nodal pricing.
+#
+# enumerate_zonings() lists every split of the nodes into k connected zones, and
+# rank_zonings() evaluates them in worker processes and orders them by redispatch cost.
+# With optimal redispatch the system cost after redispatch is the nodal optimum for
+# every zoning (the redispatch LP is the nodal LP started from the zonal dispatch),
+# so what separates zonings is how much redispatch their market outcome needs and
+# what consumers pay; with heuristic redispatch, CostGap to nodal is informative too.
+
+
+@dataclass
+class ZonalResult:
+    zoning: dict                # node -> zone
+    zones: pd.DataFrame         # Zone, Demand, Generation, NetPosition, Price
+    exchanges: pd.DataFrame     # ntc: From, To, Flow, NTC, Dual; fb: From, To, Flow, Capacity, Dual (critical lines)
+    redispatch: object          # gridmodel.uniform.RedispatchResult of the zonal dispatch
+    status: int = 0             # scipy.optimize.linprog status of the zonal clearing, 0 = optimal
+
+    def record(self):
+        """System totals after redispatch, in the columns of the uniform track's record()."""
+        if self.status != 0:
+            return {"Status": self.status}
+        return {"Status": 0, "Zones": len(self.zones), **self.redispatch.record()}
+
+
+def zone_label(zoning):
+    """Readable name of a zoning, e.g. "1,2,3|4,5,6"."""
+    groups = {}
+    for node, zone in zoning.items():
+        groups.setdefault(zone, []).append(node)
+    return "|".join(",".join(str(n) for n in sorted(g)) for g in sorted(groups.values(), key=lambda g: sorted(g)))
+
+
+def parse_zoning(text):
+    """"1,2,3|4,5,6" -> {1: "Z1", 2: "Z1", 3: "Z1", 4: "Z2", ...}; node names that look like integers become ints."""
+    zoning = {}
+    for k, group in enumerate(text.split("|"), start=1):
+        for node in group.split(","):
+            node = node.strip()
+            zoning[int(node) if node.lstrip("-").isdigit() else node] = f"Z{k}"
+    return zoning
+
+
+def read_zoning(path):
+    """Zoning from a CSV with node and zone columns."""
+    df = pd.read_csv(path)
+    return dict(zip(df["node"], df["zone"]))
+
+
+class ZonalModel:
+
+    def __init__(self, ptdf, gens, zoning, mode="ntc", ntc=None, cnec="border"):
+        """ptdf: PTDFEngine of the lines; gens: (node, tech) list; zoning: {node: zone}.
+
+        ntc: {(zone_a, zone_b): MW} overrides the default border capacities (both directions).
+        """
+        missing = [n for n in ptdf.nodes if n not in zoning]
+        if missing:
+            raise ValueError(f"Nodes without a zone: {missing}")
+        if mode not in ("ntc", "fb"):
+            raise ValueError(f"Unknown zonal mode {mode!r} (use 'ntc' or 'fb')")
+
+        self.ptdf = ptdf
+        self.gens = list(gens)
+        self.zoning = dict(zoning)
+        self.mode = mode
+        self.zones = list(dict.fromkeys(zoning[n] for n in ptdf.nodes))
+        zone_index = {z: k for k, z in enumerate(self.zones)}
+        self.node_zone = np.array([zone_index[zoning[n]] for n in ptdf.nodes])
+        self.gen_zone = np.array([zone_index[zoning[n]] for n, _ in self.gens])
+
+        frm = np.array([zone_index[zoning[i]] for i, _ in ptdf.lines])
+        to = np.array([zone_index[zoning[j]] for _, j in ptdf.lines])
+        self.border = frm != to
+
+        G, Z = len(self.gens), len(self.zones)
+        if mode == "ntc":
+            # One exchange per neighbouring zone pair, oriented from the lower zone index
+            pairs = {}
+            for l in np.flatnonzero(self.border):
+                a, b = sorted((frm[l], to[l]))
+                pairs[(a, b)] = pairs.get((a, b), 0.0) + ptdf.capacity[l]
+            self.borders = list(pairs)
+            ntc = ntc or {}
+            self.ntc = np.array([
+                ntc.get((self.zones[a], self.zones[b]), ntc.get((self.zones[b], self.zones[a]), cap))
+                for (a, b), cap in pairs.items()
+            ], dtype=float)
+            B = len(self.borders)
+            a = np.array([p[0] for p in self.borders], dtype=np.int64)
+            b = np.array([p[1] for p in self.borders], dtype=np.int64)
+            rows = np.concatenate([self.gen_zone, a, b])
+            cols = np.concatenate([np.arange(G), G + np.arange(B), G + np.arange(B)])
+            vals = np.concatenate([np.ones(G), -np.ones(B), np.ones(B)])
+            self.n_cols = G + B
+            self.A_eq = coo_array((vals, (rows, cols)), shape=(Z, self.n_cols)).tocsr()
+        else:
+            # Net positions: generation - demand = np per zone, sum of np = 0
+            self.cnec = np.flatnonzero(self.border) if cnec == "border" else np.arange(len(ptdf.lines))
+            rows = np.concatenate([self.gen_zone, np.arange(Z), np.full(Z, Z)])
+            cols = np.concatenate([np.arange(G), G + np.arange(Z), G + np.arange(Z)])
+            vals = np.concatenate([np.ones(G), -np.ones(Z), np.ones(Z)])
+            self.n_cols = G + Z
+            self.A_eq = coo_array((vals, (rows, cols)), shape=(Z + 1, self.n_cols)).tocsr()
+
+    @classmethod
+    def from_inputs(cls, supply, lines, zoning, **kwargs):
+        gens = list(zip(supply["node"].tolist(), supply["type"].tolist()))
+        return cls(PTDFEngine.from_lines(lines), gens, zoning, **kwargs)
+
+    def zonal_ptdf(self, nodal_demand, gsk="demand"):
+        """(L x Z) flows per MW of zonal net position; gsk "demand" weights nodes by demand share, "flat" equally."""
+        Z = len(self.zones)
+        weight = np.ones(len(self.ptdf.nodes))
+        if gsk == "demand":
+            demand = np.asarray(nodal_demand, dtype=float)
+            zone_total = np.bincount(self.node_zone, weights=demand, minlength=Z)
+            # Zones without demand fall back to flat keys
+            weight = np.where(zone_total[self.node_zone] > 0, demand, 1.0)
+        keys = np.zeros((len(self.ptdf.nodes), Z))
+        keys[np.arange(len(weight)), self.node_zone] = weight
+        keys /= keys.sum(axis=0, keepdims=True)
+        return self.ptdf.ptdf @ keys
+
+    def clear(self, capacity, mc, nodal_demand, gsk="demand"):
+        """Zonal market for (G,) capacity and mc and (N,) demand in PTDF node order.
+
+        Returns (linprog result, generation, zonal prices, exchanges DataFrame).
+        """
+        G, Z = len(self.gens), len(self.zones)
+        nodal_demand = np.asarray(nodal_demand, dtype=float)
+        zone_demand = np.bincount(self.node_zone, weights=nodal_demand, minlength=Z)
+
+        c = np.concatenate([np.asarray(mc, dtype=float), np.zeros(self.n_cols - G)])
+        bounds = np.empty((self.n_cols, 2))
+        bounds[:G, 0], bounds[:G, 1] = 0.0, capacity
+        if self.mode == "ntc":
+            bounds[G:, 0], bounds[G:, 1] = -self.ntc, self.ntc
+            res = linprog(c, A_eq=self.A_eq, b_eq=zone_demand, bounds=bounds, method="highs")
+        else:
+            bounds[G:] = -np.inf, np.inf
+            zptdf = self.zonal_ptdf(nodal_demand, gsk)[self.cnec]
+            A_ub = np.zeros((2 * len(self.cnec), self.n_cols))
+            A_ub[:len(self.cnec), G:] = zptdf
+            A_ub[len(self.cnec):, G:] = -zptdf
+            limit = self.ptdf.capacity[self.cnec]
+            res = linprog(c, A_ub=A_ub, b_ub=np.concatenate([limit, limit]),
+                          A_eq=self.A_eq, b_eq=np.concatenate([zone_demand, [0.0]]), bounds=bounds, method="highs")
+        instrument.note_solve(self.n_cols, self.A_eq.shape[0], res.nit)
+        if res.status != 0:
+            return res, None, None, None
+
+        x = res.x
+        prices = res.eqlin.marginals[:Z]
+        if self.mode == "ntc":
+            exchanges = pd.DataFrame({
+                "From": [self.zones[a] for a, _ in self.borders],
+                "To": [self.zones[b] for _, b in self.borders],
+                "Flow": x[G:],
+                "NTC": self.ntc,
+                "Dual": res.upper.marginals[G:] + res.lower.marginals[G:],
+            })
+        else:
+            n = len(self.cnec)
+            exchanges = pd.DataFrame({
+                "From": [self.ptdf.lines[l][0] for l in self.cnec],
+                "To": [self.ptdf.lines[l][1] for l in self.cnec],
+                "Flow": zptdf @ x[G:],
+                "Capacity": self.ptdf.capacity[self.cnec],
+                "Dual": res.ineqlin.marginals[:n] - res.ineqlin.marginals[n:],
+            })
+        return res, x[:G], prices, exchanges
+
+
+def run_zonal(supply, lines, demand, weather, scenario_name, demand_level, zoning, mode="ntc", ntc=None,
+              cnec="border", gsk="demand", redispatch="optimal", solver_name=None, model=None, log=None):
+    """Zonal clearing, nodal feasibility check and redispatch for one scenario; returns a ZonalResult."""
+    keys = {"Scenario": scenario_name, "DemandLevel": demand_level}
+    if model is None:
+        model = ZonalModel.from_inputs(supply, lines, zoning, mode=mode, ntc=ntc, cnec=cnec)
+    table = availability(supply, weather)
+    gen_index = {g: k for k, g in enumerate(table.gens)}
+    order = [gen_index[g] for g in model.gens]
+    capacity = table.row(scenario_name)[order]
+    mc = table.mc[order]
+    nodal_demand = dict(zip(demand["node"], demand[demand_level]))
+    demand_vec = np.array([nodal_demand.get(n, 0) for n in model.ptdf.nodes], dtype=float)
+
+    with instrument.stage(log, "zonal.clear", **keys, mode=model.mode):
+        res, generation, prices, exchanges = model.clear(capacity, mc, demand_vec, gsk)
+    if res.status != 0:
+        print(f"WARNING: Zonal clearing failed for {scenario_name} | {demand_level} ({zone_label(model.zoning)})")
+        return ZonalResult(model.zoning, None, None, None, res.status)
+
+    # Zonal market outcome in the uniform track's result objects
+    price = prices[model.gen_zone]
+    dispatch = pd.DataFrame({
+        "Node": [n for n, _ in model.gens],
+        "Type": [t for _, t in model.gens],
+        "Value": generation,
+        "mc": mc,
+    })
+    zone_demand = np.bincount(model.node_zone, weights=demand_vec, minlength=len(model.zones))
+    zone_gen = np.bincount(model.gen_zone, weights=generation, minlength=len(model.zones))
+    total_paid = float(prices @ zone_demand)
+    surplus = pd.DataFrame({
+        "Node": dispatch["Node"],
+        "Type": dispatch["Type"],
+        "Generation": generation,
+        "MarginalCost": mc,
+        "ClearingPrice": price,
+        "Surplus": (price - mc) * generation,
+    })
+    dispatch_result = DispatchResult(
+        scenario=scenario_name,
+        demand_level=demand_level,
+        dispatch=dispatch,
+        total_cost=float(res.fun),
+        total_demand=float(demand_vec.sum()),
+        nodal_demand=nodal_demand,
+        available_capacity=dict(zip(model.gens, capacity.tolist())),
+        solver=f"zonal-{model.mode}",
+    )
+    # Demand-weighted average price stands in for the single clearing price
+    price_result = PriceResult(dispatch_result, total_paid / demand_vec.sum(), surplus, total_paid,
+                               float(surplus["Surplus"].sum()))
+
+    with instrument.stage(log, "zonal.feasibility", **keys):
+        feasibility = feasibility_stage(price_result, model.ptdf)
+    with instrument.stage(log, "zonal.redispatch", **keys, mode=redispatch):
+        result = redispatch_stage(feasibility, supply, line_capacities(lines), redispatch, solver_name,
+                                  line_reactances(lines))
+
+    zones = pd.DataFrame({
+        "Zone": model.zones,
+        "Demand": zone_demand,
+        "Generation": zone_gen,
+        "NetPosition": zone_gen - zone_demand,
+        "Price": prices,
+    })
+    return ZonalResult(model.zoning, zones, exchanges, result)
+
+
+# ========== Zoning Enumeration ==========
+
+def enumerate_zonings(lines, n_zones, nodes=None, connected=True):
+    """Every split of the nodes into n_zones zones (zones "Z1", "Z2", ... in node order),
+    by default only those where each zone is connected by its internal lines."""
+    if nodes is None:
+        nodes = sorted(set(lines["from_node"]).union(lines["to_node"]))
+    nodes = list(nodes)
+    edges = list(zip(lines["from_node"], lines["to_node"]))
+
+    def is_connected(assign):
+        for z in range(n_zones):
+            members = {n for n, a in zip(nodes, assign) if a == z}
+            start = next(iter(members))
+            seen, stack = {start}, [start]
+            while stack:
+                u = stack.pop()
+                for i, j in edges:
+                    for a, b in ((i, j), (j, i)):
+                        if a == u and b in members and b not in seen:
+                            seen.add(b)
+                            stack.append(b)
+            if seen != members:
+                return False
+        return True
+
+    # Restricted growth strings: each partition once, zones numbered by first node
+    def grow(assign, used):
+        k = len(assign)
+        if k == len(nodes):
+            if used == n_zones:
+                yield assign
+            return
+        if used + len(nodes) - k < n_zones:
+            return
+        for z in range(min(used + 1, n_zones)):
+            yield from grow(assign + [z], max(used, z + 1))
+
+    for assign in grow([], 0):
+        if not connected or is_connected(assign):
+            yield {n: f"Z{a + 1}" for n, a in zip(nodes, assign)}
+
+
+class ZoningEvaluator:
+    """Evaluates zonings over a set of (scenario, demand level) pairs."""
+
+    def __init__(self, supply, lines, demand, weather, scenario_levels, mode="ntc", cnec="border", gsk="demand",
+                 redispatch="optimal", solver_name=None):
+        self.supply, self.lines, self.demand, self.weather = supply, lines, demand, weather
+        self.scenario_levels = list(scenario_levels)
+        self.mode, self.cnec, self.gsk = mode, cnec, gsk
+        self.redispatch = redispatch
+        self.solver_name = solver_name
+
+    def evaluate(self, zoning):
+        """One ranking row: system cost, payments and redispatch summed over the scenario pairs."""
+        model = ZonalModel.from_inputs(self.supply, self.lines, zoning, mode=self.mode, cnec=self.cnec)
+        row = {"Zoning": zone_label(zoning), "Zones": len(model.zones), "Failed": 0, "SystemCost": 0.0,
+               "MarketCost": 0.0, "TotalPaid": 0.0, "RedispatchCost": 0.0, "Curtailment": 0.0, "Violations": 0}
+        for scenario_name, demand_level in self.scenario_levels:
+            result = run_zonal(
+                self.supply, self.lines, self.demand, self.weather, scenario_name, demand_level, zoning,
+                gsk=self.gsk, redispatch=self.redispatch, solver_name=self.solver_name, model=model,
+            )
+            record = result.record()
+            if record["Status"] != 0:
+                row["Failed"] += 1
+                continue
+            row["SystemCost"] += record["Adjusted_TEC"]
+            row["MarketCost"] += record["TotalCost"]
+            row["TotalPaid"] += record["Adjusted_TPC"]
+            row["RedispatchCost"] += record["Redispatch_Cost"]
+            row["Curtailment"] += record["Curtailment_MWh"]
+            row["Violations"] += record["Violations"]
+        return row
+
+
+def rank_zonings(evaluator, zonings, workers=1, by="RedispatchCost"):
+    """Evaluate zonings (in worker processes unless workers=1) and return them ranked by `by`
+    (ascending; ties go to fewer zones).
+
+    The nodal system cost over the same scenario pairs is the lower bound every zoning
+    is compared against (CostGap = SystemCost - nodal cost).
+    """
+    rows = []
+    zonings = iter(zonings)
+    if workers == 1:
+        rows = [evaluator.evaluate(z) for z in zonings]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(evaluator,)) as pool:
+            limit = 2 * (workers or os.cpu_count())
+            pending = set()
+            for zoning in zonings:
+                if len(pending) >= limit:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    rows.extend(future.result() for future in done)
+                pending.add(pool.submit(_evaluate_worker, zoning))
+            rows.extend(future.result() for future in wait(pending).done)
+
+    nodal_cost = sum(
+        solve_nodal_sparse(evaluator.supply, evaluator.lines, evaluator.demand, evaluator.weather, s, d)["outputs"]
+        .query("Node == 'System' and Category == 'TotalCost'")["Value"].iloc[0]
+        for s, d in evaluator.scenario_levels
+    )
+    ranking = pd.DataFrame(rows)
+    ranking["CostGap"] = ranking["SystemCost"] - nodal_cost
+    ranking = ranking.sort_values(["Failed", by, "Zones", "Zoning"], kind="stable").reset_index(drop=True)
+    ranking.insert(0, "Rank", np.arange(1, len(ranking) + 1))
+    return ranking
+
+
+# ========== Worker Processes ==========
+
+_WORKER_EVALUATOR = None
+
+
+def _init_worker(evaluator):
+    global _WORKER_EVALUATOR
+    _WORKER_EVALUATOR = evaluator
+
+
+def _evaluate_worker(zoning):
+    return _WORKER_EVALUATOR.evaluate(zoning)
@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gridmodel.data import line_reactances
+from gridmodel.timeseries import VOLL, load_hourly, load_storage, solve_timeseries
+
+# Hourly nodal market clearing, e.g. for a full year (8,760 hours):
+#
+#   python scripts/nodal/nodal_timeseries.py --demand data/demand_hourly.csv \
+#       --weather data/weatherprofiles_hourly.csv --demand-column demand --chunk-size 168
+#
+# With storage units and ramp limits, solved as a rolling horizon with one day of look-ahead:
+#
+#   python scripts/nodal/nodal_timeseries.py ... --storage data/storage.csv --ramp-rate 0.2 \
+#       --chunk-size 24 --overlap 24
+
+parser = argparse.ArgumentParser(description="Chunked multi-period nodal market clearing")
+parser.add_argument("--demand", required=True, help="CSV with timestamp, node and a demand column")
+parser.add_argument("--weather", required=True, help="CSV with timestamp, node and *_profile columns")
+parser.add_argument("--demand-column", default="demand")
+parser.add_argument("--lines", default="data/lines.csv")
+parser.add_argument("--supply", default="data/supply_adjusted.csv")
+parser.add_argument("--chunk-size", type=int, default=168, help="hours per LP (default: one week)")
+parser.add_argument("--overlap", type=int, default=0, help="look-ahead hours added to every LP and discarded")
+parser.add_argument("--storage", default=None, help="CSV with node, name, power_mw, energy_mwh, efficiency[, initial_soc]")
+parser.add_argument("--ramp-rate", type=float, default=None,
+                    help="ramp limit of conventional units as a share of capacity per hour (a supply ramp_rate column takes precedence)")
+parser.add_argument("--voll", type=float, default=VOLL,
+                    help="value of lost load (€/MWh) pricing unserved and spilled energy in windows that cannot be balanced")
+parser.add_argument("--solver", default=None, help="solver backend: highs, glpk, scipy or any Pyomo solver name (default: first available)")
+parser.add_argument("--out", default="outputs/nodal_timeseries")
+args = parser.parse_args()
+
+# ========== 1. Load Data ==========
+supply = pd.read_csv(args.supply)
+lines = pd.read_csv(args.lines)
+demand, weather = load_hourly(args.demand, args.weather)
+storage = load_storage(args.storage) if args.storage else None
+
+line_cap = {(row["from_node"], row["to_node"]): row["linecap"] for _, row in lines.iterrows()}
+
+# ========== 2. Solve Chunks and Append Results ==========
+os.makedirs(args.out, exist_ok=True)
+for name in ["generation", "flows", "lmp", "system", "storage"]:
+    path = os.path.join(args.out, f"{name}.csv")
+    if os.path.exists(path):
+        os.remove(path)
+
+start = time.perf_counter()
+chunks = solve_timeseries(supply, line_cap, demand, weather, args.demand_column, args.chunk_size, args.solver,
+                          storage, args.ramp_rate, args.overlap, line_reactances(lines), args.voll)
+for k, chunk in enumerate(chunks):
+    for name, df in chunk.items():
+        path = os.path.join(args.out, f"{name}.csv")
+        df.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+    hours = chunk["system"]["timestamp"]
+    print(f"✅ Chunk {k + 1}: {hours.iloc[0]} → {hours.iloc[-1]} | Cost: {chunk['system']['total_cost'].sum():.2f} €")
+
+print(f"\n📄 Results saved to: {args.out} ({time.perf_counter() - start:.1f} s)")
@@ -1,142 +1,69 @@
-import pandas as pd
-import pyomo.environ as pyo
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gridmodel.cache import ResultCache
+from gridmodel.instrument import StageLog
+from gridmodel.network import Grid
+from gridmodel.nodal import nodal_model, nodal_results
+from gridmodel.store import ResultStore, nodal_tables
 
 # ========== 1. Load Data ==========
-supply = pd.read_csv("data/supply_adjusted.csv")
-lines = pd.read_csv("data/lines.csv")
-demand = pd.read_csv("data/demand.csv")
-weather = pd.read_csv("data/weatherprofiles.csv")
+# Validated once and held as arrays (gridmodel/network.py); the solves and cache keys use its DataFrames
+grid = Grid.load("data", "lines.csv")
+supply, lines, demand, weather = grid.frames()
 
 # ========== 2. Define Scenarios ==========
 scenarios = ["hs", "hw", "lwls"]
 demand_levels = ["offpeak_demand", "average_demand", "peak_demand"]
-renewable_types = ["onshorewind", "offshorewind", "solar"]
+SOLVER = None  # backend: "highs", "glpk", "scipy", ... (gridmodel/engine.py); None = first available
+NODAL_MODEL = "pyomo"  # "sparse": same LP assembled as scipy.sparse matrices (gridmodel/sparse_opf.py)
+                      # "n1": sparse LP with N-1 security constraints (gridmodel/security.py)
 
 # ========== 3. Loop Over All Scenario Combinations ==========
+# Solved scenarios are cached by a hash of their inputs; set USE_CACHE = False to re-solve everything
+USE_CACHE = True
+cache = ResultCache() if USE_CACHE else None
+
+# Set USE_STORE = True to also write typed Parquet tables (generation, flows, LMPs, system totals) to outputs/store
+USE_STORE = False
+store = ResultStore("outputs/store") if USE_STORE else None
+
+# Wall time, memory, model size and solver iterations of every stage, one JSON line each
+# (read with gridmodel.instrument.read_log); TRACE_MEMORY adds tracemalloc peaks, PROFILE_DIR cProfile dumps
+TRACE_MEMORY = False
+PROFILE_DIR = None
+LOG_PATH = "outputs/nodal/stages.jsonl"
+if os.path.exists(LOG_PATH):
+    os.remove(LOG_PATH)
+log = StageLog(LOG_PATH, TRACE_MEMORY, PROFILE_DIR, Lines="lines")
+
+# Built once; every scenario updates and re-solves it (gridmodel.nodal.nodal_model)
+model = nodal_model(supply, lines, demand, NODAL_MODEL, SOLVER)
+if NODAL_MODEL == "pyomo":
+    print(f"Solver: {model.solver_name}")
+
 for scenario_name in scenarios:
     for demand_level in demand_levels:
         print(f"\n--- Solving: {scenario_name} | {demand_level} ---")
+        keys = {"Scenario": scenario_name, "DemandLevel": demand_level}
 
-        available_capacity = {}
-        costs = {}
-
-        # Adjust available capacity based on weather
-        for _, row in supply.iterrows():
-            node = row["node"]
-            tech = row["type"]
-            base_cap = row["adjusted_capacity"]
-            mc = row["mc"]
-
-            if tech in renewable_types:
-                prof = weather[(weather["scenario"] == scenario_name) & (weather["node"] == node)]
-                multiplier = prof.iloc[0][f"{tech}_profile"] if not prof.empty else 0
-            else:
-                multiplier = 1
-
-            cap = base_cap * multiplier
-            available_capacity[(node, tech)] = cap
-            costs[(node, tech)] = mc
-
-        # Line and demand inputs
-        line_cap = {(row["from_node"], row["to_node"]): row["linecap"] for _, row in lines.iterrows()}
-        nodal_demand = dict(zip(demand["node"], demand[demand_level]))
-
-        # ========== 4. Pyomo Model Setup ==========
-        model = pyo.ConcreteModel()
-        model.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
-
-        model.NODES = pyo.Set(initialize=demand["node"].unique())
-        model.LINES = pyo.Set(initialize=line_cap.keys(), dimen=2)
-        model.GENS = pyo.Set(initialize=available_capacity.keys(), dimen=2)
-
-        model.p_gen = pyo.Var(model.GENS, domain=pyo.NonNegativeReals)
-        model.p_flow = pyo.Var(model.LINES, domain=pyo.Reals)
-        model.theta = pyo.Var(model.NODES, domain=pyo.Reals)  
-
-        # Objective: Minimize total system cost
-        def objective_rule(m):
-            return sum(costs[g] * m.p_gen[g] for g in m.GENS)
-        model.OBJ = pyo.Objective(rule=objective_rule, sense=pyo.minimize)
-
-        # Nodal balance: gen + inflow - outflow = demand
-        def nodal_balance_rule(m, n):
-            gen_sum = sum(m.p_gen[(n, tech)] for (node, tech) in m.GENS if node == n)
-            inflow = sum(m.p_flow[(i, j)] for (i, j) in m.LINES if j == n)
-            outflow = sum(m.p_flow[(i, j)] for (i, j) in m.LINES if i == n)
-            return gen_sum + inflow - outflow == nodal_demand[n]
-        model.NodalBalance = pyo.Constraint(model.NODES, rule=nodal_balance_rule)
-
-        # Generator capacity limits
-        def gen_capacity_rule(m, n, tech):
-            return m.p_gen[(n, tech)] <= available_capacity[(n, tech)]
-        model.GenCapacity = pyo.Constraint(model.GENS, rule=gen_capacity_rule)
-
-        # Line capacity limits
-        def line_capacity_rule_pos(m, i, j):
-            return m.p_flow[(i, j)] <= line_cap[(i, j)]
-        def line_capacity_rule_neg(m, i, j):
-            return m.p_flow[(i, j)] >= -line_cap[(i, j)]
-        model.LineCapacityPos = pyo.Constraint(model.LINES, rule=line_capacity_rule_pos)
-        model.LineCapacityNeg = pyo.Constraint(model.LINES, rule=line_capacity_rule_neg)
-
-        # DC Load Flow approximation
-        def dc_flow_rule(m, i, j):
-            return m.p_flow[(i, j)] == m.theta[i] - m.theta[j]
-        model.DCFlow = pyo.Constraint(model.LINES, rule=dc_flow_rule)
-
-
-        # ========== 5. Solve ==========
-        solver = pyo.SolverFactory("glpk")
-        results = solver.solve(model, tee=False)
-
-        if results.solver.status != pyo.SolverStatus.ok or results.solver.termination_condition != pyo.TerminationCondition.optimal:
-            print(f"WARNING: Solver failed for {scenario_name} | {demand_level}")
-
-        # ========== 6. Collect Outputs ==========
-        output = []
-
-        for (n, t) in model.GENS:
-            gen_value = pyo.value(model.p_gen[(n, t)])
-            lmp = model.dual.get(model.NodalBalance[n], 0)
-            mc = costs[(n, t)]
-            surplus = (lmp - mc) * gen_value
-
-            output.append({"Node": n, "Type": t, "Category": "Generation", "Value": gen_value})
-            output.append({"Node": n, "Type": t, "Category": "Surplus", "Value": surplus})
-
-        for (i, j) in model.LINES:
-            flow = pyo.value(model.p_flow[(i, j)])
-            output.append({"Node": i, "Type": f"to_{j}", "Category": "Flow", "Value": flow})
-
-        for n in model.NODES:
-            theta_val = pyo.value(model.theta[n])
-            lmp_val = model.dual.get(model.NodalBalance[n], None)
-            output.append({"Node": n, "Type": "", "Category": "LMP", "Value": lmp_val})
-            output.append({"Node": n, "Type": "", "Category": "Angle", "Value": theta_val})
-
-        output.append({"Node": "System", "Type": "", "Category": "TotalCost", "Value": pyo.value(model.OBJ)})
-
-        total_paid = sum(
-            model.dual.get(model.NodalBalance[n], 0) * pyo.value(model.p_gen[(n, t)])
-            for (n, t) in model.GENS
-        )
-
-        output.append({"Node": "System", "Type": "", "Category": "TotalPaid", "Value": total_paid})
-
-        total_surplus = total_paid - pyo.value(model.OBJ)
-        output.append({"Node": "System", "Type": "", "Category":"TotalSurplus", "Value": total_surplus})
-
-        #surplussumcheck
-        sum_surplus_check = sum(
-            entry["Value"]
-            for entry in output
-            if entry["Category"] == "Surplus"
-        )
+        # Cached results are used if the inputs are unchanged; failed solves are not cached
+        entry = nodal_results(supply, lines, demand, weather, scenario_name, demand_level, SOLVER, cache,
+                              NODAL_MODEL, log, model)
+        if "security" in entry:
+            print(f"N-1: {len(entry['contingencies'])} contingency constraints, {entry['security']['rounds']} solves")
 
+        df = entry["outputs"]
+        total_surplus = df["Value"].iloc[-2]
+        sum_surplus_check = df["Value"].iloc[-1]
         print(f"Check: total_surplus = {total_surplus:.2f}, sum of individual surpluese = {sum_surplus_check:.2f}")
-        output.append({"Node": "System", "Type": "", "Category": "CheckSurplusSum", "Value": sum_surplus_check})
-        # end surplussumcheck
 
-        df = pd.DataFrame(output)
-        df.to_csv(f"outputs/nodal/{scenario_name}_{demand_level}.csv", index=False)
+        with log.stage("nodal.write", **keys):
+            df.to_csv(f"outputs/nodal/{scenario_name}_{demand_level}.csv", index=False)
+            if "contingencies" in entry:
+                entry["contingencies"].to_csv(f"outputs/nodal/{scenario_name}_{demand_level}_contingencies.csv", index=False)
+            if store is not None:
+                store.write_tables(
+                    nodal_tables(df, entry["line_duals"], supply, entry["solver"], entry.get("contingencies")), Lines="lines", Scenario=scenario_name, DemandLevel=demand_level
+                )
@@ -1,6 +1,11 @@
 import pandas as pd
 import pyomo.environ as pyo
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gridmodel.data import availability
+from gridmodel.engine import ScenarioEngine, optimal
 
 # ========== 1. Load Data ==========
 supply = pd.read_csv("data/supply_adjusted.csv")
@@ -10,27 +15,11 @@ weather = pd.read_csv("data/weatherprofiles.csv")
 # ========== 2. Define Scenario ==========
 scenario_name = "hs"
 demand_level = "peak_demand"
-renewable_types = ["onshorewind", "offshorewind", "solar"]
+SOLVER = None  # backend: "highs", "glpk", "scipy", ... (gridmodel/engine.py); None = first available
 
 print(f"\n--- Solving Uniform Dispatch: {scenario_name} | {demand_level} ---")
 
-available_capacity = {}
-costs = {}
-for _, row in supply.iterrows():
-    node = row["node"]
-    tech = row["type"]
-    base_cap = row["adjusted_capacity"]
-    mc = row["mc"]
-
-    if tech in renewable_types:
-        prof = weather[(weather["scenario"] == scenario_name) & (weather["node"] == node)]
-        multiplier = prof.iloc[0][f"{tech}_profile"] if not prof.empty else 0
-    else:
-        multiplier = 1
-
-    cap = base_cap * multiplier
-    available_capacity[(node, tech)] = cap
-    costs[(node, tech)] = mc
+available_capacity, costs = availability(supply, weather).for_scenario(scenario_name)
 
 # Sum system-wide demand
 total_demand = demand[demand_level].sum()
@@ -53,11 +42,11 @@ def gen_capacity_rule(m, n, tech):
     return m.p_gen[(n, tech)] <= available_capacity[(n, tech)]
 model.GenCapacity = pyo.Constraint(model.GENS, rule=gen_capacity_rule)
 
-solver = pyo.SolverFactory("glpk")
-results = solver.solve(model, tee=False)
-
-if results.solver.status != pyo.SolverStatus.ok or results.solver.termination_condition != pyo.TerminationCondition.optimal:
-    print(f"WARNING: Solver failed for {scenario_name} | {demand_level}")
+engine = ScenarioEngine(model, SOLVER)
+print(f"Solver: {engine.solver_name}")
+results = engine.solve(f"{scenario_name} | {demand_level}")
+if not optimal(results):
+    sys.exit(f"No optimal solution for {scenario_name} | {demand_level}, nothing written")
 
 # ========== 4. Output Dispatch ==========
 output = []
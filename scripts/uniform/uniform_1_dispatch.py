@@ -1,6 +1,12 @@
 import pandas as pd
 import pyomo.environ as pyo
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gridmodel.builder import build_uniform_model
+from gridmodel.data import availability
+from gridmodel.engine import ScenarioEngine, optimal
 
 # ========== 1. Load Data ==========
 supply = pd.read_csv("data/supply_adjusted.csv")
@@ -10,57 +16,30 @@ weather = pd.read_csv("data/weatherprofiles.csv")
 # ========== 2. Define Scenarios ==========
 scenarios = ["hs", "hw", "lwls"]
 demand_levels = ["offpeak_demand", "average_demand", "peak_demand"]
-renewable_types = ["onshorewind", "offshorewind", "solar"]
+SOLVER = None  # backend: "highs", "glpk", "scipy", ... (gridmodel/engine.py); None = first available
 
 # ========== 3. Loop Over All Scenario Combinations ==========
+engine = None
 for scenario_name in scenarios:
     for demand_level in demand_levels:
         print(f"\n--- Solving Uniform Dispatch: {scenario_name} | {demand_level} ---")
 
-        available_capacity = {}
-        costs = {}
-        for _, row in supply.iterrows():
-            node = row["node"]
-            tech = row["type"]
-            base_cap = row["adjusted_capacity"]
-            mc = row["mc"]
-
-            if tech in renewable_types:
-                prof = weather[(weather["scenario"] == scenario_name) & (weather["node"] == node)]
-                multiplier = prof.iloc[0][f"{tech}_profile"] if not prof.empty else 0
-            else:
-                multiplier = 1
-
-            cap = base_cap * multiplier
-            available_capacity[(node, tech)] = cap
-            costs[(node, tech)] = mc
+        available_capacity, costs = availability(supply, weather).for_scenario(scenario_name)
 
         # Sum system-wide demand
         total_demand = demand[demand_level].sum()
 
         # ========== 4. Pyomo Model Setup ==========
-        model = pyo.ConcreteModel()
-
-        model.GENS = pyo.Set(initialize=available_capacity.keys(), dimen=2)
-        model.p_gen = pyo.Var(model.GENS, domain=pyo.NonNegativeReals)
-
-        def objective_rule(m):
-            return sum(costs[g] * m.p_gen[g] for g in m.GENS)
-        model.OBJ = pyo.Objective(rule=objective_rule, sense=pyo.minimize)
-
-        def demand_constraint(m):
-            return sum(m.p_gen[g] for g in m.GENS) == total_demand
-        model.DemandConstraint = pyo.Constraint(rule=demand_constraint)
-
-        def gen_capacity_rule(m, n, tech):
-            return m.p_gen[(n, tech)] <= available_capacity[(n, tech)]
-        model.GenCapacity = pyo.Constraint(model.GENS, rule=gen_capacity_rule)
-
-        solver = pyo.SolverFactory("glpk")
-        results = solver.solve(model, tee=False)
+        if engine is None:
+            engine = ScenarioEngine(build_uniform_model(available_capacity, costs, total_demand), SOLVER)
+            print(f"Solver: {engine.solver_name}")
+        else:
+            engine.update(capacity=available_capacity, total_demand=total_demand)
+        model = engine.model
 
-        if results.solver.status != pyo.SolverStatus.ok or results.solver.termination_condition != pyo.TerminationCondition.optimal:
-            print(f"WARNING: Solver failed for {scenario_name} | {demand_level}")
+        results = engine.solve(f"{scenario_name} | {demand_level}")
+        if not optimal(results):
+            continue    # no dispatch file; the later uniform scripts skip this scenario
 
         # ========== 5. Output Dispatch ==========
         output = []
@@ -76,7 +55,7 @@ for scenario_name in scenarios:
             "Node": "System",
             "Type": "",
             "Category": "TotalCost",
-            "Value": pyo.value(model.OBJ)
+            "Value": pyo.value(model.GenerationCost)
         })
 
         df = pd.DataFrame(output)
@@ -1,6 +1,9 @@
 import pandas as pd
-import pyomo.environ as pyo
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gridmodel.ptdf import PTDFEngine
 
 # === Load static inputs ===
 lines = pd.read_csv("data/lines.csv")
@@ -15,6 +18,9 @@ demand["node"] = demand["node"].astype(int)
 line_cap = {(row["from_node"], row["to_node"]): row["linecap"] for _, row in lines.iterrows()}
 all_nodes = sorted(set(lines["from_node"]).union(set(lines["to_node"])))
 
+# PTDF computed once for the topology; each check is then a single matrix multiply
+ptdf = PTDFEngine.from_lines(lines, all_nodes)
+
 scenarios = ["hs", "hw", "lwls"]
 demand_levels = ["offpeak_demand", "average_demand", "peak_demand"]
 
@@ -49,51 +55,8 @@ for scenario in scenarios:
             last_node = all_nodes[-1]
             net_injection[last_node] -= net_sum  # force balance
 
-        # === Build DC Load Flow Model ===
-        model = pyo.ConcreteModel()
-        model.NODES = pyo.Set(initialize=all_nodes)
-        model.LINES = pyo.Set(initialize=line_cap.keys(), dimen=2)
-
-        model.theta = pyo.Var(model.NODES, domain=pyo.Reals)
-        model.flow = pyo.Var(model.LINES, domain=pyo.Reals)
-
-        # Slack bus: fix angle at first node
-        slack_node = all_nodes[0]
-        model.Slack = pyo.Constraint(expr=model.theta[slack_node] == 0)
-
-        # DC flow: flow = angle difference
-        def dc_flow_rule(m, i, j):
-            return m.flow[(i, j)] == m.theta[i] - m.theta[j]
-        model.DCFlow = pyo.Constraint(model.LINES, rule=dc_flow_rule)
-
-        # Nodal power balance
-        def nodal_balance_rule(m, n):
-            inflow = sum(m.flow[(i, j)] for (i, j) in m.LINES if j == n)
-            outflow = sum(m.flow[(i, j)] for (i, j) in m.LINES if i == n)
-            return inflow - outflow == -net_injection[n]
-        model.Balance = pyo.Constraint(model.NODES, rule=nodal_balance_rule)
-
-        # Solve model
-        solver = pyo.SolverFactory("glpk")
-        results = solver.solve(model, tee=False)
-
-        if results.solver.termination_condition != pyo.TerminationCondition.optimal:
-            print("❌ Load flow model did not solve.")
-            continue
-
-                # === Check for violations ===
-        violations = []
-        for (i, j) in model.LINES:
-            flow = pyo.value(model.flow[(i, j)])
-            cap = line_cap[(i, j)]
-            if abs(flow) > cap + 1e-3:
-                violations.append({
-                    "From": i,
-                    "To": j,
-                    "Flow": flow,
-                    "Capacity": cap,
-                    "Overload": abs(flow) - cap
-                })
+        # === DC Load Flow and Violations ===
+        violations = ptdf.violations(net_injection)
 
         if not violations:
             print("✅ No flow violations. Dispatch is feasible.")
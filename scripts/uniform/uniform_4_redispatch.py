@@ -1,20 +1,28 @@
 # script_d_redispatch.py
 import pandas as pd
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gridmodel.data import line_reactances, scenario_inputs
+from gridmodel.redispatch import heuristic_redispatch, optimal_redispatch
 
 # === Load static inputs ===
 supply = pd.read_csv("data/supply_adjusted.csv")
 demand = pd.read_csv("data/demand.csv")
 lines = pd.read_csv("data/lines.csv")
+weather = pd.read_csv("data/weatherprofiles.csv")
 
 supply["gen_id"] = supply["node"].astype(str) + "_" + supply["type"]
 line_cap = {(row["from_node"], row["to_node"]): row["linecap"] for _, row in lines.iterrows()}
 
 scenarios = ["hs", "hw", "lwls"]
 demand_levels = ["offpeak_demand", "average_demand", "peak_demand"]
-VRE = ["onshorewind", "offshorewind", "solar"]
-STEP = 10
-MAX_ITER = 1000
+
+# "heuristic": stepwise redispatch used for the thesis results
+# "optimal":   cost-minimising redispatch LP with DC flow constraints (gridmodel.redispatch)
+REDISPATCH_MODE = "heuristic"
+SOLVER = None  # backend for the optimal mode: "highs", "glpk", "scipy", ... (gridmodel/engine.py)
 
 summary_rows = []
 
@@ -37,40 +45,13 @@ for scenario in scenarios:
         df = df.merge(supply[["gen_id", "mc", "adjusted_capacity"]], on="gen_id", how="left")
 
         violations = pd.read_csv(vfile)
-        exporting_nodes = set(violations["From"])
-        importing_nodes = set(violations["To"])
-
-        curtailment = 0
-        redispatch_cost = 0
-
-        for _ in range(MAX_ITER):
-            changes = 0
-
-            for node in exporting_nodes:
-                vre_units = df[(df["Node"] == node) & (df["Type"].isin(VRE)) & (df["Value"] > 0)]
-                vre_units = vre_units.sort_values("mc")
-                for idx in vre_units.index:
-                    reduce = min(STEP, df.at[idx, "Value"])
-                    if reduce > 0:
-                        df.at[idx, "Value"] -= reduce
-                        curtailment += reduce
-                        changes += 1
-                        break
-
-            for node in importing_nodes:
-                conv_units = df[(df["Node"] == node) & (~df["Type"].isin(VRE))]
-                conv_units = conv_units.sort_values("mc")
-                for idx in conv_units.index:
-                    room = df.at[idx, "adjusted_capacity"] - df.at[idx, "Value"]
-                    increase = min(STEP, room)
-                    if increase > 0:
-                        df.at[idx, "Value"] += increase
-                        redispatch_cost += increase * df.at[idx, "mc"]
-                        changes += 1
-                        break
-
-            if changes == 0:
-                break
+
+        if REDISPATCH_MODE == "optimal":
+            available_capacity, _ = scenario_inputs(supply, weather, scenario)
+            nodal_demand = dict(zip(demand["node"], demand[level]))
+            df, curtailment, redispatch_cost = optimal_redispatch(df, available_capacity, line_cap, nodal_demand, SOLVER, line_reactances(lines))
+        else:
+            df, curtailment, redispatch_cost = heuristic_redispatch(df, violations, supply)
 
         print(f"✅ Completed | Curtailment: {curtailment:.1f} MW | Redispatch Cost: {redispatch_cost:.2f} €")
 
@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gridmodel.cache import DEFAULT_DIR, ResultCache
+from gridmodel.data import read_csv, validate_inputs
+from gridmodel.instrument import StageLog, stage
+from gridmodel.ptdf import PTDFEngine
+from gridmodel.store import ResultStore, uniform_tables
+from gridmodel.uniform import run_uniform, save_uniform
+
+# All four uniform steps (dispatch → price → feasibility → redispatch) in one process,
+# passing results in memory. With --save the usual files are written to outputs/.
+#
+#   python scripts/uniform/uniform_pipeline.py --save
+#   python scripts/uniform/uniform_pipeline.py --redispatch optimal
+#   python scripts/uniform/uniform_pipeline.py --dispatch merit
+#   python scripts/uniform/uniform_pipeline.py --store outputs/store
+#   python scripts/uniform/uniform_pipeline.py --log outputs/uniform_stages.jsonl --trace-memory
+#
+# Results are cached by input hash (gridmodel/cache.py), so re-runs only solve the
+# scenarios whose inputs changed; --no-cache disables this.
+
+parser = argparse.ArgumentParser(description="In-memory uniform pricing pipeline")
+parser.add_argument("--dispatch", default="lp", choices=["lp", "merit"], help="dispatch LP or closed-form merit order")
+parser.add_argument("--redispatch", default="heuristic", choices=["heuristic", "optimal"])
+parser.add_argument("--lines", default="data/lines.csv")
+parser.add_argument("--solver", default=None, help="solver backend: highs, glpk, scipy or any Pyomo solver name (default: first available)")
+parser.add_argument("--save", action="store_true", help="write the uniform_* output files")
+parser.add_argument("--out", default="outputs")
+parser.add_argument("--store", default=None, help="also write typed Parquet tables to this ResultStore directory")
+parser.add_argument("--cache", default=DEFAULT_DIR, help="result cache directory")
+parser.add_argument("--no-cache", action="store_true", help="solve every scenario again")
+parser.add_argument("--log", default=None, help="append per-stage timings, memory and solver iterations to this JSON-lines file")
+parser.add_argument("--trace-memory", action="store_true", help="with --log: record the peak Python memory of every stage")
+parser.add_argument("--profile", default=None, metavar="DIR", help="with --log: cProfile dump of every scenario to DIR")
+args = parser.parse_args()
+
+# === Load static inputs ===
+supply = read_csv("data/supply_adjusted.csv")
+demand = read_csv("data/demand.csv")
+weather = read_csv("data/weatherprofiles.csv")
+lines = read_csv(args.lines)
+validate_inputs(supply, lines, demand, weather)
+ptdf = PTDFEngine.from_lines(lines)
+cache = None if args.no_cache else ResultCache(args.cache)
+log = StageLog(args.log, args.trace_memory, args.profile) if args.log else None
+
+scenarios = ["hs", "hw", "lwls"]
+demand_levels = ["offpeak_demand", "average_demand", "peak_demand"]
+
+results = []
+for scenario in scenarios:
+    for level in demand_levels:
+        with stage(log, "uniform", Scenario=scenario, DemandLevel=level):
+            result = run_uniform(supply, lines, demand, weather, scenario, level, args.solver, args.redispatch, ptdf, args.dispatch, cache, log)
+        results.append(result)
+
+        price = result.feasibility.price
+        n_violations = 0 if result.feasibility.violations is None else len(result.feasibility.violations)
+        print(
+            f"✅ {scenario} | {level} | Price: {price.clearing_price} €/MWh | Violations: {n_violations} | "
+            f"Curtailment: {result.curtailment:.1f} MW | Redispatch Cost: {result.redispatch_cost:.2f} €"
+        )
+
+summary_df = pd.DataFrame([r.summary() for r in results if r.feasibility.violations is not None and not r.feasibility.violations.empty])
+print("\n" + summary_df.to_string(index=False))
+
+if cache is not None:
+    print(f"\nCache: {cache.hits} reused, {cache.misses} solved ({args.cache})")
+
+if log is not None:
+    print(f"Stage log: {args.log}")
+
+if args.save:
+    save_uniform(results, args.out)
+    print(f"\n📄 Results saved to: {args.out}/uniform_*")
+
+if args.store:
+    store = ResultStore(args.store)
+    lines_name = os.path.splitext(os.path.basename(args.lines))[0]
+    for result in results:
+        dispatch = result.feasibility.price.dispatch
+        store.write_tables(uniform_tables(result), Lines=lines_name, Scenario=dispatch.scenario, DemandLevel=dispatch.demand_level)
+    print(f"📄 Typed tables saved to: {args.store}")
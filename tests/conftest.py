@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# The scripts import gridmodel from scripts/ (see scripts/cli.py)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+
+@pytest.fixture(scope="session")
+def data_root():
+    """The 6-node input data in data/."""
+    return os.path.join(ROOT, "data")
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gridmodel import runner
+from gridmodel.aggregate import COMPARED, TRACK_METRICS, RunningTotals, ScenarioAggregator
+
+GROUPINGS = [["Scenario"], ["DemandLevel"], ["Scenario", "DemandLevel"]]
+
+
+def expected_totals(frame, by, metrics):
+    """Count, sum, mean, min and max of metrics ({name: column}) per group, with pandas."""
+    values = frame[by].assign(**{m: frame[col] for m, col in metrics.items()})
+    long = values.melt(id_vars=by, value_vars=list(metrics), var_name="Metric")
+    stats = long.groupby(by + ["Metric"], sort=False)["value"].agg(["count", "sum", "mean", "min", "max"])
+    return stats.rename(columns=str.capitalize)
+
+
+@pytest.fixture(scope="module")
+def run(data_root):
+    """The 6-node grid run once, keeping the per-run tables, and streamed into one aggregator per grouping."""
+    aggregators = [ScenarioAggregator(by=by) for by in GROUPINGS]
+
+    class Fanout:
+        def add(self, keys, totals):
+            for aggregator in aggregators:
+                aggregator.add(keys, totals)
+
+    merged = runner.run_grid(runner.scenario_grid(data_dir=data_root, redispatch="optimal"), workers=1,
+                             aggregator=Fanout())
+    outputs = merged["nodal"]
+    system = outputs[outputs["Node"] == "System"].astype({"Value": float}).pivot_table(
+        index=["Scenario", "DemandLevel", "Lines"], columns="Category", values="Value").reset_index()
+    return aggregators, {"nodal": system, "uniform": merged["uniform_summary"]}
+
+
+@pytest.mark.parametrize("k", range(len(GROUPINGS)))
+def test_streamed_totals_match_groupby(run, k):
+    aggregators, tables = run
+    aggregator, by = aggregators[k], GROUPINGS[k]
+    totals = aggregator.totals().set_index(by + ["Track", "Metric"])
+
+    for track, metrics in TRACK_METRICS.items():
+        expected = expected_totals(tables[track], by, metrics)
+        streamed = totals.xs(track, level="Track")[expected.columns].loc[expected.index]
+        pd.testing.assert_frame_equal(streamed, expected, check_dtype=False, check_names=False, rtol=1e-12)
+
+    runs = totals.groupby(by)["Runs"].max().sort_index()
+    pd.testing.assert_series_equal(runs, tables["nodal"].groupby(by).size().sort_index(), check_names=False)
+
+
+def test_comparison_matches_groupby_means(run):
+    aggregators, tables = run
+    by = GROUPINGS[0]
+    comparison = aggregators[0].comparison().set_index(by)
+    nodal = tables["nodal"].groupby(by)[[TRACK_METRICS["nodal"][m] for m in COMPARED]].mean()
+    uniform = tables["uniform"].groupby(by)[[TRACK_METRICS["uniform"][m] for m in COMPARED]].mean()
+
+    for metric in COMPARED:
+        n, u = nodal[TRACK_METRICS["nodal"][metric]], uniform[TRACK_METRICS["uniform"][metric]]
+        np.testing.assert_allclose(comparison[f"Nodal_{metric}"], n.loc[comparison.index], rtol=1e-12)
+        np.testing.assert_allclose(comparison[f"Uniform_{metric}"], u.loc[comparison.index], rtol=1e-12)
+        np.testing.assert_allclose(comparison[f"{metric}_Difference"], (u - n).loc[comparison.index], rtol=1e-9)
+
+
+def test_running_totals_skip_missing_values_like_pandas():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({"Group": rng.choice(["a", "b", "c"], 500), "x": rng.normal(0, 1e6, 500),
+                          "y": rng.integers(0, 10, 500).astype(float)})
+    frame.loc[rng.random(500) < 0.2, "x"] = np.nan
+    frame.loc[frame["Group"] == "c", "y"] = np.nan
+
+    totals = RunningTotals(["x", "y"])
+    for group, x, y in frame.itertuples(index=False):
+        totals.add(group, {"x": x, "y": None if np.isnan(y) else y})
+
+    stats = frame.groupby("Group")[["x", "y"]].agg(["count", "sum", "min", "max"])
+    for group, state in totals.groups.items():
+        assert state["runs"] == (frame["Group"] == group).sum()
+        for k, metric in enumerate(["x", "y"]):
+            assert state["count"][k] == stats.at[group, (metric, "count")]
+            assert state["sum"][k] == pytest.approx(stats.at[group, (metric, "sum")], rel=1e-12)
+            if state["count"][k]:
+                assert state["min"][k] == stats.at[group, (metric, "min")]
+                assert state["max"][k] == stats.at[group, (metric, "max")]
+        expected_mean = frame.loc[frame["Group"] == group, ["x", "y"]].mean().to_numpy()
+        np.testing.assert_allclose(totals.mean(group), expected_mean, rtol=1e-12)
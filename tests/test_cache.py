@@ -0,0 +1,37 @@
+import pytest
+
+from gridmodel.cache import ResultCache
+from gridmodel.data import load_inputs
+from gridmodel.nodal import nodal_results
+from gridmodel.uniform import run_uniform
+
+
+@pytest.fixture
+def inputs(data_root):
+    return load_inputs(data_root)
+
+
+@pytest.mark.parametrize("method", ["pyomo", "sparse"])
+def test_only_optimal_nodal_solves_are_cached(inputs, tmp_path, method):
+    supply, lines, demand, weather = inputs
+    cache = ResultCache(str(tmp_path))
+    infeasible = demand.assign(peak_demand=demand["peak_demand"] * 20)
+
+    entry = nodal_results(supply, lines, infeasible, weather, "hs", "peak_demand", "scipy", cache, method)
+    assert not entry["optimal"]
+    nodal_results(supply, lines, infeasible, weather, "hs", "peak_demand", "scipy", cache, method)
+    assert cache.hits == 0
+
+    assert nodal_results(supply, lines, demand, weather, "hs", "peak_demand", "scipy", cache, method)["optimal"]
+    assert nodal_results(supply, lines, demand, weather, "hs", "peak_demand", "scipy", cache, method)["optimal"]
+    assert cache.hits == 1
+
+
+def test_only_optimal_uniform_chains_are_cached(inputs, tmp_path):
+    supply, lines, demand, weather = inputs
+    cache = ResultCache(str(tmp_path))
+    infeasible = demand.assign(peak_demand=demand["peak_demand"] * 20)
+
+    assert not run_uniform(supply, lines, infeasible, weather, "hs", "peak_demand", "scipy", cache=cache).optimal
+    run_uniform(supply, lines, infeasible, weather, "hs", "peak_demand", "scipy", cache=cache)
+    assert cache.hits == 0
@@ -0,0 +1,25 @@
+import os
+
+import numpy as np
+
+from gridmodel.data import availability, load_inputs
+
+
+def test_availability_reads_bom_prefixed_files(data_root, tmp_path):
+    supply, _, _, weather = load_inputs(data_root)
+    paths = {}
+    for name in ["supply_adjusted.csv", "weatherprofiles.csv"]:
+        with open(os.path.join(data_root, name), encoding="utf-8-sig") as f:
+            text = f.read()
+        # As saved by Excel: a byte order mark before the first header, and blanks around the names
+        header, rest = text.split("\n", 1)
+        paths[name] = str(tmp_path / name)
+        with open(paths[name], "w", encoding="utf-8-sig") as f:
+            f.write(",".join(f" {c} " for c in header.split(",")) + "\n" + rest)
+
+    from_paths = availability(paths["supply_adjusted.csv"], paths["weatherprofiles.csv"])
+    from_frames = availability(supply, weather)
+    assert from_paths.scenarios == from_frames.scenarios
+    assert from_paths.gens == from_frames.gens
+    np.testing.assert_array_equal(from_paths.capacity, from_frames.capacity)
+    assert from_paths.for_scenario("hw") == from_frames.for_scenario("hw")
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gridmodel.data import load_inputs
+from gridmodel.decompose import decompose_lmps, decompose_tables
+from gridmodel.nodal import nodal_results
+from gridmodel.ptdf import PTDFEngine
+
+RUNS = [(s, d) for s in ["hs", "hw", "lwls"] for d in ["offpeak_demand", "average_demand", "peak_demand"]]
+
+
+@pytest.fixture(scope="module")
+def inputs(data_root):
+    """The 6-node inputs with unequal line reactances."""
+    supply, lines, demand, weather = load_inputs(data_root)
+    lines = lines.assign(reactance=[0.1 + 0.05 * k for k in range(len(lines))])
+    return supply, lines, demand, weather
+
+
+def solved_arrays(inputs, method="sparse"):
+    """(K x N) LMPs and (K x L) net line duals of all runs, in PTDF node and line order."""
+    supply, lines, demand, weather = inputs
+    ptdf = PTDFEngine.from_lines(lines)
+    lmp, mu = [], []
+    for scenario, level in RUNS:
+        entry = nodal_results(supply, lines, demand, weather, scenario, level, method=method)
+        outputs = entry["outputs"]
+        prices = outputs[outputs["Category"] == "LMP"].set_index("Node")["Value"]
+        lmp.append([prices[n] for n in ptdf.nodes])
+        duals = entry["line_duals"].set_index(["From", "To"])
+        mu.append([duals.loc[l, "DualPos"] + duals.loc[l, "DualNeg"] for l in ptdf.lines])
+    return ptdf, np.array(lmp, dtype=float), np.array(mu, dtype=float)
+
+
+@pytest.mark.parametrize("method", ["pyomo", "sparse"])
+def test_components_add_up_to_lmps(inputs, method):
+    ptdf, lmp, mu = solved_arrays(inputs, method)
+    parts = decompose_lmps(ptdf, lmp, mu)
+
+    assert np.abs(parts.congestion).max() > 1
+    np.testing.assert_allclose(parts.residual, 0, atol=1e-6)
+    np.testing.assert_allclose(parts.energy, lmp[:, ptdf.node_index[ptdf.slack]])
+    np.testing.assert_allclose(parts.by_line.sum(axis=1), parts.congestion, atol=1e-9)
+    assert (parts.loss == 0).all()
+
+
+def test_reference_node_moves_energy_not_lmps(inputs):
+    ptdf, lmp, mu = solved_arrays(inputs)
+    for ref in ptdf.nodes:
+        parts = decompose_lmps(ptdf, lmp, mu, ref=ref)
+        np.testing.assert_allclose(parts.energy, lmp[:, ptdf.node_index[ref]])
+        np.testing.assert_allclose(parts.congestion[:, ptdf.node_index[ref]], 0, atol=1e-9)
+        np.testing.assert_allclose(parts.residual, 0, atol=1e-6)
+
+
+def test_single_run_without_congestion():
+    ptdf = PTDFEngine([1, 2, 3], {(1, 2): 100, (2, 3): 100, (1, 3): 100})
+    parts = decompose_lmps(ptdf, [20.0, 20.0, 20.0], [0.0, 0.0, 0.0])
+    assert parts.lmp.shape == (1, 3)
+    np.testing.assert_allclose(parts.energy, [20.0])
+    np.testing.assert_allclose(parts.congestion, 0)
+    np.testing.assert_allclose(parts.residual, 0)
+
+
+def test_n1_lmps_need_the_contingency_term(inputs):
+    supply, lines, demand, weather = inputs
+    ptdf = PTDFEngine.from_lines(lines)
+    lmp, flows, cuts = [], [], []
+    for scenario, level in RUNS:
+        entry = nodal_results(supply, lines, demand, weather, scenario, level, method="n1")
+        keys = {"Scenario": scenario, "DemandLevel": level}
+        outputs = entry["outputs"]
+        lmp.append(outputs[outputs["Category"] == "LMP"].rename(columns={"Value": "LMP"}).assign(**keys))
+        flows.append(entry["line_duals"].assign(**keys))
+        cuts.append(entry["contingencies"].assign(**keys))
+    lmp = pd.concat(lmp).astype({"Node": "int64", "LMP": float})
+    flows, cuts = pd.concat(flows), pd.concat(cuts)
+
+    nodes, by_line = decompose_tables(lmp, flows, ptdf, contingencies=cuts)
+    assert nodes["Residual"].abs().max() < 1e-6
+    assert by_line["Outage_From"].notna().any()
+
+    base_only, _ = decompose_tables(lmp, flows, ptdf)
+    assert base_only["Residual"].abs().max() > 1
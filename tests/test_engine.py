@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from gridmodel.builder import build_nodal_model
+from gridmodel.data import line_capacities, load_inputs, scenario_inputs
+from gridmodel.engine import ScenarioEngine, make_solver, optimal
+from gridmodel.settlement import from_pyomo
+
+SOLVERS = [name for name in ("highs", "scipy") if make_solver(name)[1].available(exception_flag=False)]
+
+
+@pytest.mark.parametrize("solver_name", SOLVERS)
+def test_infeasible_solve_is_reported_not_raised(data_root, solver_name):
+    supply, lines, demand, weather = load_inputs(data_root)
+    capacity, costs = scenario_inputs(supply, weather, "hs")
+    nodal_demand = dict(zip(demand["node"], demand["peak_demand"]))
+    engine = ScenarioEngine(
+        build_nodal_model(demand["node"].unique(), capacity, costs, line_capacities(lines), nodal_demand), solver_name
+    )
+
+    assert optimal(engine.solve("feasible"))
+    expected = from_pyomo(engine.model, costs)
+
+    engine.update(demand={n: 20 * d for n, d in nodal_demand.items()})
+    assert not optimal(engine.solve("peak x20"))
+    failed = from_pyomo(engine.model, costs)
+    assert np.isnan(failed.generation).all() and np.isnan(failed.lmp).all()
+
+    engine.update(demand=nodal_demand)
+    assert optimal(engine.solve("feasible again"))
+    np.testing.assert_allclose(from_pyomo(engine.model, costs).lmp, expected.lmp)
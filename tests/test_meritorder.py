@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from gridmodel.builder import build_uniform_model
+from gridmodel.data import load_inputs
+from gridmodel.engine import ScenarioEngine, make_solver, optimal
+from gridmodel.meritorder import MeritOrder, tie_break
+from gridmodel.settlement import values
+from gridmodel.uniform import dispatch_stage, price_stage
+
+LEVELS = ["offpeak_demand", "average_demand", "peak_demand"]
+SOLVERS = [name for name in ("highs", "scipy") if make_solver(name)[1].available(exception_flag=False)]
+
+
+@pytest.mark.parametrize("scenario_name", ["hs", "hw", "lwls"])
+def test_merit_order_matches_dispatch_lp(data_root, scenario_name):
+    supply, _, demand, weather = load_inputs(data_root)
+    for demand_level in LEVELS:
+        lp = dispatch_stage(supply, demand, weather, scenario_name, demand_level)
+        merit = dispatch_stage(supply, demand, weather, scenario_name, demand_level, method="merit")
+        assert merit.total_cost == pytest.approx(lp.total_cost)
+        np.testing.assert_allclose(merit.dispatch["Value"], lp.dispatch["Value"], atol=1e-6)
+        assert price_stage(merit).clearing_price == price_stage(lp).clearing_price
+
+        # settle() prices the LP's own dispatch with the rule of price_stage
+        settled = MeritOrder(lp.dispatch["mc"]).settle(lp.dispatch["Value"], lp.total_demand)
+        assert settled.price[0] == price_stage(lp).clearing_price
+        assert settled.total_cost[0] == pytest.approx(lp.total_cost)
+
+
+def test_clear_vectorized_rows_match_single_rows():
+    rng = np.random.default_rng(0)
+    mc = rng.choice([5.0, 20.0, 60.0, 75.0], size=12)      # many ties
+    capacity = rng.uniform(0, 100, size=(50, 12))
+    demand = rng.uniform(0, 1300, size=50)
+    merit = MeritOrder(mc)
+    batch = merit.clear(capacity, demand)
+    for k in range(50):
+        row = merit.clear(capacity[k], demand[k])
+        np.testing.assert_allclose(batch.dispatch[k], row.dispatch[0])
+        np.testing.assert_equal(batch.price[k], row.price[0])
+    served = batch.unserved <= 1e-9
+    np.testing.assert_allclose(batch.dispatch[served].sum(axis=1), demand[served])
+    assert np.isnan(batch.price[~served]).all()
+
+
+@pytest.mark.parametrize("solver_name", SOLVERS)
+def test_clear_matches_lp_dispatch_with_ties(solver_name):
+    rng = np.random.default_rng(1)
+    G = 40
+    mc = rng.choice([5.0, 20.0, 60.0, 75.0], size=G)      # ~10 units per tie
+    gens = [(k // 4, f"unit{k}") for k in range(G)]
+    capacity = rng.uniform(0, 100, size=(20, G))
+    demand = rng.uniform(0.05, 0.95, size=20) * capacity.sum(axis=1)
+
+    engine = ScenarioEngine(build_uniform_model(dict(zip(gens, capacity[0])), dict(zip(gens, mc)), demand[0]),
+                            solver_name)
+    merit = MeritOrder(mc).clear(capacity, demand)
+    for k in range(len(demand)):
+        engine.update(capacity=dict(zip(gens, capacity[k])), total_demand=demand[k])
+        assert optimal(engine.solve(f"draw {k}"))
+        np.testing.assert_allclose(values(engine.model.p_gen), merit.dispatch[k], atol=1e-6)
+        assert engine.model.GenerationCost() == pytest.approx(merit.total_cost[k])
+
+
+def test_tie_break_keeps_merit_order():
+    mc = np.array([20.0, 5.0, 20.0, 20.00001, 5.0, 20.0])
+    broken = tie_break(mc)
+    assert len(set(broken)) == len(mc)
+    np.testing.assert_array_equal(np.argsort(broken), np.argsort(mc, kind="stable"))
+    assert np.abs(broken - mc).max() < 1e-4
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gridmodel.data import load_inputs
+from gridmodel.montecarlo import MonteCarloEngine, QuantileSketch
+
+QUANTILES = np.linspace(0, 1, 41)
+
+
+@pytest.fixture
+def draws():
+    """Three columns: positive, negative and mixed-sign heavy-tailed values with zeros and NaNs."""
+    rng = np.random.default_rng(1)
+    x = rng.lognormal(3, 2, (20000, 3))
+    x[:, 1] *= -1
+    x[:, 2] *= rng.choice([-1, 1], len(x))
+    x[rng.random(x.shape) < 0.1] = 0
+    x[rng.random(x.shape) < 0.05] = np.nan
+    return x
+
+
+@pytest.mark.parametrize("rel_error", [0.01, 0.001])
+def test_quantiles_within_relative_error(draws, rel_error):
+    sketch = QuantileSketch(draws.shape[1], rel_error)
+    for batch in np.array_split(draws, 7):
+        sketch.update(batch)
+
+    for q in QUANTILES:
+        # The sketch reports the value at rank floor(q * (n - 1)) of each column
+        exact = np.array([np.quantile(col[~np.isnan(col)], q, method="lower") for col in draws.T])
+        np.testing.assert_allclose(sketch.quantile(q), exact, rtol=rel_error, atol=1e-12)
+
+
+def test_quantiles_do_not_depend_on_batching(draws):
+    whole, batched = QuantileSketch(3), QuantileSketch(3)
+    whole.update(draws)
+    for batch in np.array_split(draws, 50):
+        batched.update(batch)
+    for q in QUANTILES:
+        np.testing.assert_allclose(whole.quantile(q), batched.quantile(q), rtol=1e-12)
+
+
+def test_repeated_values_are_exact_and_empty_columns_nan():
+    prices = np.random.default_rng(2).choice([5.0, 75.0, 150.0], (1000, 1), p=[0.6, 0.3, 0.1])
+    sketch = QuantileSketch(2)
+    sketch.update(np.column_stack([prices, np.full(len(prices), np.nan)]))
+
+    for q in QUANTILES:
+        value, empty = sketch.quantile(q)
+        assert value == np.quantile(prices, q, method="lower")
+        assert np.isnan(empty)
+
+
+@pytest.fixture(scope="module")
+def engine(data_root):
+    supply, lines, demand, weather = load_inputs(data_root)
+    return MonteCarloEngine(supply, lines, demand, weather, "hs", "offpeak_demand", check_lp=True)
+
+
+def test_summary_does_not_depend_on_workers(engine):
+    serial = engine.run(120, batch_size=10, seed=3)
+    parallel = engine.run(120, batch_size=10, seed=3, workers=3)
+    pd.testing.assert_frame_equal(serial.summary, parallel.summary)
+
+
+def test_merit_order_matches_dispatch_lp_per_draw(engine, capsys):
+    capacity, demand = engine.sample(np.random.default_rng(0), 50)
+    engine.evaluate(capacity, demand)
+    assert "WARNING" not in capsys.readouterr().out
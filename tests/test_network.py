@@ -0,0 +1,48 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from gridmodel.data import load_inputs, read_csv
+from gridmodel.network import Grid
+
+
+@pytest.fixture
+def data_dir(data_root, tmp_path):
+    """The 6-node data with the optional reactance and ramp_rate columns added."""
+    for name in os.listdir(data_root):
+        shutil.copy(os.path.join(data_root, name), tmp_path / name)
+    lines = read_csv(tmp_path / "lines.csv")
+    lines["reactance"] = [0.1 + 0.05 * k for k in range(len(lines))]
+    lines.to_csv(tmp_path / "lines.csv", index=False)
+    supply = read_csv(tmp_path / "supply_adjusted.csv")
+    supply["ramp_rate"] = [500.0 if t == "gas" else float("nan") for t in supply["type"]]
+    supply.to_csv(tmp_path / "supply_adjusted.csv", index=False)
+    return str(tmp_path)
+
+
+def assert_frames_equal(actual, expected):
+    for a, e in zip(actual, expected):
+        pd.testing.assert_frame_equal(a, e)
+
+
+def test_frames_round_trip(data_root):
+    grid = Grid.load(data_root)
+    assert_frames_equal(grid.frames(), load_inputs(data_root))
+
+
+def test_frames_round_trip_optional_columns(data_dir):
+    expected = load_inputs(data_dir)
+    assert "reactance" in expected[1] and "ramp_rate" in expected[0]
+    assert_frames_equal(Grid.load(data_dir).frames(), expected)
+
+
+def test_shared_frames_round_trip_optional_columns(data_dir):
+    expected = load_inputs(data_dir)
+    with Grid.load(data_dir).share() as handle:
+        grid = Grid.attach(handle)
+        assert_frames_equal(grid.frames(), expected)
+        scenario = expected[3]["scenario"].iloc[0]
+        assert grid.scenario_inputs(scenario) == Grid.load(data_dir).scenario_inputs(scenario)
+        del grid
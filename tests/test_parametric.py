@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("highspy")
+
+from gridmodel.data import availability, line_capacities, load_inputs
+from gridmodel.parametric import ParametricNodal
+from gridmodel.sparse_opf import SparseNodalModel
+
+
+@pytest.mark.parametrize("scenario", ["hs", "hw", "lwls"])
+def test_line_dual_constant_inside_reported_range(data_root, scenario):
+    supply, lines, demand, weather = load_inputs(data_root)
+    model = SparseNodalModel.from_inputs(supply, lines, demand["node"].unique())
+    table = availability(supply, weather)
+    order = [table.gens.index(g) for g in model.gens]
+    capacity, mc = table.row(scenario)[order], table.mc[order]
+    nodal_demand = dict(zip(demand["node"], demand["peak_demand"]))
+    load = np.array([nodal_demand[n] for n in model.nodes], dtype=float)
+    line_cap = np.array([line_capacities(lines)[l] for l in model.lines], dtype=float)
+
+    parametric = ParametricNodal(model)
+    base = parametric.analyse(capacity, mc, load, line_cap)
+    binding = base.lines[base.lines["Dual"].abs() > 1e-6]
+    assert len(binding) > 0
+
+    for l, row in binding.iterrows():
+        assert row["CapacityLow"] < row["Capacity"] < row["CapacityHigh"] < np.inf
+        # Cost is linear in the limit with slope Dual across the whole range
+        assert row["CostAtHigh"] - row["CostAtLow"] == pytest.approx(
+            row["Dual"] * (row["CapacityHigh"] - row["CapacityLow"]), rel=1e-6)
+
+        for share in [0.05, 0.5, 0.95]:
+            limit = row["CapacityLow"] + share * (row["CapacityHigh"] - row["CapacityLow"])
+            moved = parametric.analyse(capacity, mc, load, np.where(np.arange(len(line_cap)) == l, limit, line_cap))
+
+            assert moved.lines.at[l, "Dual"] == pytest.approx(row["Dual"], abs=1e-6)
+            np.testing.assert_allclose(moved.lmp["LMP"], base.lmp["LMP"], atol=1e-6)
+            assert moved.total_cost == pytest.approx(base.total_cost + row["Dual"] * (limit - row["Capacity"]), rel=1e-9)
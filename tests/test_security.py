@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gridmodel.data import load_inputs
+from gridmodel.ptdf import PTDFEngine
+from gridmodel.security import SecureNodalModel, solve_nodal_n1
+
+
+@pytest.fixture
+def inputs(data_root):
+    """The 6-node inputs with unequal line reactances."""
+    supply, lines, demand, weather = load_inputs(data_root)
+    lines = lines.assign(reactance=[0.1 + 0.05 * k for k in range(len(lines))])
+    return supply, lines, demand, weather
+
+
+def outage_flows(lines, k, injections):
+    """Flows after line k trips, from the PTDF of the network without it (NaN on line k)."""
+    reduced = PTDFEngine.from_lines(lines.drop(index=lines.index[k]))
+    return np.insert(reduced.flows(injections), k, np.nan)
+
+
+def test_lodf_matches_ptdf_with_line_removed(inputs):
+    _, lines, _, _ = inputs
+    ptdf = PTDFEngine.from_lines(lines)
+    rng = np.random.default_rng(0)
+    injections = rng.normal(0, 1000, len(ptdf.nodes))
+    injections -= injections.mean()
+
+    flow = ptdf.flows(injections)
+    lodf = ptdf.lodf()
+    for k in range(len(ptdf.lines)):
+        expected = outage_flows(lines, k, injections)
+        post = flow + lodf[:, k] * flow[k]
+        np.testing.assert_allclose(np.delete(post, k), np.delete(expected, k), atol=1e-6)
+        assert post[k] == pytest.approx(0, abs=1e-9)
+
+
+def test_bridge_line_has_nan_lodf_column(inputs):
+    _, lines, _, _ = inputs
+    radial = pd.concat([lines, pd.DataFrame({"from_node": [6], "to_node": [7], "linecap": [500], "reactance": [0.2]})],
+                       ignore_index=True)
+    ptdf = PTDFEngine.from_lines(radial)
+    lodf = ptdf.lodf()
+
+    bridge = len(radial) - 1
+    assert list(ptdf.bridges()) == [bridge]
+    assert np.isnan(lodf[:, bridge]).all()
+    assert not np.isnan(np.delete(lodf, bridge, axis=1)).any()
+
+
+@pytest.mark.parametrize("scenario", ["hs", "hw", "lwls"])
+def test_n1_dispatch_has_no_post_contingency_overloads(inputs, scenario):
+    supply, lines, demand, weather = inputs
+    entry = solve_nodal_n1(supply, lines, demand, weather, scenario, "peak_demand")
+    assert entry["optimal"] and entry["security"]["secure"]
+
+    outputs = entry["outputs"]
+    generation = outputs[outputs["Category"] == "Generation"].groupby("Node")["Value"].sum()
+    ptdf = PTDFEngine.from_lines(lines)
+    nodal_demand = dict(zip(demand["node"], demand["peak_demand"]))
+    injections = np.array([generation.get(n, 0) - nodal_demand.get(n, 0) for n in ptdf.nodes])
+
+    for k in range(len(ptdf.lines)):
+        post = np.delete(outage_flows(lines, k, injections), k)
+        assert (np.abs(post) <= np.delete(ptdf.capacity, k) + 1e-3).all()
+
+
+def test_n1_dispatch_with_violations_left_is_not_optimal(inputs):
+    supply, lines, demand, weather = inputs
+    model = SecureNodalModel.from_inputs(supply, lines, demand["node"].unique(), max_rounds=1)
+    entry = solve_nodal_n1(supply, lines, demand, weather, "hw", "peak_demand", model)
+    assert entry["security"]["rounds"] == 1 and not entry["security"]["secure"]
+    assert not entry["optimal"]
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+import pytest
+
+from gridmodel.builder import build_nodal_model
+from gridmodel.data import line_capacities, load_inputs, scenario_inputs
+from gridmodel.engine import ScenarioEngine
+from gridmodel.settlement import from_pyomo, output_table
+
+
+def per_generator_outputs(model, costs):
+    """The rows as computed before gridmodel.settlement, one Pyomo value / dual at a time."""
+    output = []
+
+    for (n, t) in model.GENS:
+        gen_value = pyo.value(model.p_gen[(n, t)])
+        lmp = model.dual.get(model.NodalBalance[n], 0)
+        surplus = (lmp - costs[(n, t)]) * gen_value
+        output.append({"Node": n, "Type": t, "Category": "Generation", "Value": gen_value})
+        output.append({"Node": n, "Type": t, "Category": "Surplus", "Value": surplus})
+
+    for (i, j) in model.LINES:
+        output.append({"Node": i, "Type": f"to_{j}", "Category": "Flow", "Value": pyo.value(model.p_flow[(i, j)])})
+
+    for n in model.NODES:
+        output.append({"Node": n, "Type": "", "Category": "LMP", "Value": model.dual.get(model.NodalBalance[n], None)})
+        output.append({"Node": n, "Type": "", "Category": "Angle", "Value": pyo.value(model.theta[n])})
+
+    total_cost = pyo.value(model.OBJ)
+    total_paid = sum(
+        model.dual.get(model.NodalBalance[n], 0) * pyo.value(model.p_gen[(n, t)]) for (n, t) in model.GENS
+    )
+    output.append({"Node": "System", "Type": "", "Category": "TotalCost", "Value": total_cost})
+    output.append({"Node": "System", "Type": "", "Category": "TotalPaid", "Value": total_paid})
+    output.append({"Node": "System", "Type": "", "Category": "TotalSurplus", "Value": total_paid - total_cost})
+    check = sum(row["Value"] for row in output if row["Category"] == "Surplus")
+    output.append({"Node": "System", "Type": "", "Category": "CheckSurplusSum", "Value": check})
+    return pd.DataFrame(output)
+
+
+@pytest.mark.parametrize("scenario", ["hs", "hw", "lwls"])
+@pytest.mark.parametrize("demand_level", ["offpeak_demand", "average_demand", "peak_demand"])
+def test_output_table_matches_per_generator_computation(data_root, scenario, demand_level):
+    supply, lines, demand, weather = load_inputs(data_root)
+    capacity, costs = scenario_inputs(supply, weather, scenario)
+    nodal_demand = dict(zip(demand["node"], demand[demand_level]))
+    model = build_nodal_model(demand["node"].unique(), capacity, costs, line_capacities(lines), nodal_demand)
+    assert pyo.check_optimal_termination(ScenarioEngine(model).solve(f"{scenario} | {demand_level}"))
+
+    table = output_table(from_pyomo(model, costs))
+    expected = per_generator_outputs(model, costs)
+
+    assert table[["Node", "Type", "Category"]].astype(str).equals(expected[["Node", "Type", "Category"]].astype(str))
+    np.testing.assert_allclose(table["Value"].to_numpy(), expected["Value"].to_numpy(dtype=float), rtol=1e-9, atol=1e-6)
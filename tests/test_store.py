@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import pytest
+
+from gridmodel.data import load_inputs
+from gridmodel.nodal import nodal_results
+from gridmodel.store import SCHEMAS, ResultStore, nodal_tables, uniform_tables
+from gridmodel.uniform import run_uniform
+
+RUNS = [("hs", "offpeak_demand"), ("hs", "peak_demand"), ("lwls", "peak_demand")]
+
+
+@pytest.fixture(scope="module")
+def inputs(data_root):
+    return load_inputs(data_root)
+
+
+@pytest.fixture(scope="module")
+def written(inputs, tmp_path_factory):
+    """A store holding the nodal (pyomo and N-1) and uniform tables of RUNS, and the tables written."""
+    supply, lines, demand, weather = inputs
+    store = ResultStore(str(tmp_path_factory.mktemp("store")))
+    tables = {}
+    for scenario, level in RUNS:
+        for lines_name, method in [("lines", "pyomo"), ("n1", "n1")]:
+            entry = nodal_results(supply, lines, demand, weather, scenario, level, method=method)
+            keys = {"Lines": lines_name, "Scenario": scenario, "DemandLevel": level}
+            tables[tuple(keys.values())] = nodal_tables(entry["outputs"], entry["line_duals"], supply,
+                                                        entry["solver"], entry.get("contingencies"))
+            store.write_tables(tables[tuple(keys.values())], **keys)
+
+        result = run_uniform(supply, lines, demand, weather, scenario, level, redispatch="optimal")
+        keys = {"Lines": "uniform", "Scenario": scenario, "DemandLevel": level}
+        tables[tuple(keys.values())] = uniform_tables(result)
+        store.write_tables(tables[tuple(keys.values())], **keys)
+    return store, tables
+
+
+def test_tables_match_their_schemas(written):
+    _, tables = written
+    names = set()
+    for run in tables.values():
+        for table, df in run.items():
+            names.add(table)
+            assert set(SCHEMAS[table].names) <= set(df.columns), table
+    assert names == set(SCHEMAS)
+
+
+def test_partitions_read_back_as_written(written):
+    store, tables = written
+    for (lines_name, scenario, level), run in tables.items():
+        for table, df in run.items():
+            schema = SCHEMAS[table]
+            read = store.read(table, columns=schema.names, Lines=lines_name, Scenario=scenario, DemandLevel=level)
+            assert list(read.columns) == schema.names
+            expected = df[schema.names].reset_index(drop=True).rename_axis(columns=None)
+            pd.testing.assert_frame_equal(read, expected, check_dtype=False)
+
+    for table, schema in SCHEMAS.items():
+        stored = store.dataset(table).schema
+        assert [stored.field(name).type for name in schema.names] == list(schema.types), table
+
+
+def test_partition_filters(written):
+    store, tables = written
+    lmp = store.read("nodal_lmp", Lines="lines", DemandLevel="peak_demand")
+    assert set(lmp["Scenario"]) == {"hs", "lwls"} and set(lmp["Lines"]) == {"lines"}
+    assert len(lmp) == sum(len(run["nodal_lmp"]) for (l, _, d), run in tables.items()
+                           if l == "lines" and d == "peak_demand")
+
+    both = store.read("nodal_system", Lines=["lines", "n1"], Scenario="hs")
+    assert sorted(zip(both["Lines"], both["DemandLevel"])) == [
+        ("lines", "offpeak_demand"), ("lines", "peak_demand"), ("n1", "offpeak_demand"), ("n1", "peak_demand"),
+    ]
+
+    assert store.read("uniform_system", Lines="lines").empty
+    cuts = store.read("nodal_contingencies", columns=["Scenario", "Dual"])
+    assert list(cuts.columns) == ["Scenario", "Dual"]
+
+    expensive = store.read("nodal_lmp", filter=ds.field("LMP") > 100, Lines="lines")
+    assert (expensive["LMP"] > 100).all()
+    everything = store.read("nodal_lmp", Lines="lines")
+    assert len(expensive) == int((everything["LMP"] > 100).sum())
+
+
+def test_rewriting_a_partition_replaces_it(written, tmp_path):
+    _, tables = written
+    store = ResultStore(str(tmp_path))
+    run = tables[("lines", "hs", "peak_demand")]
+    keys = {"Lines": "lines", "Scenario": "hs", "DemandLevel": "peak_demand"}
+    store.write("nodal_lmp", run["nodal_lmp"], **keys)
+    store.write("nodal_lmp", run["nodal_lmp"].assign(LMP=np.nan), **keys)
+    read = store.read("nodal_lmp", **keys)
+    assert len(read) == len(run["nodal_lmp"]) and read["LMP"].isna().all()
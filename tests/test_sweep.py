@@ -0,0 +1,40 @@
+import numpy as np
+import pyomo.environ as pyo
+import pytest
+
+from gridmodel.builder import build_nodal_model
+from gridmodel.data import line_capacities, line_reactances, load_inputs, scenario_inputs
+from gridmodel.engine import ScenarioEngine
+from gridmodel.settlement import from_pyomo, settle
+from gridmodel.sweep import ALL_LINES, scaled_capacities, sweep_line_capacity
+
+FACTORS = [0.6, 0.8, 1.0, 1.5]
+
+
+@pytest.fixture(scope="module")
+def sweep(data_root):
+    """All targets swept on one engine, whose line limits are overwritten at every point."""
+    supply, lines, demand, weather = load_inputs(data_root)
+    return sweep_line_capacity(supply, lines, demand, weather, "hw", "peak_demand", FACTORS,
+                               targets=[ALL_LINES, (5, 6), (1, 4)])
+
+
+@pytest.mark.parametrize("target,factor", [(ALL_LINES, 0.6), ((1, 4), 0.8), ((1, 4), 1.5)])
+def test_reused_engine_matches_fresh_model(data_root, sweep, target, factor):
+    supply, lines, demand, weather = load_inputs(data_root)
+    label = target if target == ALL_LINES else f"{target[0]}-{target[1]}"
+    point = sweep.system.set_index(["Target", "Factor"]).loc[(label, factor)]
+    lmp = sweep.lmp[(sweep.lmp["Target"] == label) & (sweep.lmp["Factor"] == factor)].set_index("Node")["LMP"]
+    capacity = sweep.lines[(sweep.lines["Target"] == label) & (sweep.lines["Factor"] == factor)]
+
+    available_capacity, costs = scenario_inputs(supply, weather, "hw")
+    caps = scaled_capacities(line_capacities(lines), target, factor)
+    model = build_nodal_model(demand["node"].unique(), available_capacity, costs, caps,
+                              dict(zip(demand["node"], demand["peak_demand"])), line_reactances(lines))
+    assert pyo.check_optimal_termination(ScenarioEngine(model).solve("fresh"))
+    solution = from_pyomo(model, costs)
+
+    assert point["Status"] == "optimal"
+    assert point["TotalCost"] == pytest.approx(settle(solution).total_cost[0], rel=1e-9)
+    np.testing.assert_allclose(lmp[list(solution.nodes)], solution.lmp[0], atol=1e-6)
+    np.testing.assert_allclose(capacity["Capacity"], [caps[l] for l in zip(capacity["From"], capacity["To"])])
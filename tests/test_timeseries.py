@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gridmodel.data import line_capacities, load_inputs
+from gridmodel.timeseries import solve_timeseries
+
+HOURS = 14 * 24
+
+
+def hourly(inputs, per_node, hours):
+    """Long (timestamp, node, ...) table of (T x N) arrays per column."""
+    columns = {name: np.asarray(values).ravel() for name, values in per_node.items()}
+    return pd.DataFrame({
+        "timestamp": np.repeat(hours, len(inputs)),
+        "node": np.tile(inputs["node"].to_numpy(), len(hours)),
+        **columns,
+    })
+
+
+@pytest.fixture(scope="module")
+def two_weeks(data_root):
+    """Two weeks of synthetic hours on the 6-node data: daily demand and solar cycles,
+    a 3.5-day wind cycle, and two storage units."""
+    supply, lines, demand, weather = load_inputs(data_root)
+    hours = pd.date_range("2024-01-01", periods=HOURS, freq="h")
+    h = np.arange(HOURS)
+
+    shape = 0.5 * (1 - np.cos(2 * np.pi * (h % 24 - 4) / 24))
+    low, high = demand["offpeak_demand"].to_numpy(), demand["peak_demand"].to_numpy()
+    hourly_demand = hourly(demand, {"demand": low + np.outer(shape, high - low)}, hours)
+
+    sun = 2 * np.clip(np.sin(np.pi * (h % 24 - 6) / 12), 0, None)
+    wind = 0.6 + 0.4 * np.sin(2 * np.pi * h / 84)
+    base = weather[weather["scenario"] == "hs"]
+    hourly_weather = hourly(base, {
+        "onshorewind_profile": np.clip(np.outer(wind, base["onshorewind_profile"]), 0, 1),
+        "offshorewind_profile": np.clip(np.outer(wind, base["offshorewind_profile"]), 0, 1),
+        "solar_profile": np.clip(np.outer(sun, base["solar_profile"]), 0, 1),
+    }, hours)
+
+    storage = pd.DataFrame({
+        "node": [1, 4], "name": ["a", "b"], "power_mw": [2000.0, 1500.0], "energy_mwh": [8000.0, 6000.0],
+        "efficiency": [0.85, 0.85], "initial_soc": [0.5, 0.5],
+    })
+    return supply, line_capacities(lines), hourly_demand, hourly_weather, storage
+
+
+def run(supply, line_cap, demand, weather, storage, chunk_size, overlap=0, ramp_rate=0.2, **kwargs):
+    chunks = list(solve_timeseries(supply, line_cap, demand, weather, "demand", chunk_size, storage=storage,
+                                   ramp_rate=ramp_rate, overlap=overlap, **kwargs))
+    return {name: pd.concat([c[name] for c in chunks], ignore_index=True) for name in chunks[0]}
+
+
+def test_rolling_horizon_with_look_ahead_matches_single_lp(two_weeks):
+    single = run(*two_weeks, chunk_size=HOURS)
+    rolling = run(*two_weeks, chunk_size=24, overlap=24)
+    assert rolling["system"]["total_cost"].sum() == pytest.approx(single["system"]["total_cost"].sum(), rel=1e-5)
+    assert rolling["system"]["unserved"].sum() == pytest.approx(0, abs=1e-6)
+
+
+def test_window_that_cannot_follow_demand_sheds_load(two_weeks):
+    supply, line_cap, demand, weather, storage = two_weeks
+    # Two days, off-peak then peak demand: with no look-ahead the second window starts
+    # from the first day's output and tight ramp limits cannot follow the step
+    hours = sorted(demand["timestamp"].unique())[:48]
+    demand = demand[demand["timestamp"].isin(hours)].copy()
+    weather = weather[weather["timestamp"].isin(hours)]
+    first_day = demand["timestamp"] < hours[24]
+    low = demand.groupby("node")["demand"].transform("min")
+    high = demand.groupby("node")["demand"].transform("max")
+    demand["demand"] = np.where(first_day, low, high)
+
+    no_slack = run(supply, line_cap, demand, weather, storage, chunk_size=24, ramp_rate=0.02, voll=None)
+    assert no_slack["system"]["total_cost"].isna().sum() == 24
+
+    result = run(supply, line_cap, demand, weather, storage, chunk_size=24, ramp_rate=0.02)
+    assert result["system"]["total_cost"].notna().all()
+    assert result["lmp"]["lmp"].notna().all()
+    assert result["system"]["unserved"].iloc[24:].sum() > 0
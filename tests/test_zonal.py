@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gridmodel.data import load_inputs
+from gridmodel.nodal import nodal_results
+from gridmodel.uniform import run_uniform
+from gridmodel.zonal import (ZonalModel, ZoningEvaluator, enumerate_zonings, parse_zoning, rank_zonings, run_zonal,
+                             zone_label)
+
+RUNS = [(s, d) for s in ["hs", "hw", "lwls"] for d in ["offpeak_demand", "average_demand", "peak_demand"]]
+NORTH_SOUTH = parse_zoning("1,2,3|4,5,6")
+
+
+@pytest.fixture(scope="module")
+def inputs(data_root):
+    return load_inputs(data_root)
+
+
+@pytest.mark.parametrize("demand_level", ["average_demand", "peak_demand"])
+def test_ntc_limited_border_splits_prices(inputs, demand_level):
+    supply, lines, demand, weather = inputs
+    result = run_zonal(supply, lines, demand, weather, "hw", demand_level, NORTH_SOUTH)
+    zones = result.zones.set_index("Zone")
+    (border,) = result.exchanges.itertuples()
+
+    # Default NTC: lines 1-4, 3-5 and 3-6 cross the border
+    assert border.NTC == 2500 + 3000 + 2500
+    assert border.Flow == pytest.approx(border.NTC)
+    assert zones.at["Z1", "NetPosition"] == pytest.approx(border.NTC)
+    assert zones.at["Z1", "Price"] < zones.at["Z2", "Price"]
+    assert -border.Dual == pytest.approx(zones.at["Z2", "Price"] - zones.at["Z1", "Price"])
+
+    lower = run_zonal(supply, lines, demand, weather, "hw", demand_level, NORTH_SOUTH, ntc={("Z2", "Z1"): 5000})
+    assert lower.exchanges["Flow"].iloc[0] == pytest.approx(5000)
+    assert lower.zones["Price"].iloc[1] >= zones.at["Z2", "Price"]
+
+
+def test_uncongested_border_gives_one_price(inputs):
+    supply, lines, demand, weather = inputs
+    result = run_zonal(supply, lines, demand, weather, "lwls", "average_demand", NORTH_SOUTH)
+    assert abs(result.exchanges["Flow"].iloc[0]) < result.exchanges["NTC"].iloc[0]
+    assert result.exchanges["Dual"].iloc[0] == pytest.approx(0)
+    assert result.zones["Price"].nunique() == 1
+
+
+@pytest.mark.parametrize("mode", ["ntc", "fb"])
+@pytest.mark.parametrize("scenario,demand_level", RUNS)
+def test_single_zone_reproduces_uniform_market(inputs, mode, scenario, demand_level):
+    supply, lines, demand, weather = inputs
+    zoning = dict.fromkeys(demand["node"], "All")
+    zonal = run_zonal(supply, lines, demand, weather, scenario, demand_level, zoning, mode=mode)
+    uniform = run_uniform(supply, lines, demand, weather, scenario, demand_level, redispatch="optimal")
+
+    assert zonal.exchanges.empty
+    assert zonal.zones["Price"].iloc[0] == pytest.approx(uniform.feasibility.price.clearing_price)
+    assert zonal.record()["TotalCost"] == pytest.approx(uniform.record()["TotalCost"], rel=1e-9)
+    assert zonal.record()["Adjusted_TEC"] == pytest.approx(uniform.record()["Adjusted_TEC"], rel=1e-6)
+
+
+@pytest.mark.parametrize("scenario,demand_level", [("hs", "peak_demand"), ("hw", "peak_demand"), ("lwls", "average_demand")])
+def test_flow_based_zone_per_node_reproduces_lmps(inputs, scenario, demand_level):
+    supply, lines, demand, weather = inputs
+    zoning = {n: f"N{n}" for n in demand["node"]}
+    zonal = run_zonal(supply, lines, demand, weather, scenario, demand_level, zoning, mode="fb", cnec="all")
+    outputs = nodal_results(supply, lines, demand, weather, scenario, demand_level, method="sparse")["outputs"]
+    lmp = outputs[outputs["Category"] == "LMP"].set_index("Node")["Value"]
+    np.testing.assert_allclose(zonal.zones["Price"], [lmp[n] for n in demand["node"]], atol=1e-6)
+
+
+def test_flow_based_border_lines_within_capacity(inputs):
+    supply, lines, demand, weather = inputs
+    model = ZonalModel.from_inputs(supply, lines, NORTH_SOUTH, mode="fb")
+    result = run_zonal(supply, lines, demand, weather, "hw", "peak_demand", NORTH_SOUTH, model=model)
+    exchanges = result.exchanges
+
+    assert len(exchanges) == model.border.sum() == 3
+    assert (exchanges["Flow"].abs() <= exchanges["Capacity"] + 1e-6).all()
+    binding = exchanges["Dual"].abs() > 1e-6
+    assert binding.any()
+    np.testing.assert_allclose(exchanges.loc[binding, "Flow"].abs(), exchanges.loc[binding, "Capacity"])
+    assert result.zones["Price"].iloc[0] < result.zones["Price"].iloc[1]
+    assert result.zones["NetPosition"].sum() == pytest.approx(0, abs=1e-6)
+
+
+def test_zonal_model_rejects_incomplete_zoning(inputs):
+    supply, lines, _, _ = inputs
+    with pytest.raises(ValueError, match="without a zone"):
+        ZonalModel.from_inputs(supply, lines, {1: "A", 2: "A"})
+    with pytest.raises(ValueError, match="Unknown zonal mode"):
+        ZonalModel.from_inputs(supply, lines, NORTH_SOUTH, mode="nodal")
+
+
+def connected(lines, members):
+    """Whether the lines between members connect them all."""
+    members = set(members)
+    seen, stack = set(), [next(iter(members))]
+    while stack:
+        node = stack.pop()
+        seen.add(node)
+        for i, j in zip(lines["from_node"], lines["to_node"]):
+            for a, b in ((i, j), (j, i)):
+                if a == node and b in members and b not in seen:
+                    stack.append(b)
+    return seen == members
+
+
+@pytest.mark.parametrize("n_zones,partitions", [(2, 31), (3, 90)])
+def test_enumerate_zonings(inputs, n_zones, partitions):
+    _, lines, _, _ = inputs
+    everything = list(enumerate_zonings(lines, n_zones, connected=False))
+    assert len(everything) == partitions  # Stirling numbers of the second kind S(6, k)
+    assert len({zone_label(z) for z in everything}) == partitions
+    for zoning in everything:
+        assert sorted(set(zoning.values())) == [f"Z{k + 1}" for k in range(n_zones)]
+
+    def zones(zoning):
+        return [[n for n in zoning if zoning[n] == z] for z in set(zoning.values())]
+
+    expected = {zone_label(z) for z in everything if all(connected(lines, g) for g in zones(z))}
+    found = [zone_label(z) for z in enumerate_zonings(lines, n_zones)]
+    assert 0 < len(found) < partitions
+    assert sorted(found) == sorted(expected)
+
+
+def test_rank_zonings(inputs):
+    supply, lines, demand, weather = inputs
+    evaluator = ZoningEvaluator(supply, lines, demand, weather, [("hw", "peak_demand"), ("hw", "average_demand")])
+    zonings = list(enumerate_zonings(lines, 2))
+    ranking = rank_zonings(evaluator, zonings)
+
+    assert list(ranking["Rank"]) == list(range(1, len(zonings) + 1))
+    assert set(ranking["Zoning"]) == {zone_label(z) for z in zonings}
+    assert (ranking["Failed"] == 0).all()
+    assert ranking["RedispatchCost"].is_monotonic_increasing
+    # With optimal redispatch every zoning ends at the nodal optimum
+    np.testing.assert_allclose(ranking["CostGap"], 0, atol=1e-3)
+
+    pd.testing.assert_frame_equal(rank_zonings(evaluator, zonings, workers=2), ranking)